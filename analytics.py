@@ -0,0 +1,266 @@
+"""
+Vectorized trade analytics: cluster buys, rolling net flows and activity anomalies.
+
+Every SEC and government trade is loaded from all_trades in one streamed query into columnar
+NumPy arrays (TradeColumns). Everything after that is array arithmetic: trades are bucketed
+into trailing windows ending at `as_of` (window 0 is the most recent `window` days, window 1
+the one before, ...). np.bincount over (group, window) then gives a net-flow matrix per issuer
+or person in one pass. Each person's latest window is z-scored against their own earlier
+windows, and issuers where several distinct insiders bought within the latest window are
+reported as clusters.
+"""
+import datetime
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+EPOCH = datetime.date(1970, 1, 1)
+LOAD_CHUNK = 100_000
+# Dollar value: shares x price for Form 4 rows, the reported amount (range midpoint) for officials.
+# Side: +1 for purchases, -1 for sales (including partial sales), 0 for grants, gifts, exchanges, ...
+LOAD_SQL = """
+    SELECT source = 'SEC',
+           transaction_date - DATE '1970-01-01',
+           person_id,
+           CASE WHEN person_id IS NULL THEN name END,
+           CASE WHEN source = 'SEC' THEN detail END,
+           CASE WHEN transaction_type ILIKE 'purchase%' THEN 1
+                WHEN transaction_type ILIKE 'sale%' THEN -1
+                ELSE 0 END,
+           (CASE WHEN source = 'SEC' THEN COALESCE(amount, 0) * COALESCE(price, 0)
+                 ELSE COALESCE(amount, 0) END)::float8
+    FROM all_trades
+    WHERE transaction_date IS NOT NULL
+"""
+# Below these spreads a person's history counts as flat, so one extra trade is not "infinitely" unusual
+MIN_COUNT_STD = 1.0
+MIN_LOG_VALUE_STD = 0.5
+
+
+@dataclass
+class TradeColumns:
+    sec: np.ndarray       # bool: Form 4 trade (else a government official's)
+    day: np.ndarray       # int32: transaction date as days since 1970-01-01
+    person: np.ndarray    # int64: person id; names without one have negative keys (see unresolved)
+    issuer: np.ndarray    # int32: index into issuers, -1 for government trades
+    side: np.ndarray      # int8: +1 purchase, -1 sale, 0 other
+    value: np.ndarray     # float64: dollars
+    issuers: list         # issuer names
+    unresolved: dict      # negative person key -> name
+
+    def __len__(self):
+        return len(self.day)
+
+
+def load_trades(conn, chunk: int = LOAD_CHUNK) -> TradeColumns:
+    """
+    Every dated trade in all_trades as TradeColumns, streamed from a server-side cursor in
+    chunks of `chunk` rows
+    """
+    c = conn.cursor(name="analytics_trades")
+    c.itersize = chunk
+    c.execute(LOAD_SQL)
+    issuer_index, unresolved = {}, {}
+    parts = []
+    while True:
+        rows = c.fetchmany(chunk)
+        if not rows:
+            break
+        sec, day, person, name, issuer, side, value = zip(*rows)
+        parts.append((
+            np.array(sec, dtype=bool),
+            np.array(day, dtype=np.int32),
+            np.array([p if p is not None else -unresolved.setdefault(n, len(unresolved) + 1)
+                      for p, n in zip(person, name)], dtype=np.int64),
+            np.array([-1 if i is None else issuer_index.setdefault(i, len(issuer_index)) for i in issuer],
+                     dtype=np.int32),
+            np.array(side, dtype=np.int8),
+            np.array(value, dtype=np.float64),
+        ))
+    c.close()
+    conn.commit()
+    dtypes = (bool, np.int32, np.int64, np.int32, np.int8, np.float64)
+    columns = [np.concatenate([part[i] for part in parts]) if parts else np.empty(0, dtype)
+               for i, dtype in enumerate(dtypes)]
+    return TradeColumns(*columns, issuers=list(issuer_index),
+                        unresolved={-key: name for name, key in unresolved.items()})
+
+
+def to_day(date: datetime.date) -> int:
+    return (date - EPOCH).days
+
+
+def to_date(day) -> str:
+    return (EPOCH + datetime.timedelta(days=int(day))).isoformat()
+
+
+def window_index(day: np.ndarray, as_of: int, window: int, windows: int) -> np.ndarray:
+    """
+    Trailing window of each trade: 0 for (as_of - window, as_of], 1 for the window before and
+    so on; -1 for trades after as_of or older than `windows` windows
+    """
+    w = (as_of - day.astype(np.int64)) // window
+    return np.where((day <= as_of) & (w < windows), w, -1)
+
+
+def window_matrix(keys: np.ndarray, w: np.ndarray, weights: np.ndarray, windows: int):
+    """
+    Sum of weights per key and trailing window
+    :param keys: group of each trade (any integers)
+    :param w: window_index() of each trade
+    :param weights: value added per trade
+    :return: (sorted distinct keys, matrix of shape (len(keys), windows), newest window first)
+    """
+    mask = w >= 0
+    groups, codes = np.unique(keys[mask], return_inverse=True)
+    sums = np.bincount(codes * windows + w[mask], weights=weights[mask], minlength=len(groups) * windows)
+    return groups, sums.reshape(len(groups), windows)
+
+
+def net_flows(cols: TradeColumns, by: str, as_of: int, window: int, windows: int, mask=None,
+              limit: int = 25) -> list:
+    """
+    Net dollar flow (purchases minus sales) per issuer or person in each trailing window, for
+    the `limit` groups with the largest absolute flow in the latest window
+    :param by: "issuer" or "person"
+    :param mask: optional boolean filter over the trades
+    :return: dicts with key, net (latest window), bought, sold and series (net per window, newest first)
+    """
+    keys = cols.issuer if by == "issuer" else cols.person
+    select = cols.side != 0
+    if by == "issuer":
+        select &= cols.issuer >= 0
+    if mask is not None:
+        select &= mask
+    w = np.where(select, window_index(cols.day, as_of, window, windows), -1)
+    groups, net = window_matrix(keys, w, cols.side * cols.value, windows)
+    _, bought = window_matrix(keys, w, np.where(cols.side > 0, cols.value, 0.0), windows)
+    sold = bought - net
+    top = np.argsort(-np.abs(net[:, 0]), kind="stable")[:limit]
+    top = top[net[top, 0] != 0]
+    return [{"key": int(groups[i]), "net": round(float(net[i, 0]), 2), "bought": round(float(bought[i, 0]), 2),
+             "sold": round(float(sold[i, 0]), 2), "series": np.round(net[i], 2).tolist()} for i in top]
+
+
+def zscores(matrix: np.ndarray, min_std: float) -> np.ndarray:
+    """
+    z-score of each row's newest window (column 0) against its earlier windows, with the
+    standard deviation floored at min_std
+    """
+    history = matrix[:, 1:]
+    mean = history.mean(axis=1)
+    std = np.maximum(history.std(axis=1), min_std)
+    return (matrix[:, 0] - mean) / std
+
+
+def anomalies(cols: TradeColumns, as_of: int, window: int, windows: int, threshold: float = 2.5,
+              min_trades: int = 2, mask=None, limit: int = 25) -> list:
+    """
+    People whose trading in the latest window is unusual against their own earlier windows:
+    z-score of the trade count or of the log gross dollar value at or above threshold
+    :param min_trades: fewest trades in the latest window for a person to be reported
+    :return: dicts with key, trades, value, baseline mean trades per window and both z-scores, highest first
+    """
+    w = window_index(cols.day, as_of, window, windows)
+    if mask is not None:
+        w = np.where(mask, w, -1)
+    groups, counts = window_matrix(cols.person, w, np.ones(len(cols)), windows)
+    _, values = window_matrix(cols.person, w, cols.value, windows)
+    if windows < 2 or not len(groups):
+        return []
+    z_count = zscores(counts, MIN_COUNT_STD)
+    z_value = zscores(np.log1p(values), MIN_LOG_VALUE_STD)
+    z = np.maximum(z_count, z_value)
+    hits = np.nonzero((z >= threshold) & (counts[:, 0] >= min_trades))[0]
+    hits = hits[np.argsort(-z[hits], kind="stable")][:limit]
+    return [{"key": int(groups[i]), "trades": int(counts[i, 0]), "value": round(float(values[i, 0]), 2),
+             "baseline_trades": round(float(counts[i, 1:].mean()), 2),
+             "z_trades": round(float(z_count[i]), 2), "z_value": round(float(z_value[i]), 2)} for i in hits]
+
+
+def clusters(cols: TradeColumns, as_of: int, window: int, min_insiders: int = 3, limit: int = 25) -> list:
+    """
+    Issuers where at least min_insiders distinct insiders bought within (as_of - window, as_of]
+    :return: dicts with issuer, insiders (count), persons (keys), trades, value, first and last date,
+        most insiders first
+    """
+    mask = cols.sec & (cols.side > 0) & (cols.issuer >= 0) & (cols.day <= as_of) & (cols.day > as_of - window)
+    issuer, person, day, value = cols.issuer[mask], cols.person[mask], cols.day[mask], cols.value[mask]
+    if not len(issuer):
+        return []
+    people, person_codes = np.unique(person, return_inverse=True)
+    pairs = np.unique(issuer.astype(np.int64) * len(people) + person_codes)
+    pair_issuer = pairs // len(people)
+    insiders = np.bincount(pair_issuer, minlength=len(cols.issuers))
+    trades = np.bincount(issuer, minlength=len(cols.issuers))
+    totals = np.bincount(issuer, weights=value, minlength=len(cols.issuers))
+    first = np.full(len(cols.issuers), np.iinfo(np.int32).max)
+    last = np.full(len(cols.issuers), np.iinfo(np.int32).min)
+    np.minimum.at(first, issuer, day)
+    np.maximum.at(last, issuer, day)
+    hits = np.nonzero(insiders >= min_insiders)[0]
+    hits = hits[np.lexsort((-totals[hits], -insiders[hits]))][:limit]
+    return [{"issuer": cols.issuers[i], "insiders": int(insiders[i]),
+             "persons": [int(p) for p in people[pairs[pair_issuer == i] % len(people)]],
+             "trades": int(trades[i]), "value": round(float(totals[i]), 2),
+             "first_date": to_date(first[i]), "last_date": to_date(last[i])} for i in hits]
+
+
+def person_names(conn, cols: TradeColumns, keys) -> dict:
+    """Display name of each person key (canonical name, or the raw name for unresolved keys)."""
+    keys = set(keys)
+    names = {key: cols.unresolved.get(key) for key in keys if key < 0}
+    ids = [key for key in keys if key >= 0]
+    if ids:
+        c = conn.cursor()
+        c.execute("SELECT id, canonical_name FROM persons WHERE id = ANY(%s)", (ids,))
+        names.update(c.fetchall())
+    return names
+
+
+def report(conn, cols: TradeColumns, as_of: datetime.date = None, window: int = 30, windows: int = 12,
+           min_insiders: int = 3, threshold: float = 2.5, source: str = None, limit: int = 25) -> dict:
+    """
+    Cluster buys, issuer and person net flows and activity anomalies as of a date
+    :param as_of: last day of the latest window (default: the newest trade date not after today)
+    :param window: days per window
+    :param windows: windows of history; the anomaly baseline is all but the latest
+    :param min_insiders: distinct buyers that make a cluster
+    :param threshold: z-score reported as an anomaly
+    :param source: "SEC" or "GOV" to restrict flows and anomalies to one source
+    :param limit: entries per list
+    """
+    started = time.perf_counter()
+    today = to_day(datetime.date.today())
+    if as_of is not None:
+        as_of_day = to_day(as_of)
+    else:
+        past = cols.day[cols.day <= today]
+        as_of_day = int(past.max()) if len(past) else today
+    mask = None
+    if source is not None:
+        mask = cols.sec if source == "SEC" else ~cols.sec
+    result = {
+        "as_of": to_date(as_of_day),
+        "window_days": window,
+        "windows": windows,
+        "trades": len(cols),
+        "clusters": clusters(cols, as_of_day, window, min_insiders, limit) if source != "GOV" else [],
+        "issuer_flows": net_flows(cols, "issuer", as_of_day, window, windows, mask, limit) if source != "GOV" else [],
+        "person_flows": net_flows(cols, "person", as_of_day, window, windows, mask, limit),
+        "anomalies": anomalies(cols, as_of_day, window, windows, threshold, mask=mask, limit=limit),
+    }
+    for flow in result["issuer_flows"]:
+        flow["issuer"] = cols.issuers[flow.pop("key")]
+    result["compute_seconds"] = round(time.perf_counter() - started, 3)
+    keys = ([p for cluster in result["clusters"] for p in cluster["persons"]]
+            + [f["key"] for f in result["person_flows"]] + [a["key"] for a in result["anomalies"]])
+    names = person_names(conn, cols, keys)
+    for cluster in result["clusters"]:
+        cluster["persons"] = [{"person_id": p if p >= 0 else None, "name": names.get(p)} for p in cluster["persons"]]
+    for entry in result["person_flows"] + result["anomalies"]:
+        key = entry.pop("key")
+        entry["person_id"] = key if key >= 0 else None
+        entry["name"] = names.get(key)
+    return result
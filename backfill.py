@@ -0,0 +1,214 @@
+"""
+Historical Form 4 backfill from EDGAR index files.
+
+Reads daily-index / full-index master.idx or form.idx files from a local mirror laid out like
+https://www.sec.gov/Archives/ (e.g. MIRROR/daily-index/2024/QTR1/master.20240102.idx,
+MIRROR/full-index/2024/QTR1/form.idx, MIRROR/edgar/data/<cik>/<accession>.txt), keeps form
+types 4 and 4/A, skips accessions already in `filings` and runs the rest through the same
+fetch -> parse -> write pipeline as /pull_once. Finished index files are recorded in a
+checkpoint file so an interrupted backfill resumes where it stopped.
+
+    python backfill.py --mirror /data/edgar --start 2024-01-01 --end 2024-03-31 --offline
+"""
+import argparse
+import datetime
+import gzip
+import json
+import os
+
+from main import (ACCESSION_RE, PULL_CONCURRENCY, PULL_QUEUE_SIZE, SEC_BASE_URL, batched_writer, db_pool,
+                  known_accessions, parse_filing, sec_fetcher)
+from pipeline import Pipeline, Stage
+
+FORM4_TYPES = {"4", "4/A"}
+ARCHIVES_URL = SEC_BASE_URL + "/Archives/"
+INDEX_KINDS = ("master", "form")
+KNOWN_BATCH = 1000
+
+
+def quarters(start, end):
+    """(year, quarter) pairs overlapping [start, end]."""
+    year, quarter = start.year, (start.month - 1) // 3 + 1
+    while (year, quarter) <= (end.year, (end.month - 1) // 3 + 1):
+        yield year, quarter
+        year, quarter = (year + 1, 1) if quarter == 4 else (year, quarter + 1)
+
+
+def find_index(directory, name):
+    for candidate in (name, name + ".gz"):
+        path = os.path.join(directory, candidate)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def index_files(mirror, start, end):
+    """
+    Index files covering [start, end]. Daily indexes are used where the mirror has them;
+    quarters without any daily file fall back to the quarterly full-index file.
+    """
+    paths = []
+    for year, quarter in quarters(start, end):
+        daily_dir = os.path.join(mirror, "daily-index", str(year), f"QTR{quarter}")
+        daily = []
+        day = max(start, datetime.date(year, 3 * quarter - 2, 1))
+        while day <= end and (day.month - 1) // 3 + 1 == quarter and day.year == year:
+            for kind in INDEX_KINDS:
+                path = find_index(daily_dir, f"{kind}.{day:%Y%m%d}.idx")
+                if path:
+                    daily.append(path)
+                    break
+            day += datetime.timedelta(days=1)
+        if daily:
+            paths.extend(daily)
+            continue
+        full_dir = os.path.join(mirror, "full-index", str(year), f"QTR{quarter}")
+        for kind in INDEX_KINDS:
+            path = find_index(full_dir, f"{kind}.idx")
+            if path:
+                paths.append(path)
+                break
+        else:
+            print(f"[WARN] No index file for {year} QTR{quarter} in {mirror}")
+    return paths
+
+
+def parse_date(value):
+    for fmt in ("%Y-%m-%d", "%Y%m%d"):
+        try:
+            return datetime.datetime.strptime(value, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+def read_index(path):
+    """
+    Yield (form_type, cik, date_filed, filename) from a master.idx (pipe-delimited) or
+    form.idx (fixed-width, form type first and file name last) index file.
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    pipe_delimited = os.path.basename(path).startswith("master")
+    with opener(path, "rt", encoding="latin-1") as f:
+        in_body = False
+        for line in f:
+            line = line.rstrip("\n")
+            if not in_body:
+                in_body = line.startswith("---")
+                continue
+            if pipe_delimited:
+                parts = line.split("|")
+                if len(parts) != 5:
+                    continue
+                cik, _, form_type, date_filed, filename = parts
+            else:
+                parts = line.split()
+                if len(parts) < 5:
+                    continue
+                form_type, cik, date_filed, filename = parts[0], parts[-3], parts[-2], parts[-1]
+            yield form_type.strip(), cik.strip(), parse_date(date_filed.strip()), filename.strip()
+
+
+def form4_entries(path, start, end):
+    """Unique (accession, filename) pairs for Form 4/4-A filings dated within [start, end]."""
+    entries = {}
+    for form_type, _, date_filed, filename in read_index(path):
+        if form_type not in FORM4_TYPES or date_filed is None or not start <= date_filed <= end:
+            continue
+        match = ACCESSION_RE.search(filename)
+        if match:
+            entries.setdefault(match.group(0), filename)
+    return list(entries.items())
+
+
+def load_checkpoint(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"done": []}
+
+
+def save_checkpoint(path, checkpoint):
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(checkpoint, f, indent=1)
+    os.replace(tmp, path)
+
+
+def document_fetcher(mirror, offline):
+    """Fetch-stage function reading submissions from the mirror, falling back to SEC_BASE_URL unless offline."""
+    def fetch(entry):
+        accession, filename = entry
+        local = os.path.join(mirror, filename)
+        if os.path.exists(local):
+            with open(local, "rb") as f:
+                content = f.read()
+        elif offline:
+            raise FileNotFoundError(f"{filename} is not in the mirror")
+        else:
+            content = sec_fetcher.get(ARCHIVES_URL + filename)
+        return [(accession, None, ARCHIVES_URL + filename, content)]
+    return fetch
+
+
+def backfill(mirror, start, end, checkpoint_path, offline=False, workers=None):
+    """
+    Backfill Form 4 filings dated within [start, end] from the mirror's index files
+    :return: totals across all index files processed in this run
+    """
+    workers = dict(PULL_CONCURRENCY, **(workers or {}))
+    checkpoint = load_checkpoint(checkpoint_path)
+    totals = {"indexes": 0, "listed": 0, "known": 0, "processed": 0, "inserted": 0, "failed": 0}
+    for path in index_files(mirror, start, end):
+        key = os.path.relpath(path, mirror)
+        if key in checkpoint["done"]:
+            continue
+        entries = form4_entries(path, start, end)
+        with db_pool.connection() as conn:
+            known = set()
+            for i in range(0, len(entries), KNOWN_BATCH):
+                known |= known_accessions(conn, [a for a, _ in entries[i:i + KNOWN_BATCH]])
+        todo = [e for e in entries if e[0] not in known]
+        print(f"[INFO] {key}: {len(entries)} Form 4s, {len(todo)} to ingest")
+
+        pipeline = Pipeline([
+            Stage("fetch", document_fetcher(mirror, offline), workers["fetch"]),
+            Stage("parse", parse_filing, workers["parse"]),
+            Stage("write", batched_writer(), workers["write"], context=db_pool.connection),
+        ], queue_size=PULL_QUEUE_SIZE)
+        results = pipeline.run(todo)
+        failed = len(todo) - len(results)
+
+        totals["indexes"] += 1
+        totals["listed"] += len(entries)
+        totals["known"] += len(known)
+        totals["processed"] += len(results)
+        totals["inserted"] += sum(r[0][0] for r in results)
+        totals["failed"] += failed
+        if failed:
+            # leave the index unchecked; a rerun only retries what is still missing from filings
+            print(f"[WARN] {key}: {failed} filings failed, index left for the next run")
+            continue
+        checkpoint["done"].append(key)
+        save_checkpoint(checkpoint_path, checkpoint)
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill Form 4 filings from EDGAR index files")
+    parser.add_argument("--mirror", required=True, help="local directory laid out like sec.gov/Archives")
+    parser.add_argument("--start", required=True, type=lambda v: datetime.date.fromisoformat(v))
+    parser.add_argument("--end", required=True, type=lambda v: datetime.date.fromisoformat(v))
+    parser.add_argument("--checkpoint", default="backfill_checkpoint.json")
+    parser.add_argument("--offline", action="store_true", help="never fetch documents missing from the mirror")
+    parser.add_argument("--fetch-workers", type=int, default=PULL_CONCURRENCY["fetch"])
+    parser.add_argument("--write-workers", type=int, default=PULL_CONCURRENCY["write"])
+    args = parser.parse_args()
+    totals = backfill(args.mirror, args.start, args.end, args.checkpoint, offline=args.offline,
+                      workers={"fetch": args.fetch_workers, "write": args.write_workers})
+    print(json.dumps(totals, indent=1))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Micro-benchmark for form4_parser against the previous regex + ElementTree approach.
+
+    python bench_form4_parser.py [corpus_dir] [--repeat N]
+
+On the three fixtures/form4 submissions form4_parser is about 1.3-1.6x faster per document
+than the old path (run to run), while extracting every table instead of five fields:
+
+    3 filings, 13.9 KiB, x200
+          regex+ET: 600 docs in 0.159s  3,774 docs/s  265.0 us/doc
+      form4_parser: 600 docs in 0.108s  5,568 docs/s  179.6 us/doc
+    speedup: 1.48x
+"""
+import argparse
+import glob
+import os
+import re
+import time
+import xml.etree.ElementTree as ET
+
+from form4_parser import parse_form4
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(__file__), "fixtures", "form4")
+
+
+def legacy_parse(raw):
+    """The pre-form4_parser path: decode, regex out the XML block, then ElementTree .// scans."""
+    content = raw.decode("utf-8", errors="replace")
+    match = re.search(r'(<\?xml[^>]*\?>.*?</ownershipDocument>)', content, flags=re.DOTALL)
+    if not match:
+        return None
+    root = ET.fromstring(match.group(1))
+    root.find(".//reportingOwner/reportingOwnerId/rptOwnerName")
+    root.find(".//issuer/issuerName")
+    root.find(".//periodOfReport")
+    rows = []
+    for trans in root.findall(".//nonDerivativeTable/nonDerivativeTransaction"):
+        rows.append((trans.find("./transactionDate/value"), trans.find("./securityTitle/value"),
+                     trans.find("./transactionCoding/transactionCode"),
+                     trans.find("./transactionAmounts/transactionShares/value"),
+                     trans.find("./transactionAmounts/transactionPricePerShare/value")))
+    return rows
+
+
+def run(name, func, corpus, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for raw in corpus:
+            func(raw)
+    elapsed = time.perf_counter() - start
+    docs = len(corpus) * repeat
+    print(f"{name:>14}: {docs} docs in {elapsed:.3f}s  {docs / elapsed:,.0f} docs/s  {elapsed / docs * 1e6:,.1f} us/doc")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Form 4 parsing")
+    parser.add_argument("corpus", nargs="?", default=DEFAULT_CORPUS, help="directory of .txt/.xml filings")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    paths = sorted(glob.glob(os.path.join(args.corpus, "*.txt")) + glob.glob(os.path.join(args.corpus, "*.xml")))
+    corpus = [open(p, "rb").read() for p in paths]
+    if not corpus:
+        raise SystemExit(f"No filings found in {args.corpus}")
+    print(f"{len(corpus)} filings, {sum(map(len, corpus)) / 1024:.1f} KiB, x{args.repeat}")
+    legacy = run("regex+ET", legacy_parse, corpus, args.repeat)
+    current = run("form4_parser", parse_form4, corpus, args.repeat)
+    print(f"speedup: {legacy / current:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
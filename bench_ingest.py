@@ -0,0 +1,258 @@
+"""
+End-to-end ingestion benchmark against fixture_server.py instead of the live sites.
+
+Starts the fixture server, points main.py at it (SEC_BASE_URL, SENATE_EFD_BASE), empties a
+separate benchmark database and runs one Form 4 pull (feed -> queue -> fetch -> parse ->
+insert) and optionally one Senate pull through the real code. Reports filings/sec, p50/p99
+per-filing latency, peak RSS and database rows/sec, appends them to a results file together
+with the git revision, and compares them with the last stored run of the same configuration.
+
+    python bench_ingest.py --filings 500 --latency 0.05
+    python bench_ingest.py --filings 500 --senate-reports 50 --error-rate 0.02 --fail-on-regression
+
+The document cache starts empty, so every document is downloaded from the fixture server.
+"""
+import argparse
+import datetime
+import json
+import math
+import os
+import subprocess
+import tempfile
+import threading
+import time
+
+import psutil
+
+from fixture_server import DEFAULT_CORPUS, FixtureServer, FixtureSite
+
+DEFAULT_DATABASE = "publictrades_bench"
+DEFAULT_RESULTS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_results.jsonl")
+# Emptied before every run; the counts after the run are the rows it stored
+BENCH_TABLES = ("filings", "filing_owners", "trades", "derivative_trades", "gov_officials", "gov_trades",
+                "all_trades", "persons", "person_aliases", "tracked_persons", "ingest_tasks", "ingest_cursor")
+# Compared with the previous run; True where higher is better
+TRACKED_RESULTS = {"filings_per_second": True, "p50_seconds": False, "p99_seconds": False,
+                   "rows_per_second": True, "peak_rss_mb": False}
+
+
+class PeakRSS:
+    """
+    Samples the resident memory of this process and its children on a background thread
+    """
+
+    def __init__(self, interval: float = 0.05):
+        """
+        Initialization
+        :param interval: seconds between samples
+        """
+        self.interval = interval
+        self.peak = 0
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def sample(self):
+        proc = psutil.Process()
+        total = 0
+        for p in [proc] + proc.children(recursive=True):
+            try:
+                total += p.memory_info().rss
+            except psutil.Error:
+                continue
+        self.peak = max(self.peak, total)
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            self.sample()
+
+    def __enter__(self):
+        self.sample()
+        self.thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stopped.set()
+        self.thread.join()
+        self.sample()
+
+    @property
+    def peak_mb(self) -> float:
+        return round(self.peak / (1024 * 1024), 1)
+
+
+def git_revision() -> dict:
+    root = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=root, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=root,
+                                    capture_output=True, text=True, check=True).stdout.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return {"commit": None, "dirty": None}
+    return {"commit": commit, "dirty": dirty}
+
+
+def reset_database(main):
+    with main.db_pool.connection() as conn:
+        conn.cursor().execute(f"TRUNCATE {', '.join(BENCH_TABLES)} RESTART IDENTITY CASCADE")
+
+
+def row_counts(main) -> dict:
+    with main.db_pool.connection() as conn:
+        c = conn.cursor()
+        counts = {}
+        for table in BENCH_TABLES:
+            c.execute(f"SELECT count(*) FROM {table}")
+            counts[table] = c.fetchone()[0]
+    return counts
+
+
+def measure(main, kind: str, run) -> dict:
+    """
+    Run one pull and summarize it
+    :param kind: ingest task kind whose throughput and per-task latency are reported
+    :param run: zero-argument callable doing the pull and returning its result
+    """
+    latency = main.TASK_SECONDS
+    before = row_counts(main)
+    stored_before = latency.totals().get((("kind", kind),), (0, 0))[0]
+    with PeakRSS() as rss:
+        started = time.perf_counter()
+        result = run()
+        wall = time.perf_counter() - started
+    rows = sum(row_counts(main).values()) - sum(before.values())
+    items = latency.totals().get((("kind", kind),), (0, 0))[0] - stored_before
+    p50, p99 = latency.quantile(0.5, kind=kind), latency.quantile(0.99, kind=kind)
+    return {
+        "items": items,
+        "wall_seconds": round(wall, 3),
+        "filings_per_second": round(items / wall, 2) if wall else None,  # reports for Senate
+        "p50_seconds": round(p50, 4) if p50 is not None else None,
+        "p99_seconds": round(p99, 4) if p99 is not None else None,
+        "rows": rows,
+        "rows_per_second": round(rows / wall, 1) if wall else None,
+        "peak_rss_mb": rss.peak_mb,
+        "result": result,
+    }
+
+
+def previous_run(path: str, config: dict):
+    if not os.path.exists(path):
+        return None
+    last = None
+    with open(path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("config") == config:
+                last = record
+    return last
+
+
+def compare(current: dict, previous: dict, tolerance: float) -> list:
+    """Descriptions of tracked results that got worse than `previous` by more than `tolerance`."""
+    regressions = []
+    for scenario, results in current["scenarios"].items():
+        before = previous.get("scenarios", {}).get(scenario)
+        if not before:
+            continue
+        for name, higher_is_better in TRACKED_RESULTS.items():
+            new, old = results.get(name), before.get(name)
+            if not new or not old:
+                continue
+            change = (new - old) / old
+            print(f"  {scenario}.{name}: {old} -> {new} ({change:+.1%})")
+            if (change < -tolerance) if higher_is_better else (change > tolerance):
+                regressions.append(f"{scenario}.{name} {old} -> {new} ({change:+.1%})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the ingest path against a local fixture server")
+    parser.add_argument("--filings", type=int, default=300, help="Form 4 filings listed in the feed")
+    parser.add_argument("--senate-reports", type=int, default=0, help="Senate PTRs to ingest (0 skips Senate)")
+    parser.add_argument("--senate-trades", type=int, default=10, help="transactions per Senate PTR")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="directory of recorded Form 4 submissions")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="up to this many extra seconds, uniformly")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests that fail")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--rate", type=float, default=0.0,
+                        help="requests per second allowed to the fixture host (0: unthrottled; 10 is SEC's limit)")
+    parser.add_argument("--database", default=DEFAULT_DATABASE, help="database to empty and fill")
+    parser.add_argument("--results", default=DEFAULT_RESULTS, help="JSON lines file the results are appended to")
+    parser.add_argument("--label", help="note stored with the results")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="relative change reported as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+    if args.database == "publictrades":
+        raise SystemExit("Refusing to empty the main database; pick another --database")
+
+    site = FixtureSite(args.corpus, args.filings, args.senate_reports, args.senate_trades, latency=args.latency,
+                       jitter=args.jitter, error_rate=args.error_rate, error_status=args.error_status)
+    server = FixtureServer(site).start()
+    os.environ["SEC_BASE_URL"] = server.base_url
+    os.environ["SENATE_EFD_BASE"] = server.base_url
+    os.environ["PUBLICTRADES_DB"] = args.database
+    os.environ["DOC_CACHE_DIR"] = tempfile.mkdtemp(prefix="bench-doc-cache-")
+    os.environ.pop("DOC_CACHE_REPLAY", None)
+
+    import main as app_main
+    from request_scheduler import HostPolicy
+
+    host = server.base_url.split("://", 1)[1]
+    if args.rate > 0:
+        app_main.request_scheduler.policies[host] = HostPolicy(rate=args.rate, burst=1)
+    else:
+        app_main.request_scheduler.policies[host] = HostPolicy(rate=1e6, burst=1000)
+    most = app_main.PULL_MAX_PAGES * app_main.increment
+    if args.filings > most:
+        print(f"[WARN] A pull reads at most {most} feed entries; {args.filings - most} filings will not be reached")
+
+    config = {key: getattr(args, key) for key in
+              ("filings", "senate_reports", "senate_trades", "latency", "jitter", "error_rate", "error_status", "rate")}
+    config["corpus"] = os.path.basename(os.path.normpath(args.corpus))
+    record = {"time": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+              **git_revision(), "label": args.label, "config": config, "scenarios": {}}
+
+    app_main.setup_schema()
+    reset_database(app_main)
+    try:
+        def form4():
+            result = app_main.run_form4_pull(None)
+            return {k: result[k] for k in ("processed", "inserted", "skipped", "failed")}
+        record["scenarios"]["form4"] = measure(app_main, app_main.FORM4_TASK, form4)
+        if args.senate_reports:
+            def senate():
+                pages = math.ceil(args.senate_reports / app_main.SENATE_PAGE_SIZE)
+                processed, inserted = app_main.scrape_senate_ptrs(pages=pages)
+                return {"processed": processed, "inserted": inserted}
+            record["scenarios"]["senate"] = measure(app_main, app_main.SENATE_TASK, senate)
+    finally:
+        server.stop()
+    record["server"] = site.stats()
+    record["breakdown"] = app_main.metrics.registry.since({})
+
+    for scenario, results in record["scenarios"].items():
+        print(f"{scenario}: {results['items']} in {results['wall_seconds']}s  "
+              f"{results['filings_per_second']}/s  p50 {results['p50_seconds']}s  p99 {results['p99_seconds']}s  "
+              f"{results['rows']} rows ({results['rows_per_second']}/s)  peak RSS {results['peak_rss_mb']} MB")
+    previous = previous_run(args.results, config)
+    regressions = []
+    if previous:
+        print(f"Compared with {previous.get('commit')} ({previous.get('time')}):")
+        regressions = compare(record, previous, args.tolerance)
+    with open(args.results, "a") as f:
+        f.write(json.dumps(record, default=str) + "\n")
+    print(f"[INFO] Results appended to {args.results}")
+    if regressions:
+        print("[WARN] Regressions beyond {:.0%}: {}".format(args.tolerance, "; ".join(regressions)))
+        if args.fail_on_regression:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
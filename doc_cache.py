@@ -0,0 +1,196 @@
+import datetime
+import hashlib
+import os
+import sqlite3
+import threading
+import zlib
+from dataclasses import dataclass
+from typing import Optional
+
+
+class CacheMiss(LookupError):
+    """
+    Raised in replay mode when a document is not in the cache
+    """
+
+
+@dataclass
+class CachedDocument:
+    key: str
+    content: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: str
+
+
+class DocumentCache:
+    """
+    On-disk cache of raw documents. Content is stored once per SHA-256 as a zlib-compressed
+    blob (blobs/ab/abcdef...), and a SQLite index maps keys (normally the document url) to
+    blobs together with the validators needed for conditional re-fetches. Least recently
+    used entries are evicted once the blobs exceed max_bytes.
+    """
+
+    def __init__(self, root: str, max_bytes: int = 2 * 1024 ** 3, replay: bool = False):
+        """
+        Initialization
+        :param root: cache directory, created on first use if missing
+        :param max_bytes: upper bound for the compressed blobs on disk
+        :param replay: serve documents only from the cache; fetchers raise CacheMiss instead
+            of touching the network
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        self.replay = replay
+        self.lock = threading.Lock()
+        self.open_lock = threading.Lock()
+        self._db = None
+
+    @property
+    def db(self):
+        """
+        SQLite index, created together with the cache directory on first use
+        """
+        if self._db is None:
+            with self.open_lock:
+                if self._db is None:
+                    self._db = self._open()
+        return self._db
+
+    def _open(self):
+        os.makedirs(os.path.join(self.root, "blobs"), exist_ok=True)
+        db = sqlite3.connect(os.path.join(self.root, "index.sqlite3"), check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.executescript("""
+            CREATE TABLE IF NOT EXISTS blobs (
+                sha256 TEXT PRIMARY KEY,
+                size INTEGER,
+                stored_size INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                sha256 TEXT REFERENCES blobs(sha256),
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at TEXT,
+                accessed_at TEXT
+            );
+            CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries(accessed_at);
+            CREATE INDEX IF NOT EXISTS entries_sha256 ON entries(sha256);
+        """)
+        db.commit()
+        return db
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+    def _blob_path(self, sha256: str) -> str:
+        return os.path.join(self.root, "blobs", sha256[:2], sha256)
+
+    def get(self, key: str) -> Optional[CachedDocument]:
+        """
+        Look up a document and mark it as recently used
+        :param key: cache key (document url)
+        :return: CachedDocument, or None if the key is not cached
+        """
+        with self.lock:
+            row = self.db.execute(
+                "SELECT sha256, etag, last_modified, fetched_at FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            sha256, etag, last_modified, fetched_at = row
+            try:
+                with open(self._blob_path(sha256), "rb") as f:
+                    content = zlib.decompress(f.read())
+            except (OSError, zlib.error):
+                # blob lost or damaged on disk; forget the entry so it is fetched again
+                self.db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self.db.commit()
+                return None
+            self.db.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (self._now(), key))
+            self.db.commit()
+        return CachedDocument(key, content, etag, last_modified, fetched_at)
+
+    def put(self, key: str, content: bytes, etag: str = None, last_modified: str = None) -> str:
+        """
+        Store a document, reusing the blob if identical content is already cached
+        :param key: cache key (document url)
+        :param content: raw document bytes
+        :param etag: ETag response header, if any
+        :param last_modified: Last-Modified response header, if any
+        :return: SHA-256 of the content
+        """
+        sha256 = hashlib.sha256(content).hexdigest()
+        path = self._blob_path(sha256)
+        now = self._now()
+        with self.lock:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                compressed = zlib.compress(content, 6)
+                tmp = f"{path}.{threading.get_ident()}.tmp"
+                with open(tmp, "wb") as f:
+                    f.write(compressed)
+                os.replace(tmp, path)
+                self.db.execute("INSERT OR REPLACE INTO blobs (sha256, size, stored_size) VALUES (?, ?, ?)",
+                                (sha256, len(content), len(compressed)))
+            self.db.execute("""
+                INSERT OR REPLACE INTO entries (key, sha256, etag, last_modified, fetched_at, accessed_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (key, sha256, etag, last_modified, now, now))
+            self.db.commit()
+            self._evict()
+        return sha256
+
+    def revalidated(self, key: str):
+        """
+        Record that the origin answered 304 Not Modified for a cached document
+        :param key: cache key
+        """
+        now = self._now()
+        with self.lock:
+            self.db.execute("UPDATE entries SET fetched_at = ?, accessed_at = ? WHERE key = ?", (now, now, key))
+            self.db.commit()
+
+    def keys(self, prefix: str = "") -> list:
+        """
+        Cached keys starting with prefix
+        """
+        with self.lock:
+            rows = self.db.execute("SELECT key FROM entries WHERE key >= ? AND key < ? ORDER BY key",
+                                   (prefix, prefix + "\uffff")).fetchall()
+        return [row[0] for row in rows]
+
+    def _evict(self):
+        # caller holds self.lock
+        total = self.db.execute("SELECT COALESCE(SUM(stored_size), 0) FROM blobs").fetchone()[0]
+        while total > self.max_bytes:
+            oldest = self.db.execute(
+                "SELECT key, sha256 FROM entries ORDER BY accessed_at LIMIT 100").fetchall()
+            if not oldest:
+                break
+            for key, sha256 in oldest:
+                self.db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                if self.db.execute("SELECT 1 FROM entries WHERE sha256 = ? LIMIT 1", (sha256,)).fetchone():
+                    continue  # blob still shared with another key
+                row = self.db.execute("SELECT stored_size FROM blobs WHERE sha256 = ?", (sha256,)).fetchone()
+                self.db.execute("DELETE FROM blobs WHERE sha256 = ?", (sha256,))
+                try:
+                    os.remove(self._blob_path(sha256))
+                except FileNotFoundError:
+                    pass
+                total -= row[0] if row else 0
+                if total <= self.max_bytes:
+                    break
+        self.db.commit()
+
+    def stats(self) -> dict:
+        """
+        Entry and blob counts and sizes
+        """
+        with self.lock:
+            entries = self.db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            blobs, size, stored = self.db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(stored_size), 0) FROM blobs").fetchone()
+        return {"entries": entries, "blobs": blobs, "bytes": size, "stored_bytes": stored,
+                "max_bytes": self.max_bytes, "replay": self.replay}
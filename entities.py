@@ -0,0 +1,286 @@
+"""
+Person resolution for insiders and government officials.
+
+SEC filings name owners "DOE JOHN A", disclosure sites say "John Doe" or "Hon. John A. Doe, Jr.".
+Every name is reduced to a key of its sorted significant tokens ("doe john") and resolved to a
+canonical row in `persons`: by reporting-owner CIK when the filing has one, otherwise by key.
+Exact matches are merged automatically; near matches (trigram similarity on the key or the same
+phonetic key) are only offered as candidates, to be merged with merge_persons once confirmed.
+"""
+import re
+import threading
+import unicodedata
+
+from psycopg2.extras import execute_values
+
+# Titles, honorifics and generational suffixes that do not tell people apart
+NAME_NOISE = {"jr", "sr", "ii", "iii", "iv", "md", "phd", "esq", "cpa", "cfa", "hon", "honorable",
+              "dr", "mr", "mrs", "ms", "senator", "rep", "representative"}
+SOUNDEX_CODES = {**dict.fromkeys("bfpv", "1"), **dict.fromkeys("cgjkqsxz", "2"), **dict.fromkeys("dt", "3"),
+                 "l": "4", **dict.fromkeys("mn", "5"), "r": "6"}
+# First key of the two-int advisory lock taken while creating a person for a name
+PERSON_LOCK_NAMESPACE = 7301
+MIN_CANDIDATE_SIMILARITY = 0.4
+
+
+def name_tokens(name: str) -> list:
+    """Lowercase ASCII tokens of a name without punctuation, initials and titles."""
+    if not name:
+        return []
+    name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode().lower()
+    name = re.sub(r"[^a-z\s]", " ", name.replace("'", "").replace("-", ""))
+    return [t for t in name.split() if len(t) > 1 and t not in NAME_NOISE]
+
+
+def name_key(name: str) -> str:
+    """Order-independent key of a name: "DOE JOHN A" and "John A. Doe, Jr." both give "doe john"."""
+    return " ".join(sorted(name_tokens(name)))
+
+
+def soundex(token: str) -> str:
+    codes = [SOUNDEX_CODES.get(ch, "") for ch in token]
+    result, previous = token[0].upper(), codes[0]
+    for ch, code in zip(token[1:], codes[1:]):
+        if code and code != previous:
+            result += code
+        if ch not in "hw":
+            previous = code
+    return (result + "000")[:4]
+
+
+def phonetic_key(name: str) -> str:
+    """Sorted Soundex codes of the name's tokens, so spelling variants ("Jon Do") share a key."""
+    return " ".join(sorted(soundex(t) for t in name_tokens(name)))
+
+
+def find_person(conn, name: str, cik: str = None):
+    """
+    Id of the person a name (and optional CIK) resolves to, or None if there is none yet
+    """
+    c = conn.cursor()
+    if cik:
+        c.execute("SELECT id FROM persons WHERE cik = %s", (cik,))
+        row = c.fetchone()
+        if row:
+            return row[0]
+    key = name_key(name)
+    if not key:
+        return None
+    # a person already tied to a different CIK is someone else with the same name
+    c.execute("""
+        SELECT p.id
+        FROM person_aliases a
+        JOIN persons p ON p.id = a.person_id
+        WHERE a.alias_key = %s AND (%s::text IS NULL OR p.cik IS NULL OR p.cik = %s)
+        ORDER BY p.cik IS NULL, p.id
+        LIMIT 1
+    """, (key, cik, cik))
+    row = c.fetchone()
+    return row[0] if row else None
+
+
+def add_alias(conn, person_id: int, name: str):
+    key = name_key(name)
+    if key:
+        conn.cursor().execute("""
+            INSERT INTO person_aliases (alias_key, person_id, alias) VALUES (%s, %s, %s)
+            ON CONFLICT (alias_key, person_id) DO NOTHING
+        """, (key, person_id, name))
+
+
+def create_person(conn, name: str, cik: str = None) -> int:
+    """
+    Id of the person for a name, inserting it (with its alias) unless a concurrent writer
+    already has; takes the name's advisory lock until conn's transaction ends
+    """
+    key = name_key(name)
+    c = conn.cursor()
+    # concurrent writers creating the same new name wait here and then find it
+    c.execute("SELECT pg_advisory_xact_lock(%s, hashtext(%s))", (PERSON_LOCK_NAMESPACE, cik or key))
+    person_id = find_person(conn, name, cik)
+    if person_id is None:
+        c.execute("""
+            INSERT INTO persons (canonical_name, name_key, phonetic_key, cik) VALUES (%s, %s, %s, %s)
+            ON CONFLICT (cik) DO UPDATE SET cik = EXCLUDED.cik
+            RETURNING id
+        """, (" ".join(name.split()) if name else cik, key, phonetic_key(name), cik))
+        person_id = c.fetchone()[0]
+    add_alias(conn, person_id, name)
+    return person_id
+
+
+class PersonCreator:
+    """
+    Creates persons in short transactions of their own on one dedicated connection, so the
+    name's lock and the new rows are committed at once instead of with the caller's batch
+    """
+
+    def __init__(self, connect):
+        """
+        Initialization
+        :param connect: zero-argument callable opening a new psycopg2 connection (on first use)
+        """
+        self.connect = connect
+        self.conn = None
+        self.lock = threading.Lock()
+
+    def create(self, name: str, cik: str = None) -> int:
+        """
+        create_person() committed on the dedicated connection
+        """
+        with self.lock:
+            if self.conn is None or self.conn.closed:
+                self.conn = self.connect()
+            try:
+                person_id = create_person(self.conn, name, cik)
+                self.conn.commit()
+            except Exception:
+                if not self.conn.closed:
+                    self.conn.rollback()
+                raise
+            return person_id
+
+
+def resolve_person(conn, name: str, cik: str = None, creator: PersonCreator = None):
+    """
+    Id of the canonical person for a name, creating it if needed
+    :param name: name as it appears in the source
+    :param cik: SEC reporting-owner CIK, when known
+    :param creator: creates new persons in their own committed transaction; without one they
+        are created in the caller's transaction, whose commit then ends the name's lock
+    :return: person id, or None for a name with no significant tokens and no CIK
+    """
+    cik = (cik or "").strip().lstrip("0") or None
+    person_id = find_person(conn, name, cik)
+    if person_id is None:
+        if not name_key(name) and not cik:
+            return None
+        return create_person(conn, name, cik) if creator is None else creator.create(name, cik)
+    if cik:
+        conn.cursor().execute("UPDATE persons SET cik = %s WHERE id = %s AND cik IS NULL", (cik, person_id))
+    add_alias(conn, person_id, name)
+    return person_id
+
+
+def person_candidates(conn, name: str, limit: int = 10) -> list:
+    """
+    People whose known names are similar to name (trigram similarity of the keys) or sound the
+    same, best match first, as dicts with id, name, cik and score
+    """
+    key = name_key(name)
+    if not key:
+        return []
+    c = conn.cursor()
+    c.execute("""
+        SELECT p.id, p.canonical_name, p.cik, max(similarity(a.alias_key, %s)) AS score
+        FROM persons p
+        JOIN person_aliases a ON a.person_id = p.id
+        WHERE p.id IN (
+            SELECT person_id FROM person_aliases WHERE alias_key %% %s AND similarity(alias_key, %s) >= %s
+            UNION
+            SELECT id FROM persons WHERE phonetic_key = %s
+        )
+        GROUP BY p.id, p.canonical_name, p.cik
+        ORDER BY score DESC, p.id
+        LIMIT %s
+    """, (key, key, key, MIN_CANDIDATE_SIMILARITY, phonetic_key(name), limit))
+    return [{"id": r[0], "name": r[1], "cik": r[2], "score": round(float(r[3]), 3)} for r in c.fetchall()]
+
+
+def merge_persons(conn, keep_id: int, drop_id: int):
+    """
+    Fold person drop_id into keep_id: references, aliases, tracking and CIK move over and
+    drop_id is deleted. Commits.
+    """
+    if keep_id == drop_id:
+        return
+    c = conn.cursor()
+    for table in ("filings", "filing_owners", "gov_officials", "all_trades"):
+        c.execute(f"UPDATE {table} SET person_id = %s WHERE person_id = %s", (keep_id, drop_id))
+    c.execute("""
+        INSERT INTO person_aliases (alias_key, person_id, alias)
+        SELECT alias_key, %s, alias FROM person_aliases WHERE person_id = %s
+        ON CONFLICT (alias_key, person_id) DO NOTHING
+    """, (keep_id, drop_id))
+    c.execute("""
+        INSERT INTO tracked_persons (person_id)
+        SELECT %s FROM tracked_persons WHERE person_id = %s
+        ON CONFLICT (person_id) DO NOTHING
+    """, (keep_id, drop_id))
+    c.execute("DELETE FROM persons WHERE id = %s RETURNING cik", (drop_id,))
+    row = c.fetchone()
+    if row and row[0]:
+        c.execute("UPDATE persons SET cik = %s WHERE id = %s AND cik IS NULL", (row[0], keep_id))
+    conn.commit()
+
+
+def _resolve_names(conn, select_sql: str, update_sql: str, batch: int) -> int:
+    """Resolve each distinct (name, cik) returned by select_sql and apply update_sql in batches."""
+    c = conn.cursor()
+    c.execute(select_sql)
+    names = c.fetchall()
+    for start in range(0, len(names), batch):
+        values = [(name, cik, resolve_person(conn, name, cik)) for name, cik in names[start:start + batch]]
+        execute_values(c, update_sql, [v for v in values if v[2] is not None])
+        conn.commit()
+    return len(names)
+
+
+def backfill_persons(conn, batch: int = 500) -> dict:
+    """
+    Resolve rows stored before person resolution (or while it failed) and move name-keyed
+    tracking to tracked_persons. Idempotent; with nothing left to do it costs a few index lookups.
+    """
+    counts = {}
+    # owners first: their CIKs anchor the people the filings and officials then resolve to
+    counts["filing_owners"] = _resolve_names(conn, """
+        SELECT DISTINCT name, cik FROM filing_owners WHERE person_id IS NULL AND name IS NOT NULL
+    """, """
+        UPDATE filing_owners fo SET person_id = v.person_id
+        FROM (VALUES %s) AS v(name, cik, person_id)
+        WHERE fo.person_id IS NULL AND fo.name = v.name AND fo.cik IS NOT DISTINCT FROM v.cik
+    """, batch)
+    c = conn.cursor()
+    c.execute("""
+        UPDATE filings f SET person_id = fo.person_id
+        FROM filing_owners fo
+        WHERE f.person_id IS NULL AND fo.filing_id = f.id AND fo.name = f.insider AND fo.person_id IS NOT NULL
+    """)
+    conn.commit()
+    counts["filings"] = _resolve_names(conn, """
+        SELECT DISTINCT insider, NULL FROM filings WHERE person_id IS NULL AND insider IS NOT NULL
+    """, """
+        UPDATE filings f SET person_id = v.person_id
+        FROM (VALUES %s) AS v(name, cik, person_id)
+        WHERE f.person_id IS NULL AND f.insider = v.name
+    """, batch)
+    counts["gov_officials"] = _resolve_names(conn, """
+        SELECT DISTINCT name, NULL FROM gov_officials WHERE person_id IS NULL AND name IS NOT NULL
+    """, """
+        UPDATE gov_officials go SET person_id = v.person_id
+        FROM (VALUES %s) AS v(name, cik, person_id)
+        WHERE go.person_id IS NULL AND go.name = v.name
+    """, batch)
+    c.execute("""
+        UPDATE all_trades a SET person_id = f.person_id
+        FROM trades t JOIN filings f ON t.filing_id = f.id
+        WHERE a.person_id IS NULL AND a.source = 'SEC' AND a.trade_id = t.id AND f.person_id IS NOT NULL
+    """)
+    counts["all_trades"] = c.rowcount
+    c.execute("""
+        UPDATE all_trades a SET person_id = go.person_id
+        FROM gov_trades gt JOIN gov_officials go ON gt.official_id = go.id
+        WHERE a.person_id IS NULL AND a.source = 'GOV' AND a.trade_id = gt.id AND go.person_id IS NOT NULL
+    """)
+    counts["all_trades"] += c.rowcount
+    c.execute("SELECT insider FROM tracked_insiders")
+    legacy = [r[0] for r in c.fetchall()]
+    for insider in legacy:
+        person_id = resolve_person(conn, insider)
+        if person_id is not None:
+            c.execute("INSERT INTO tracked_persons (person_id) VALUES (%s) ON CONFLICT (person_id) DO NOTHING",
+                      (person_id,))
+    c.execute("DELETE FROM tracked_insiders")
+    counts["tracked"] = len(legacy)
+    conn.commit()
+    return counts
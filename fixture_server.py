@@ -0,0 +1,289 @@
+"""
+Local stand-in for EDGAR and Senate eFD, for benchmarks and offline runs.
+
+Serves the getcurrent Form 4 feed, Form 4 submissions and the eFD agreement, search and PTR
+report pages that main.py reads. Documents come from recorded files: the Form 4 corpus in
+fixtures/form4 is repeated under synthetic accession numbers as many times as --filings asks,
+and Senate reports are generated with --senate-trades rows each. Any file under --mirror is
+served as-is at its path (e.g. MIRROR/Archives/edgar/data/...), ahead of the generated pages.
+Latency and failures can be injected to see how the ingest path copes.
+
+    python fixture_server.py --port 8931 --filings 500 --latency 0.05 --error-rate 0.02
+    SEC_BASE_URL=http://127.0.0.1:8931 SENATE_EFD_BASE=http://127.0.0.1:8931 python main.py
+"""
+import argparse
+import datetime
+import glob
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(__file__), "fixtures", "form4")
+# Accepted times count down from here, one filing per second, newest first like the live feed
+FEED_NEWEST = datetime.datetime(2024, 6, 28, 17, 30, 0)
+SENATE_NAMES = [("John", "Doe", "Doe, John (Senator)"), ("Jane", "Roe", "Roe, Jane (Senator)"),
+                ("Pat", "Smith", "Smith, Pat (Senator)")]
+SENATE_ASSETS = [("AAPL", "Apple Inc."), ("MSFT", "Microsoft Corporation"), ("NVDA", "NVIDIA Corporation"),
+                 ("XOM", "Exxon Mobil Corporation")]
+CSRF_TOKEN = "fixture-csrf-token"
+
+
+class FixtureSite:
+    """
+    Documents of the stand-in sites and the latency/error injection applied to every request
+    """
+
+    def __init__(self, corpus: str = DEFAULT_CORPUS, filings: int = 500, senate_reports: int = 50,
+                 senate_trades: int = 10, mirror: str = None, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, error_status: int = 503, retry_after: float = None, seed: int = 0):
+        """
+        Initialization
+        :param corpus: directory of recorded Form 4 submissions (.txt/.xml)
+        :param filings: number of filings listed in the feed, cycling through the corpus
+        :param senate_reports: number of PTRs returned by the eFD search
+        :param senate_trades: transactions per generated PTR
+        :param mirror: optional directory of recorded pages served by path
+        :param latency: seconds added before every response
+        :param jitter: up to this many seconds added on top of latency, uniformly
+        :param error_rate: fraction of requests answered with error_status instead
+        :param error_status: status of injected errors (e.g. 503, or 429 to exercise Retry-After)
+        :param retry_after: Retry-After seconds sent with injected errors (None sends none)
+        :param seed: seed of the error injection, so runs fail the same requests
+        """
+        paths = sorted(glob.glob(os.path.join(corpus, "*.txt")) + glob.glob(os.path.join(corpus, "*.xml")))
+        self.corpus = [open(p, "rb").read() for p in paths]
+        if not self.corpus:
+            raise ValueError(f"No Form 4 submissions in {corpus}")
+        self.filings = filings
+        self.senate_reports = senate_reports
+        self.senate_trades = senate_trades
+        self.mirror = mirror
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counts = {"requests": 0, "errors": 0}
+
+    # ---------------------- EDGAR ----------------------
+    @staticmethod
+    def accession(i: int) -> str:
+        return f"0009999999-24-{i:06d}"
+
+    def filing_path(self, i: int) -> str:
+        return f"/Archives/edgar/data/{1000000 + i % len(self.corpus)}/{self.accession(i)}.txt"
+
+    def feed_page(self, start: int, count: int) -> bytes:
+        """
+        A getcurrent page shaped like EDGAR's: the listing is the seventh table, one row per
+        filing with [html] and [text] links and the acceptance time
+        """
+        rows = []
+        for i in range(start, min(start + count, self.filings)):
+            path = self.filing_path(i)
+            accepted = FEED_NEWEST - datetime.timedelta(seconds=i)
+            rows.append(
+                f'<tr><td>4</td><td><a href="{path[:-4]}-index.htm">[html]</a><a href="{path}">[text]</a></td>'
+                f"<td>Statement of changes in beneficial ownership</td>"
+                f"<td>{accepted:%Y-%m-%d}<br>{accepted:%H:%M:%S}</td><td>{accepted:%Y-%m-%d}</td></tr>")
+        filler = "<table><tr><td></td></tr></table>" * 6
+        return (f"<html><body>{filler}<table><tr><th>Form</th><th>Description</th><th>Accepted</th>"
+                f"<th>Filing Date</th><th>File/Film No</th></tr>{''.join(rows)}</table></body></html>").encode()
+
+    def filing(self, path: str):
+        """Submission served at a filing_path(), or None"""
+        name = os.path.basename(path)
+        prefix = self.accession(0)[:-6]
+        if not (name.startswith(prefix) and name.endswith(".txt") and name[len(prefix):-4].isdigit()):
+            return None
+        i = int(name[len(prefix):-4])
+        return self.corpus[i % len(self.corpus)] if i < self.filings else None
+
+    # ---------------------- Senate eFD ----------------------
+    def search_home(self) -> bytes:
+        return (f'<html><body><form method="post"><input type="hidden" name="csrfmiddlewaretoken" '
+                f'value="{CSRF_TOKEN}"><input type="checkbox" name="prohibition_agreement" value="1">'
+                f"</form></body></html>").encode()
+
+    def search_results(self, start: int, length: int) -> bytes:
+        data = []
+        for i in range(start, min(start + length, self.senate_reports)):
+            first, last, office = SENATE_NAMES[i % len(SENATE_NAMES)]
+            filed = datetime.date(2024, 6, 28) - datetime.timedelta(days=i // 5)
+            link = f'<a href="/search/view/ptr/fixture-{i:06d}/" target="_blank">Periodic Transaction Report</a>'
+            data.append([first, last, office, link, f"{filed:%m/%d/%Y}"])
+        return json.dumps({"draw": 1, "recordsTotal": self.senate_reports,
+                           "recordsFiltered": self.senate_reports, "data": data}).encode()
+
+    def senate_report(self, report: str):
+        number = report[len("fixture-"):]
+        if not report.startswith("fixture-") or not number.isdigit():
+            return None
+        i = int(number)
+        if i >= self.senate_reports:
+            return None
+        rows = []
+        for n in range(self.senate_trades):
+            ticker, asset = SENATE_ASSETS[(i + n) % len(SENATE_ASSETS)]
+            date = datetime.date(2024, 6, 1) + datetime.timedelta(days=(i + n) % 27)
+            kind = "Purchase" if n % 2 else "Sale (Full)"
+            rows.append(
+                f"<tr><td>{n + 1}</td><td>{date:%m/%d/%Y}</td><td>Self</td>"
+                f'<td><a href="https://finance.yahoo.com/quote/?s={ticker}">{ticker}</a></td>'
+                f"<td>{asset}</td><td>Stock</td><td>{kind}</td><td>$1,001 - $15,000</td><td>--</td></tr>")
+        return (f"<html><body><h1>Periodic Transaction Report</h1><table><thead><tr><th>#</th>"
+                f"<th>Transaction Date</th><th>Owner</th><th>Ticker</th><th>Asset Name</th><th>Asset Type</th>"
+                f"<th>Type</th><th>Amount</th><th>Comment</th></tr></thead><tbody>{''.join(rows)}</tbody>"
+                f"</table></body></html>").encode()
+
+    # ---------------------- Injection ----------------------
+    def delay(self):
+        seconds = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def inject_error(self) -> bool:
+        with self.lock:
+            self.counts["requests"] += 1
+            failed = self.error_rate > 0 and self.random.random() < self.error_rate
+            if failed:
+                self.counts["errors"] += 1
+            return failed
+
+    def stats(self) -> dict:
+        with self.lock:
+            return dict(self.counts)
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    site = None  # FixtureSite, set on the subclass made by FixtureServer
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, body: bytes = b"", content_type: str = "text/html; charset=utf-8", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self, method: str):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        length = int(self.headers.get("Content-Length") or 0)
+        form = parse_qs(self.rfile.read(length).decode()) if length else {}
+        self.site.delay()
+        if self.site.inject_error():
+            headers = {}
+            if self.site.retry_after is not None:
+                headers["Retry-After"] = str(self.site.retry_after)
+            return self._send(self.site.error_status, b"injected error", headers=headers)
+        if self.site.mirror:
+            root = os.path.abspath(self.site.mirror)
+            local = os.path.abspath(os.path.join(root, url.path.lstrip("/")))
+            if local.startswith(root + os.sep) and os.path.isfile(local):
+                with open(local, "rb") as f:
+                    return self._send(200, f.read(), "application/octet-stream")
+        path = url.path
+        if path == "/cgi-bin/browse-edgar" and query.get("action") == ["getcurrent"]:
+            start = int(query.get("start", ["0"])[0])
+            count = int(query.get("count", ["100"])[0])
+            return self._send(200, self.site.feed_page(start, count))
+        if path.startswith("/Archives/"):
+            body = self.site.filing(path)
+            if body is not None:
+                return self._send(200, body, "text/plain")
+        if path == "/search/home/":
+            if method == "POST":
+                return self._send(200, b"<html><body>agreed</body></html>",
+                                  headers={"Set-Cookie": f"csrftoken={CSRF_TOKEN}; Path=/"})
+            return self._send(200, self.site.search_home())
+        if path == "/search/report/data/" and method == "POST":
+            start = int(form.get("start", ["0"])[0])
+            length = int(form.get("length", ["25"])[0])
+            return self._send(200, self.site.search_results(start, length), "application/json")
+        if path.startswith("/search/view/ptr/"):
+            body = self.site.senate_report(path.rstrip("/").rsplit("/", 1)[-1])
+            if body is not None:
+                return self._send(200, body)
+        self._send(404, b"not found")
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+
+class FixtureServer:
+    """
+    FixtureSite served over HTTP on a background thread
+    """
+
+    def __init__(self, site: FixtureSite, host: str = "127.0.0.1", port: int = 0):
+        """
+        Initialization
+        :param site: documents and injection settings
+        :param host: interface to bind
+        :param port: port to bind (0 picks a free one)
+        """
+        handler = type("BoundFixtureHandler", (FixtureHandler,), {"site": site})
+        self.site = site
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="fixture-server", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local stand-in for EDGAR and Senate eFD")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8931)
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS, help="directory of recorded Form 4 submissions")
+    parser.add_argument("--mirror", help="directory of recorded pages served by path")
+    parser.add_argument("--filings", type=int, default=500)
+    parser.add_argument("--senate-reports", type=int, default=50)
+    parser.add_argument("--senate-trades", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="up to this many extra seconds, uniformly")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests that fail")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--retry-after", type=float, help="Retry-After seconds sent with injected errors")
+    args = parser.parse_args()
+    site = FixtureSite(args.corpus, args.filings, args.senate_reports, args.senate_trades, args.mirror,
+                       args.latency, args.jitter, args.error_rate, args.error_status, args.retry_after)
+    server = FixtureServer(site, args.host, args.port)
+    print(f"[INFO] Serving {args.filings} filings and {args.senate_reports} Senate PTRs at {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+-- Tables as created by the original create_table_*.sql scripts; IF NOT EXISTS lets this run
+-- against databases set up before versioned migrations.
+CREATE TABLE IF NOT EXISTS filings (
+    id SERIAL PRIMARY KEY,
+    accession TEXT UNIQUE,
+    insider TEXT,
+    issuer TEXT,
+    filing_date DATE,
+    url TEXT
+);
+
+CREATE TABLE IF NOT EXISTS trades (
+    id SERIAL PRIMARY KEY,
+    filing_id INTEGER,
+    transaction_date DATE,
+    security_title TEXT,
+    transaction_type TEXT,
+    amount INTEGER,
+    price REAL,
+    FOREIGN KEY(filing_id) REFERENCES filings(id),
+    UNIQUE(filing_id, transaction_date, security_title, transaction_type, amount, price)
+);
+
+CREATE TABLE IF NOT EXISTS gov_officials (
+    id SERIAL PRIMARY KEY,
+    name TEXT,
+    role TEXT,
+    source_url TEXT,
+    UNIQUE(name, role)
+);
+
+CREATE TABLE IF NOT EXISTS gov_trades (
+    id SERIAL PRIMARY KEY,
+    official_id INTEGER,
+    transaction_date DATE,
+    security_title TEXT,
+    transaction_type TEXT,
+    amount INTEGER,
+    price REAL,
+    source_url TEXT,
+    FOREIGN KEY(official_id) REFERENCES gov_officials(id),
+    UNIQUE(official_id, transaction_date, security_title, transaction_type, amount)
+);
+
+CREATE TABLE IF NOT EXISTS tracked_insiders (
+    insider TEXT PRIMARY KEY
+);
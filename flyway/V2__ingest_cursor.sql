@@ -0,0 +1,7 @@
+-- Newest Form 4 feed entry already ingested, so pulls stop at filings seen before
+CREATE TABLE IF NOT EXISTS ingest_cursor (
+    source TEXT PRIMARY KEY,
+    last_accession TEXT,
+    last_accepted TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT now()
+);
@@ -0,0 +1,30 @@
+-- Every reporting owner of a Form 4 (joint filings) and its derivative table rows
+CREATE TABLE IF NOT EXISTS filing_owners (
+    id SERIAL PRIMARY KEY,
+    filing_id INTEGER,
+    cik TEXT,
+    name TEXT,
+    is_director BOOLEAN,
+    is_officer BOOLEAN,
+    is_ten_percent_owner BOOLEAN,
+    officer_title TEXT,
+    FOREIGN KEY(filing_id) REFERENCES filings(id),
+    UNIQUE(filing_id, name)
+);
+
+CREATE TABLE IF NOT EXISTS derivative_trades (
+    id SERIAL PRIMARY KEY,
+    filing_id INTEGER,
+    transaction_date DATE,
+    security_title TEXT,
+    transaction_type TEXT,
+    amount INTEGER,
+    price REAL,
+    exercise_price REAL,
+    exercise_date DATE,
+    expiration_date DATE,
+    underlying_title TEXT,
+    underlying_shares INTEGER,
+    FOREIGN KEY(filing_id) REFERENCES filings(id),
+    UNIQUE(filing_id, transaction_date, security_title, transaction_type, amount, exercise_price)
+);
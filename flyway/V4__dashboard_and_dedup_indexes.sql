@@ -0,0 +1,14 @@
+-- Join and sort keys of the dashboards (newest-first keyset pages on (transaction_date, id))
+CREATE INDEX IF NOT EXISTS trades_filing_id_idx ON trades (filing_id);
+CREATE INDEX IF NOT EXISTS trades_transaction_date_id_idx ON trades (transaction_date DESC, id DESC);
+CREATE INDEX IF NOT EXISTS filings_insider_idx ON filings (insider);
+CREATE INDEX IF NOT EXISTS gov_trades_official_id_idx ON gov_trades (official_id);
+CREATE INDEX IF NOT EXISTS gov_trades_transaction_date_id_idx ON gov_trades (transaction_date DESC, id DESC);
+CREATE INDEX IF NOT EXISTS gov_officials_name_idx ON gov_officials (name);
+
+-- Per-filing lookups of the Form 4 child tables
+CREATE INDEX IF NOT EXISTS filing_owners_filing_id_idx ON filing_owners (filing_id);
+CREATE INDEX IF NOT EXISTS derivative_trades_filing_id_idx ON derivative_trades (filing_id);
+
+-- Dedup of already ingested House/Senate reports (known_house_reports, cache replay)
+CREATE INDEX IF NOT EXISTS gov_trades_source_url_idx ON gov_trades (source_url);
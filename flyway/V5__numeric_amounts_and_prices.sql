@@ -0,0 +1,16 @@
+-- REAL kept only ~7 significant digits of prices, and INTEGER share counts overflow past 2^31.
+-- REAL values with up to six significant digits (nearly every stored price) cast to the same
+-- NUMERIC(18,4) a fresh insert produces, so the ON CONFLICT dedup keys keep matching.
+ALTER TABLE trades
+    ALTER COLUMN amount TYPE BIGINT,
+    ALTER COLUMN price TYPE NUMERIC(18, 4);
+
+ALTER TABLE derivative_trades
+    ALTER COLUMN amount TYPE BIGINT,
+    ALTER COLUMN price TYPE NUMERIC(18, 4),
+    ALTER COLUMN exercise_price TYPE NUMERIC(18, 4),
+    ALTER COLUMN underlying_shares TYPE BIGINT;
+
+ALTER TABLE gov_trades
+    ALTER COLUMN amount TYPE BIGINT,
+    ALTER COLUMN price TYPE NUMERIC(18, 4);
@@ -0,0 +1,36 @@
+-- SEC and government trades in one table, kept current by the insert path (add_all_trades)
+-- so the tracked dashboard is a single indexed, limited query.
+CREATE TABLE IF NOT EXISTS all_trades (
+    source TEXT NOT NULL,
+    trade_id INTEGER NOT NULL,
+    name TEXT,
+    detail TEXT,
+    transaction_date DATE,
+    security_title TEXT,
+    transaction_type TEXT,
+    amount BIGINT,
+    price NUMERIC(18, 4),
+    url TEXT,
+    PRIMARY KEY (source, trade_id)
+);
+
+CREATE INDEX IF NOT EXISTS all_trades_name_date_idx
+    ON all_trades (name, transaction_date DESC, source DESC, trade_id DESC);
+CREATE INDEX IF NOT EXISTS all_trades_date_idx
+    ON all_trades (transaction_date DESC, source DESC, trade_id DESC);
+
+INSERT INTO all_trades (source, trade_id, name, detail, transaction_date, security_title,
+                        transaction_type, amount, price, url)
+SELECT 'SEC', t.id, f.insider, f.issuer, t.transaction_date, t.security_title,
+       t.transaction_type, t.amount, t.price, f.url
+FROM trades t
+JOIN filings f ON t.filing_id = f.id
+ON CONFLICT DO NOTHING;
+
+INSERT INTO all_trades (source, trade_id, name, detail, transaction_date, security_title,
+                        transaction_type, amount, price, url)
+SELECT 'GOV', gt.id, go.name, go.role, gt.transaction_date, gt.security_title,
+       gt.transaction_type, gt.amount, gt.price, gt.source_url
+FROM gov_trades gt
+JOIN gov_officials go ON gt.official_id = go.id
+ON CONFLICT DO NOTHING;
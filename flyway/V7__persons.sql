@@ -0,0 +1,47 @@
+-- Entity resolution: every insider and official name is resolved to a canonical person
+-- (entities.resolve_person) and tracking, dashboards and all_trades join on person_id.
+-- Existing rows are resolved by entities.backfill_persons at startup.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE TABLE IF NOT EXISTS persons (
+    id SERIAL PRIMARY KEY,
+    canonical_name TEXT NOT NULL,
+    name_key TEXT NOT NULL,
+    phonetic_key TEXT,
+    cik TEXT UNIQUE,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+CREATE INDEX IF NOT EXISTS persons_phonetic_key_idx ON persons (phonetic_key);
+
+-- Normalized name variants seen for a person; the trigram index serves candidate searches
+CREATE TABLE IF NOT EXISTS person_aliases (
+    alias_key TEXT NOT NULL,
+    person_id INTEGER NOT NULL REFERENCES persons(id) ON DELETE CASCADE,
+    alias TEXT,
+    PRIMARY KEY (alias_key, person_id)
+);
+CREATE INDEX IF NOT EXISTS person_aliases_person_id_idx ON person_aliases (person_id);
+CREATE INDEX IF NOT EXISTS person_aliases_trgm_idx ON person_aliases USING GIN (alias_key gin_trgm_ops);
+
+CREATE TABLE IF NOT EXISTS tracked_persons (
+    person_id INTEGER PRIMARY KEY REFERENCES persons(id) ON DELETE CASCADE,
+    tracked_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+ALTER TABLE filings ADD COLUMN IF NOT EXISTS person_id INTEGER REFERENCES persons(id);
+ALTER TABLE filing_owners ADD COLUMN IF NOT EXISTS person_id INTEGER REFERENCES persons(id);
+ALTER TABLE gov_officials ADD COLUMN IF NOT EXISTS person_id INTEGER REFERENCES persons(id);
+ALTER TABLE all_trades ADD COLUMN IF NOT EXISTS person_id INTEGER;
+
+CREATE INDEX IF NOT EXISTS filings_person_id_idx ON filings (person_id);
+CREATE INDEX IF NOT EXISTS filing_owners_person_id_idx ON filing_owners (person_id);
+CREATE INDEX IF NOT EXISTS gov_officials_person_id_idx ON gov_officials (person_id);
+CREATE INDEX IF NOT EXISTS all_trades_person_date_idx
+    ON all_trades (person_id, transaction_date DESC, source DESC, trade_id DESC);
+DROP INDEX IF EXISTS all_trades_name_date_idx;
+
+-- Rows still waiting for backfill_persons, so the startup check is an index lookup
+CREATE INDEX IF NOT EXISTS filings_unresolved_idx ON filings (id) WHERE person_id IS NULL;
+CREATE INDEX IF NOT EXISTS filing_owners_unresolved_idx ON filing_owners (id) WHERE person_id IS NULL;
+CREATE INDEX IF NOT EXISTS gov_officials_unresolved_idx ON gov_officials (id) WHERE person_id IS NULL;
+CREATE INDEX IF NOT EXISTS all_trades_unresolved_idx ON all_trades (source, trade_id) WHERE person_id IS NULL;
@@ -0,0 +1,22 @@
+-- Persistent ingestion work queue (see work_queue.py): one row per document to ingest.
+CREATE TABLE IF NOT EXISTS ingest_tasks (
+    id BIGSERIAL PRIMARY KEY,
+    kind TEXT NOT NULL,
+    task_key TEXT NOT NULL,
+    payload JSONB NOT NULL DEFAULT '{}',
+    status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'running', 'done', 'failed')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    max_attempts INTEGER NOT NULL DEFAULT 5,
+    available_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    lease_owner TEXT,
+    lease_expires TIMESTAMPTZ,
+    last_error TEXT,
+    result JSONB,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    UNIQUE (kind, task_key)
+);
+
+-- Claiming reads only ready tasks and reclaiming only leased ones; done tasks stay out of both
+CREATE INDEX IF NOT EXISTS ingest_tasks_ready_idx ON ingest_tasks (kind, available_at, id) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS ingest_tasks_lease_idx ON ingest_tasks (kind, lease_expires) WHERE status = 'running';
@@ -0,0 +1,12 @@
+-- Every House PTR document a pull has handled, including paper-filed or empty reports that
+-- store no trades, so incremental pulls don't download and parse them again.
+CREATE TABLE IF NOT EXISTS house_reports_seen (
+    source_url TEXT PRIMARY KEY,
+    trades INTEGER NOT NULL DEFAULT 0,
+    seen_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- Reports stored before this table existed
+INSERT INTO house_reports_seen (source_url, trades)
+SELECT source_url, count(*) FROM gov_trades WHERE source_url LIKE '%/ptr-pdfs/%' GROUP BY source_url
+ON CONFLICT (source_url) DO NOTHING;
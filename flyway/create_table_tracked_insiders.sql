@@ -1,3 +0,0 @@
-CREATE TABLE IF NOT EXISTS tracked_insiders (
-    insider TEXT PRIMARY KEY
-)
\ No newline at end of file
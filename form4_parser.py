@@ -0,0 +1,265 @@
+import datetime
+import io
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Optional
+
+from lxml import etree
+
+ACCESSION_HEADER_RE = re.compile(rb"ACCESSION NUMBER:\s*([0-9\-]+)")
+DOC_START = b"<ownershipDocument"
+DOC_END = b"</ownershipDocument>"
+# Elements handled as soon as they are complete; everything else is only traversed
+RECORD_TAGS = (
+    "documentType", "periodOfReport", "issuer", "reportingOwner",
+    "nonDerivativeTransaction", "nonDerivativeHolding",
+    "derivativeTransaction", "derivativeHolding", "footnote",
+)
+# Containers whose children are records
+TABLE_TAGS = ("nonDerivativeTable", "derivativeTable", "footnotes")
+LARGE_FILING_BYTES = 1024 * 1024
+_local = threading.local()
+
+
+@dataclass
+class ReportingOwner:
+    cik: Optional[str]
+    name: Optional[str]
+    is_director: bool = False
+    is_officer: bool = False
+    is_ten_percent_owner: bool = False
+    officer_title: Optional[str] = None
+
+
+@dataclass
+class Transaction:
+    derivative: bool
+    security_title: Optional[str]
+    transaction_date: Optional[datetime.date]
+    code: Optional[str]
+    shares: Optional[float]
+    price: Optional[float]
+    acquired_disposed: Optional[str]
+    shares_owned_after: Optional[float]
+    direct_indirect: Optional[str]
+    exercise_price: Optional[float] = None
+    exercise_date: Optional[datetime.date] = None
+    expiration_date: Optional[datetime.date] = None
+    underlying_title: Optional[str] = None
+    underlying_shares: Optional[float] = None
+    footnote_ids: list = field(default_factory=list)
+
+
+@dataclass
+class Holding:
+    derivative: bool
+    security_title: Optional[str]
+    shares_owned: Optional[float]
+    direct_indirect: Optional[str]
+    nature_of_ownership: Optional[str] = None
+    exercise_price: Optional[float] = None
+    expiration_date: Optional[datetime.date] = None
+    underlying_title: Optional[str] = None
+    underlying_shares: Optional[float] = None
+    footnote_ids: list = field(default_factory=list)
+
+
+@dataclass
+class Form4Document:
+    accession: Optional[str] = None
+    document_type: Optional[str] = None
+    period_of_report: Optional[datetime.date] = None
+    issuer_cik: Optional[str] = None
+    issuer_name: Optional[str] = None
+    issuer_ticker: Optional[str] = None
+    owners: list = field(default_factory=list)
+    transactions: list = field(default_factory=list)
+    holdings: list = field(default_factory=list)
+    footnotes: dict = field(default_factory=dict)
+
+
+def _leaves(el):
+    """
+    Walk el once and map every leaf's path (e.g. 'transactionAmounts/transactionShares/value')
+    to its stripped text; footnoteId references are collected under '#footnotes'.
+    """
+    values = {}
+    footnotes = []
+    stack = [(el, "")]
+    while stack:
+        node, prefix = stack.pop()
+        for child in node:
+            tag = child.tag
+            if not isinstance(tag, str):
+                continue  # comments / processing instructions
+            if tag == "footnoteId":
+                ref = child.get("id")
+                if ref and ref not in footnotes:
+                    footnotes.append(ref)
+                continue
+            if len(child):
+                stack.append((child, prefix + tag + "/"))
+                continue
+            text = child.text
+            if text:
+                text = text.strip()
+                if text:
+                    values[prefix + tag] = text
+    values["#footnotes"] = footnotes
+    return values
+
+
+def _float(value):
+    if value is None:
+        return None
+    try:
+        return float(value.replace(",", ""))
+    except ValueError:
+        return None
+
+
+def _date(value):
+    if value is None:
+        return None
+    try:
+        return datetime.date.fromisoformat(value[:10])  # drops any timezone suffix
+    except ValueError:
+        return None
+
+
+def _flag(value):
+    return value in ("1", "true", "True")
+
+
+def _owner(el):
+    v = _leaves(el)
+    return ReportingOwner(
+        cik=v.get("reportingOwnerId/rptOwnerCik"),
+        name=v.get("reportingOwnerId/rptOwnerName"),
+        is_director=_flag(v.get("reportingOwnerRelationship/isDirector")),
+        is_officer=_flag(v.get("reportingOwnerRelationship/isOfficer")),
+        is_ten_percent_owner=_flag(v.get("reportingOwnerRelationship/isTenPercentOwner")),
+        officer_title=v.get("reportingOwnerRelationship/officerTitle"),
+    )
+
+
+def _transaction(el, derivative):
+    v = _leaves(el)
+    return Transaction(
+        derivative=derivative,
+        security_title=v.get("securityTitle/value"),
+        transaction_date=_date(v.get("transactionDate/value")),
+        code=v.get("transactionCoding/transactionCode"),
+        shares=_float(v.get("transactionAmounts/transactionShares/value")),
+        price=_float(v.get("transactionAmounts/transactionPricePerShare/value")),
+        acquired_disposed=v.get("transactionAmounts/transactionAcquiredDisposedCode/value"),
+        shares_owned_after=_float(v.get("postTransactionAmounts/sharesOwnedFollowingTransaction/value")),
+        direct_indirect=v.get("ownershipNature/directOrIndirectOwnership/value"),
+        exercise_price=_float(v.get("conversionOrExercisePrice/value")),
+        exercise_date=_date(v.get("exerciseDate/value")),
+        expiration_date=_date(v.get("expirationDate/value")),
+        underlying_title=v.get("underlyingSecurity/underlyingSecurityTitle/value"),
+        underlying_shares=_float(v.get("underlyingSecurity/underlyingSecurityShares/value")),
+        footnote_ids=v["#footnotes"],
+    )
+
+
+def _holding(el, derivative):
+    v = _leaves(el)
+    return Holding(
+        derivative=derivative,
+        security_title=v.get("securityTitle/value"),
+        shares_owned=_float(v.get("postTransactionAmounts/sharesOwnedFollowingTransaction/value")),
+        direct_indirect=v.get("ownershipNature/directOrIndirectOwnership/value"),
+        nature_of_ownership=v.get("ownershipNature/natureOfOwnership/value"),
+        exercise_price=_float(v.get("conversionOrExercisePrice/value")),
+        expiration_date=_date(v.get("expirationDate/value")),
+        underlying_title=v.get("underlyingSecurity/underlyingSecurityTitle/value"),
+        underlying_shares=_float(v.get("underlyingSecurity/underlyingSecurityShares/value")),
+        footnote_ids=v["#footnotes"],
+    )
+
+
+def _handle(doc, el):
+    """Add one record element (see RECORD_TAGS) to doc."""
+    tag = el.tag
+    if tag == "nonDerivativeTransaction":
+        doc.transactions.append(_transaction(el, derivative=False))
+    elif tag == "derivativeTransaction":
+        doc.transactions.append(_transaction(el, derivative=True))
+    elif tag == "nonDerivativeHolding":
+        doc.holdings.append(_holding(el, derivative=False))
+    elif tag == "derivativeHolding":
+        doc.holdings.append(_holding(el, derivative=True))
+    elif tag == "reportingOwner":
+        doc.owners.append(_owner(el))
+    elif tag == "footnote":
+        doc.footnotes[el.get("id")] = " ".join("".join(el.itertext()).split())
+    elif tag == "issuer":
+        v = _leaves(el)
+        doc.issuer_cik = v.get("issuerCik")
+        doc.issuer_name = v.get("issuerName")
+        doc.issuer_ticker = v.get("issuerTradingSymbol")
+    elif tag == "periodOfReport":
+        doc.period_of_report = _date((el.text or "").strip() or None)
+    elif tag == "documentType":
+        doc.document_type = (el.text or "").strip() or None
+
+
+def extract_ownership_xml(raw: bytes):
+    """
+    Slice the <ownershipDocument> element out of a full EDGAR submission (.txt) or a bare
+    Form 4 XML file. Returns None if the document has no ownershipDocument.
+    """
+    start = raw.find(DOC_START)
+    if start < 0:
+        return None
+    end = raw.find(DOC_END, start)
+    if end < 0:
+        return None
+    return raw[start:end + len(DOC_END)]
+
+
+def _parser():
+    # lxml parsers must not be shared between threads
+    parser = getattr(_local, "parser", None)
+    if parser is None:
+        parser = _local.parser = etree.XMLParser(
+            recover=True, resolve_entities=False, no_network=True, remove_comments=True, huge_tree=True)
+    return parser
+
+
+def parse_form4(raw) -> Optional[Form4Document]:
+    """
+    Parse a Form 4 submission in a single pass over its elements. Filings larger than
+    LARGE_FILING_BYTES are streamed with iterparse so they are never fully held as a tree.
+    :param raw: submission bytes (str is encoded as UTF-8)
+    :return: Form4Document, or None if the input has no ownershipDocument
+    """
+    if isinstance(raw, str):
+        raw = raw.encode("utf-8")
+    xml = extract_ownership_xml(raw)
+    if xml is None:
+        return None
+    doc = Form4Document()
+    header = ACCESSION_HEADER_RE.search(raw, 0, raw.find(DOC_START))
+    if header:
+        doc.accession = header.group(1).decode("ascii")
+    if len(xml) > LARGE_FILING_BYTES:
+        events = etree.iterparse(io.BytesIO(xml), events=("end",), tag=RECORD_TAGS, recover=True,
+                                 resolve_entities=False, no_network=True, huge_tree=True)
+        for _, el in events:
+            _handle(doc, el)
+            el.clear()
+        return doc
+    root = etree.fromstring(xml, _parser())
+    if root is None:
+        return None
+    for child in root:
+        if child.tag in TABLE_TAGS:
+            for row in child:
+                _handle(doc, row)
+        else:
+            _handle(doc, child)
+    return doc
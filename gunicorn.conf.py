@@ -0,0 +1,16 @@
+"""
+Gunicorn settings, read from the working directory by `gunicorn 'main:create_app()'`.
+
+Every open dashboard keeps a /feed event stream open. With threaded workers a stream holds one
+thread, and only until main.STREAM_MAX_SECONDS ends it; a sync worker would be held whole.
+
+Exactly one worker process: the job registry, the one-pull-per-name guard and the page caches
+live in that process, so a second worker would 404 on /jobs/<id> and could run the same pull
+twice. Scale with GUNICORN_THREADS; queue_worker.py processes take the ingest load.
+"""
+import os
+
+worker_class = "gthread"
+workers = 1
+threads = int(os.environ.get("GUNICORN_THREADS", 32))
+bind = os.environ.get("GUNICORN_BIND", "127.0.0.1:5050")
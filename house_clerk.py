@@ -0,0 +1,170 @@
+"""
+House Clerk financial disclosure source.
+
+The Clerk publishes one ZIP per year (public_disc/financial-pdfs/<year>FD.zip) holding an XML
+index of every disclosure filed that year; periodic transaction reports (FilingType P) link to
+a PDF at public_disc/ptr-pdfs/<year>/<DocID>.pdf. The base location can be the live site or a
+local directory with the same layout (see fixtures/house):
+
+    python house_clerk.py --base fixtures/house --year 2024
+"""
+import argparse
+import datetime
+import io
+import json
+import os
+import re
+import zipfile
+from dataclasses import dataclass
+from typing import Optional
+
+from lxml import etree
+
+HOUSE_URL = "https://disclosures-clerk.house.gov"
+PTR_FILING_TYPE = "P"
+TRANSACTION_TYPES = {"P": "Purchase", "S": "Sale", "S (partial)": "Sale (Partial)", "E": "Exchange"}
+# One transaction row of an electronically filed PTR as laid out by PDF text extraction:
+#   SP Apple Inc. - Common Stock (AAPL) [ST] S (partial) 01/02/2024 01/16/2024 $1,001 - $15,000
+# Cells after the asset type may wrap onto the following lines.
+PTR_ROW_RE = re.compile(
+    r"\[(?P<asset_type>[A-Z]{2})\]\s+(?P<ttype>S \(partial\)|P|S|E)\s+"
+    r"(?P<date>\d{1,2}/\d{1,2}/\d{4})\s+(?P<notified>\d{1,2}/\d{1,2}/\d{4})\s+"
+    r"(?P<amount>Over \$[\d,]+|\$[\d,]+(?:\s*-\s*\$[\d,]+)?)"
+)
+OWNER_RE = re.compile(r"^(?:SP|JT|DC)\s+")
+
+
+@dataclass
+class HouseFiling:
+    doc_id: str
+    year: int
+    filing_type: str
+    first: str
+    last: str
+    state_district: Optional[str] = None
+    filing_date: Optional[datetime.date] = None
+
+    @property
+    def name(self) -> str:
+        return f"{self.first} {self.last}".strip()
+
+    @property
+    def pdf_path(self) -> str:
+        return f"public_disc/ptr-pdfs/{self.year}/{self.doc_id}.pdf"
+
+
+class HouseClerkSource:
+    """
+    Reads the yearly disclosure index and PTR documents from the Clerk's site or a local mirror
+    """
+
+    def __init__(self, base: str = HOUSE_URL, fetcher=None):
+        """
+        Initialization
+        :param base: site root url, or a local directory laid out like the site
+        :param fetcher: SECFetcher-like client (get(url, revalidate)) used when base is a url
+        """
+        self.base = base.rstrip("/")
+        self.local = not re.match(r"https?://", self.base)
+        self.fetcher = fetcher
+        if not self.local and fetcher is None:
+            raise ValueError("a fetcher is required for a remote House Clerk base url")
+
+    def url(self, path: str) -> str:
+        return os.path.join(self.base, path) if self.local else f"{self.base}/{path}"
+
+    def read(self, path: str, revalidate: bool = False) -> bytes:
+        """
+        Raw bytes of a file below the base location
+        :param revalidate: True for files that change (the yearly index ZIP); PTR PDFs never do
+        """
+        if self.local:
+            with open(os.path.join(self.base, path), "rb") as f:
+                return f.read()
+        return self.fetcher.get(self.url(path), revalidate=revalidate)
+
+    def filings(self, year: int, filing_types=(PTR_FILING_TYPE,)) -> list:
+        """
+        Filings listed in a year's index, oldest first
+        :param year: filing year
+        :param filing_types: FilingType codes to keep (P = periodic transaction report)
+        """
+        archive = zipfile.ZipFile(io.BytesIO(self.read(f"public_disc/financial-pdfs/{year}FD.zip", revalidate=True)))
+        xml_name = next(name for name in archive.namelist() if name.lower().endswith(".xml"))
+        root = etree.fromstring(archive.read(xml_name))
+        filings = []
+        for member in root.iter("Member"):
+            def text(tag):
+                value = member.findtext(tag)
+                return value.strip() if value and value.strip() else None
+            if text("FilingType") not in filing_types or not text("DocID"):
+                continue
+            try:
+                filing_date = datetime.datetime.strptime(text("FilingDate") or "", "%m/%d/%Y").date()
+            except ValueError:
+                filing_date = None
+            filings.append(HouseFiling(
+                doc_id=text("DocID"),
+                year=int(text("Year") or year),
+                filing_type=text("FilingType"),
+                first=text("First") or "",
+                last=text("Last") or "",
+                state_district=text("StateDst"),
+                filing_date=filing_date,
+            ))
+        filings.sort(key=lambda f: (f.filing_date or datetime.date.min, f.doc_id))
+        return filings
+
+
+def pdf_text(content: bytes) -> str:
+    from pypdf import PdfReader  # only the PTR parser workers need it
+    reader = PdfReader(io.BytesIO(content))
+    return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+def amount_midpoint(amount: str) -> Optional[float]:
+    """Midpoint of a disclosed range ("$1,001 - $15,000"); the bound itself for "Over $X"."""
+    bounds = [float(v.replace(",", "")) for v in re.findall(r"\$([\d,]+)", amount)]
+    if not bounds:
+        return None
+    return round(sum(bounds) / len(bounds), 2)
+
+
+def parse_ptr_pdf(content: bytes) -> list:
+    """
+    Transactions of an electronically filed House PTR as (date, title, ttype, amount, price) rows,
+    the shape insert_gov_trades expects. Scanned paper filings have no text layer and give [].
+    """
+    text = pdf_text(content)
+    trades = []
+    for match in PTR_ROW_RE.finditer(text):
+        line_start = text.rfind("\n", 0, match.start()) + 1
+        asset = OWNER_RE.sub("", text[line_start:match.start()].strip())
+        if not asset or asset.startswith("("):
+            # the asset cell wrapped; the start of its name is on the line before the asset type
+            previous = text.rfind("\n", 0, max(line_start - 1, 0)) + 1
+            asset = OWNER_RE.sub("", text[previous:line_start].strip()) + " " + asset
+        date = datetime.datetime.strptime(match.group("date"), "%m/%d/%Y").strftime("%Y-%m-%d")
+        trades.append((date, " ".join(asset.split()), TRANSACTION_TYPES[match.group("ttype")],
+                       amount_midpoint(match.group("amount")), "N/A"))
+    return trades
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List House PTR transactions from a Clerk site or mirror")
+    parser.add_argument("--base", default=HOUSE_URL, help="site url or local directory laid out like the site")
+    parser.add_argument("--year", type=int, default=datetime.date.today().year)
+    parser.add_argument("--limit", type=int, default=None)
+    args = parser.parse_args()
+    fetcher = None
+    if re.match(r"https?://", args.base):
+        from sec_fetcher import SECFetcher
+        fetcher = SECFetcher({"User-Agent": "GovTradeMonitor/1.0"})
+    source = HouseClerkSource(args.base, fetcher)
+    for filing in source.filings(args.year)[:args.limit]:
+        trades = parse_ptr_pdf(source.read(filing.pdf_path))
+        print(json.dumps({"doc_id": filing.doc_id, "name": filing.name, "trades": trades}))
+
+
+if __name__ == "__main__":
+    main()
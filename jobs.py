@@ -0,0 +1,168 @@
+import collections
+import datetime
+import threading
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Job:
+    """
+    A background job and its progress counters
+    """
+
+    def __init__(self, name: str):
+        """
+        Initialization
+        :param name: job kind; only one job per name runs at a time
+        """
+        self.id = uuid.uuid4().hex
+        self.name = name
+        self.status = "queued"
+        self.progress = collections.Counter()
+        self.result = None
+        self.error = None
+        self.created = datetime.datetime.now(datetime.timezone.utc)
+        self.started = None
+        self.finished = None
+        self.stats_source = None
+        self.version = 0
+        self.changed = threading.Condition()
+
+    def _touch(self):
+        with self.changed:
+            self.version += 1
+            self.changed.notify_all()
+
+    def update(self, **deltas):
+        """
+        Add to progress counters, e.g. job.update(pages=1, inserted=12)
+        """
+        with self.changed:
+            self.progress.update(deltas)
+        self._touch()
+
+    def attach_stats(self, source):
+        """
+        Report live counters from a callable (e.g. Pipeline.stats) while the job runs
+        :param source: zero-argument callable returning a dict
+        """
+        self.stats_source = source
+        self._touch()
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("finished", "failed")
+
+    def wait_for_change(self, version: int, timeout: float) -> int:
+        """
+        Block until the job changes after `version` or the timeout expires; returns the current version
+        """
+        with self.changed:
+            self.changed.wait_for(lambda: self.version != version or self.done, timeout=timeout)
+            return self.version
+
+    def snapshot(self) -> dict:
+        stats = None
+        if self.stats_source is not None:
+            try:
+                stats = self.stats_source()
+            except Exception:
+                stats = None
+        return {
+            "id": self.id,
+            "name": self.name,
+            "status": self.status,
+            "progress": dict(self.progress),
+            "stages": stats,
+            "result": self.result,
+            "error": self.error,
+            "created": self.created.isoformat(),
+            "started": self.started.isoformat() if self.started else None,
+            "finished": self.finished.isoformat() if self.finished else None,
+        }
+
+
+class JobManager:
+    """
+    Runs jobs on a small thread pool, never more than one per job name, and optionally on a schedule
+    """
+
+    def __init__(self, max_workers: int = 2, keep: int = 50):
+        """
+        Initialization
+        :param max_workers: jobs that may run at the same time
+        :param keep: number of jobs remembered for status lookups
+        """
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self.jobs = collections.OrderedDict()
+        self.active = {}
+        self.keep = keep
+        self.lock = threading.Lock()
+        self.schedules = []
+
+    def submit(self, name: str, func):
+        """
+        Queue func(job) unless a job with the same name is already queued or running
+        :param name: job kind
+        :param func: callable taking the Job and returning a JSON-serialisable result
+        :return: (job, created) where created is False if an existing job was returned
+        """
+        with self.lock:
+            running = self.active.get(name)
+            if running is not None and not running.done:
+                return running, False
+            job = Job(name)
+            self.active[name] = job
+            self.jobs[job.id] = job
+            while len(self.jobs) > self.keep:
+                self.jobs.popitem(last=False)
+        self.executor.submit(self._run, job, func)
+        return job, True
+
+    def _run(self, job: Job, func):
+        job.status = "running"
+        job.started = datetime.datetime.now(datetime.timezone.utc)
+        job._touch()
+        try:
+            job.result = func(job)
+            job.status = "finished"
+        except Exception as e:
+            traceback.print_exc()
+            job.error = str(e)
+            job.status = "failed"
+        job.finished = datetime.datetime.now(datetime.timezone.utc)
+        job._touch()
+
+    def get(self, job_id: str):
+        with self.lock:
+            return self.jobs.get(job_id)
+
+    def list(self) -> list:
+        with self.lock:
+            return [job.snapshot() for job in reversed(self.jobs.values())]
+
+    def schedule(self, name: str, func, interval_seconds: float):
+        """
+        Submit func every interval_seconds; a tick is skipped while the previous run is still going
+        :param name: job kind
+        :param func: callable taking the Job
+        :param interval_seconds: seconds between runs
+        """
+        stop = threading.Event()
+
+        def loop():
+            while not stop.wait(interval_seconds):
+                job, created = self.submit(name, func)
+                if not created:
+                    print(f"[INFO] Skipping scheduled {name}: job {job.id} still {job.status}")
+
+        thread = threading.Thread(target=loop, name=f"schedule-{name}", daemon=True)
+        thread.start()
+        self.schedules.append(stop)
+        return stop
+
+    def shutdown(self):
+        for stop in self.schedules:
+            stop.set()
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,198 @@
+"""
+Live trade feed for the dashboards.
+
+The insert path queues a Postgres NOTIFY on FEED_CHANNEL in the same transaction as the rows it
+stores, so an event is only delivered once the batch commits (and never for a rolled-back one).
+One FeedListener per process LISTENs on the channel, loads each batch's rows with a single query
+and hands them to a Broadcaster, which keeps a short history and wakes every connected client.
+Clients only filter events in memory, so the database sees one query per batch however many
+dashboards are open. Every notification also reaches the listener's on_notify callback, which is
+how a process learns about writes committed by other processes (queue workers, backfills).
+"""
+import collections
+import json
+import select
+import threading
+import time
+
+import psycopg2
+import psycopg2.extensions
+
+FEED_CHANNEL = "trade_feed"
+# NOTIFY payloads are limited to 8000 bytes; larger batches are split
+NOTIFY_IDS_PER_EVENT = 500
+
+
+def notify(conn, event: dict):
+    """
+    Queue a feed event on conn's current transaction; it is delivered when the transaction commits
+    :param event: {"type": "trades", "source": ..., "ids": [...]} or
+                  {"type": "tracking", "person_id": ..., "name": ..., "tracked": ...}
+    """
+    c = conn.cursor()
+    if event.get("type") == "trades":
+        ids = list(event["ids"])
+        for start in range(0, len(ids), NOTIFY_IDS_PER_EVENT):
+            chunk = dict(event, ids=ids[start:start + NOTIFY_IDS_PER_EVENT])
+            c.execute("SELECT pg_notify(%s, %s)", (FEED_CHANNEL, json.dumps(chunk)))
+    else:
+        c.execute("SELECT pg_notify(%s, %s)", (FEED_CHANNEL, json.dumps(event)))
+
+
+class Broadcaster:
+    """
+    In-process fan-out of feed events to any number of waiting clients, with a bounded
+    history so a reconnecting client (SSE Last-Event-ID) can catch up
+    """
+
+    def __init__(self, history: int = 1000):
+        """
+        Initialization
+        :param history: number of recent events kept for clients that fall behind or reconnect
+        """
+        self.events = collections.deque(maxlen=history)
+        self.seq = 0
+        self.tracked = set()
+        self.changed = threading.Condition()
+
+    def publish(self, kind: str, data: dict) -> int:
+        """
+        Add an event and wake every waiting client; returns its sequence number
+        """
+        with self.changed:
+            if kind == "tracking":
+                if data["tracked"]:
+                    self.tracked.add(data["person_id"])
+                else:
+                    self.tracked.discard(data["person_id"])
+            self.seq += 1
+            self.events.append((self.seq, kind, data))
+            self.changed.notify_all()
+            return self.seq
+
+    def set_tracked(self, person_ids):
+        with self.changed:
+            self.tracked = set(person_ids)
+
+    def is_tracked(self, person_id: int) -> bool:
+        with self.changed:
+            return person_id in self.tracked
+
+    def events_after(self, seq: int, timeout: float) -> list:
+        """
+        Events newer than seq, waiting up to timeout seconds for one to arrive
+        :return: list of (seq, kind, data), empty on timeout
+        """
+        with self.changed:
+            self.changed.wait_for(lambda: self.seq > seq, timeout=timeout)
+            return [event for event in self.events if event[0] > seq]
+
+    def stats(self) -> dict:
+        with self.changed:
+            return {"seq": self.seq, "history": len(self.events), "tracked": len(self.tracked)}
+
+
+class FeedFilter:
+    """
+    What one client wants from the feed
+    """
+
+    def __init__(self, sources=None, names=None, tracked_only: bool = False):
+        """
+        Initialization
+        :param sources: trade sources to receive ("SEC", "GOV"); None for all
+        :param names: only trades of these names; None for all
+        :param tracked_only: only trades of currently tracked people
+        """
+        self.sources = set(sources) if sources else None
+        self.names = set(names) if names else None
+        self.tracked_only = tracked_only
+
+    def rows(self, broadcaster: Broadcaster, data: dict) -> list:
+        """
+        Rows of a trades event this client should see
+        """
+        if self.sources is not None and data["source"] not in self.sources:
+            return []
+        return [row for row in data["rows"]
+                if (self.names is None or row["name"] in self.names)
+                and (not self.tracked_only or broadcaster.is_tracked(row["person_id"]))]
+
+
+class FeedListener:
+    """
+    Background thread that LISTENs on FEED_CHANNEL and publishes each notification to a Broadcaster
+    """
+
+    def __init__(self, connect_kwargs: dict, broadcaster: Broadcaster, load_trades, load_tracked,
+                 retry_seconds: float = 5, on_notify=None):
+        """
+        Initialization
+        :param connect_kwargs: psycopg2.connect arguments for the listening connection, or a
+            zero-argument callable returning them (read when the thread starts)
+        :param broadcaster: receives the events
+        :param load_trades: load_trades(conn, source, ids) -> list of row dicts for a trades event
+        :param load_tracked: load_tracked(conn) -> iterable of tracked person ids
+        :param retry_seconds: pause before reconnecting after the connection drops
+        :param on_notify: optional zero-argument callable run for every notification, and after
+            each (re)connect since notifications sent while disconnected are lost
+        """
+        self.connect_kwargs = connect_kwargs
+        self.broadcaster = broadcaster
+        self.load_trades = load_trades
+        self.load_tracked = load_tracked
+        self.retry_seconds = retry_seconds
+        self.on_notify = on_notify
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def ensure_started(self):
+        """
+        Start the listener thread on first use
+        """
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="feed-listener", daemon=True)
+                self.thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                self._listen()
+            except (psycopg2.Error, OSError) as e:
+                print(f"[WARN] Live feed listener lost its connection: {e}")
+                time.sleep(self.retry_seconds)
+
+    def _listen(self):
+        kwargs = self.connect_kwargs() if callable(self.connect_kwargs) else self.connect_kwargs
+        conn = psycopg2.connect(**kwargs)
+        try:
+            conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+            conn.cursor().execute(f"LISTEN {FEED_CHANNEL}")
+            # loaded after LISTEN so no tracking change can fall between the two
+            self.broadcaster.set_tracked(self.load_tracked(conn))
+            if self.on_notify:
+                self.on_notify()
+            while True:
+                if select.select([conn], [], [], 60) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    self._dispatch(conn, conn.notifies.pop(0).payload)
+        finally:
+            conn.close()
+
+    def _dispatch(self, conn, payload: str):
+        if self.on_notify:
+            self.on_notify()
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            return
+        if event.get("type") == "trades":
+            rows = self.load_trades(conn, event["source"], event["ids"])
+            if rows:
+                self.broadcaster.publish("trades", {"source": event["source"], "rows": rows})
+        elif event.get("type") == "tracking":
+            self.broadcaster.publish("tracking", {"person_id": event["person_id"], "name": event.get("name"),
+                                                  "tracked": bool(event["tracked"])})
@@ -1,25 +1,65 @@
 # gov_and_form4_app.py
-from pg_flyway import PGFlyway
-
-from flask import Flask, jsonify, render_template_string
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
+from pg_flyway import LazyConnectionPool, PGFlyway
+from sec_fetcher import SECFetcher
+from request_scheduler import scheduler as request_scheduler
+from doc_cache import CacheMiss, DocumentCache
+from senate_efd import EFD_URL as SENATE_URL, SenateEFDClient
+from house_clerk import HOUSE_URL, HouseClerkSource, parse_ptr_pdf
+from pipeline import Pipeline, Stage
+from jobs import JobManager
+from ttl_cache import TTLCache
+from entities import PersonCreator, backfill_persons, find_person, merge_persons, person_candidates, resolve_person
+from live_feed import Broadcaster, FeedFilter, FeedListener, notify as notify_feed
+import analytics
+import metrics
+import waits
+import work_queue
+import form4_parser
+import psycopg2
+from psycopg2.extras import execute_values
+
+from flask import Blueprint, Flask, Response, g, jsonify, request, stream_with_context
+import jinja2
 from urllib.parse import urljoin
 import time
-import xml.etree.ElementTree as ET
 from bs4 import BeautifulSoup
 import re
-import html
 import datetime
+import requests
+import collections
+import json
+import multiprocessing
+import os
+import psutil
+from concurrent.futures import ProcessPoolExecutor
 
-app = Flask(__name__)
-pg_flyway = PGFlyway()
+# Routes are registered on this blueprint; create_app() builds the Flask app around it
+bp = Blueprint("publictrades", __name__)
 HEADERS = {"User-Agent": "GovTradeMonitor/1.0"}
+# Pulls run as background jobs so HTTP workers return immediately
+job_manager = JobManager(max_workers=2)
+# Seconds between scheduled pulls (None disables a schedule)
+PULL_SCHEDULE = {"form4_pull": 15 * 60, "gov_pull": 6 * 60 * 60}
+JOB_STREAM_INTERVAL = 1.0
+# Event streams (/feed, /jobs/<id>/stream) end after this long and the browser's EventSource
+# reconnects, so an open tab never holds a server worker for good
+STREAM_MAX_SECONDS = 300
+# Raw documents (Form 4 XML, filing indexes, Senate PTR pages) are kept on disk so they are
+# downloaded once. With DOC_CACHE_REPLAY=1 nothing is fetched: parsing runs on cached copies only.
+doc_cache = DocumentCache(
+    os.environ.get("DOC_CACHE_DIR", "doc_cache"),
+    max_bytes=int(os.environ.get("DOC_CACHE_MAX_MB", "2048")) * 1024 * 1024,
+    replay=os.environ.get("DOC_CACHE_REPLAY") == "1",
+)
+# Plain HTTP documents on sec.gov go through one pooled, rate-limited session.
+sec_fetcher = SECFetcher(HEADERS, cache=doc_cache)
+# SEC_BASE_URL and SENATE_EFD_BASE may point at a stand-in such as fixture_server.py
+SEC_BASE_URL = os.environ.get("SEC_BASE_URL", "https://www.sec.gov").rstrip("/")
+# Senate eFD search: one session that accepts the site's terms once and is shared by all workers
+senate_client = SenateEFDClient(HEADERS, os.environ.get("SENATE_EFD_BASE", SENATE_URL))
+# House Clerk disclosures; HOUSE_CLERK_BASE may point at a local mirror such as fixtures/house
+house_source = HouseClerkSource(os.environ.get("HOUSE_CLERK_BASE", HOUSE_URL),
+                                SECFetcher(HEADERS, cache=doc_cache))
 
 # ---- TRANSACTION CODES (for Form 4) ----
 TRANSACTION_CODES = {
@@ -43,38 +83,69 @@ TRANSACTION_CODES = {
     "J": "Other (Unclassified)"
 }
 
-prev_url = None
-
 # ---------------------- Database Setup ----------------------
-def init_db():
-    # existing filings & trades (SEC Form 4)
-    global pg_flyway
-    pg_flyway.create_database("publictrades")
-    pg_flyway = PGFlyway("publictrades")
-    pg_flyway.create_table("filings")
-    pg_flyway.create_table("trades")
-    pg_flyway.create_table("gov_officials")
-    pg_flyway.create_table("gov_trades")
-    pg_flyway.create_table("tracked_insiders")
-    pg_flyway.conn.commit()
-
-init_db()
-
-# ---------------------- Headless Chrome Setup ----------------------
-def get_headless_driver():
-    options = Options()
-    options.headless = True
-    options.add_argument("--headless=new")
-    options.add_argument("--no-sandbox")
-    options.add_argument("--disable-dev-shm-usage")
-    options.add_argument("--window-size=1920,1080")
-    options.add_argument(
-        "user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/142.0.0.0 Safari/537.36"
-    )
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
-    return driver
+# PUBLICTRADES_DB selects another database, e.g. the throwaway one bench_ingest.py fills
+DB_NAME = os.environ.get("PUBLICTRADES_DB", "publictrades")
+# What a process does about the schema when it first needs the database:
+#   check   - only warn about pending migrations; needs no CREATE/DDL rights (the default)
+#   migrate - setup_schema() first (opt-in, e.g. a single development process)
+# The schema is set up once per deploy with `flask --app main migrate`.
+SCHEMA_SETUP = os.environ.get("SCHEMA_SETUP", "check")
+
+def setup_schema():
+    """
+    Create the database if needed, apply pending migrations (versioned scripts in flyway/,
+    V<version>__<description>.sql) and give names stored before person resolution existed
+    (or by a writer that failed to resolve) their person ids. Idempotent and safe to run from
+    several processes at once; with nothing to do it costs a few queries.
+    :return: migration versions applied
+    """
+    server = PGFlyway()
+    try:
+        server.create_database(DB_NAME)
+    finally:
+        server.close()
+    flyway = PGFlyway(DB_NAME)
+    try:
+        applied = flyway.migrate()
+        print("[INFO] Person backfill:", backfill_persons(flyway.conn))
+    finally:
+        flyway.close()
+    return applied
+
+def open_db_pool():
+    """Open the connection pool; db_pool calls this on first use (see SCHEMA_SETUP)."""
+    flyway = PGFlyway(DB_NAME, connect=False)
+    if SCHEMA_SETUP == "migrate":
+        setup_schema()
+    pool = flyway.connection_pool(minconn=1, maxconn=10)
+    if SCHEMA_SETUP == "check":
+        with pool.connection() as conn:
+            pending = flyway.pending_migrations(conn)
+        if pending:
+            print(f"[WARN] Migrations {pending} are not applied yet; run `flask --app main migrate`")
+    return pool
+
+def db_connect_kwargs():
+    return PGFlyway(DB_NAME, connect=False).connect_kwargs()
+
+# Every request, scraper and pipeline worker borrows its own connection from this pool. It is
+# opened by the first borrower, so importing this module connects to nothing.
+db_pool = LazyConnectionPool(open_db_pool)
+# Writers create new persons on this connection, committed at once, so a batch that is still
+# open never holds a name's advisory lock (see entities.resolve_person).
+person_creator = PersonCreator(lambda: psycopg2.connect(**db_connect_kwargs()))
+
+def get_db():
+    """Connection for the current request, returned to the pool on teardown."""
+    if "db" not in g:
+        g.db = db_pool.getconn()
+    return g.db
+
+def release_db(exc):
+    conn = g.pop("db", None)
+    if conn is not None:
+        db_pool.putconn(conn)
 
 # ---------------------- Utilities ----------------------
 def normalize_number(s, integer=False):
@@ -100,179 +171,530 @@ def normalize_number(s, integer=False):
 # ---------------------- Existing SEC/Form4 Pull (unchanged conceptually) ----------------------
 # For brevity I include a compact pull_once that uses the same logic you've been using.
 increment = 100
-FORM4_FEED_URL_TEMPLATE = "https://www.sec.gov/cgi-bin/browse-edgar?action=getcurrent&type=4&start={start}&count={count}"
+FORM4_FEED_URL_TEMPLATE = SEC_BASE_URL + "/cgi-bin/browse-edgar?action=getcurrent&type=4&start={start}&count={count}"
 doc_type = {"html": 0, "xml": 1}
 file_type = "xml"
 
-@app.route("/pull_once")
-def pull_once():
-    """
-    Existing SEC Form 4 pull. Keeps behavior mostly the same as your working app.
-    Only scans a single page for speed. Expand as needed.
-    """
-    global increment
-    pages = 5
-    processed = 0
-    inserted = 0
-    for i in range(pages):
-        print(f"Page {i+1}/{pages}")
-        driver = get_headless_driver()
-        feed_url = FORM4_FEED_URL_TEMPLATE.format(start=i*increment, count=increment)
-        driver.get(feed_url)
+# Worker threads per pipeline stage. Fetch is bounded by the SEC rate limit in
+# sec_fetcher; each writer holds its own pooled connection.
+PULL_CONCURRENCY = {"fetch": 8, "parse": 2, "write": 2}
+# Feed pages scanned at most per pull; steady-state polls stop at the first known filing
+PULL_MAX_PAGES = 5
+FORM4_CURSOR = "form4_getcurrent"
+ACCESSION_RE = re.compile(r"\d{10}-\d{2}-\d{6}")
+PULL_QUEUE_SIZE = 50
+# Filings written per transaction by each writer in the pipeline's write stage
+PULL_COMMIT_EVERY = 25
+
+def feed_page_filings(page):
+    """Fetch one getcurrent feed page and return (index_url, accession, accepted) tuples, newest first."""
+    feed_url = FORM4_FEED_URL_TEMPLATE.format(start=page*increment, count=increment)
+    soup = BeautifulSoup(sec_fetcher.get_text(feed_url, revalidate=True), "html.parser")
+    tables = soup.find_all("table")
+    if len(tables) <= 6:
+        raise ValueError(f"Form 4 table could not be parsed on page {page+1}")
+    table = tables[6]
+    filings = []
+    for row in table.find_all("tr")[1:]:  # skip header
+        cols = row.find_all("td")
+        if len(cols) < 5:
+            continue
+        # second column, pick xml/html link depending on file_type
         try:
-            WebDriverWait(driver, 20).until(
-                EC.presence_of_element_located((By.XPATH, "/html/body/div/table[2]"))
-            )
-        except:
-            driver.quit()
-            return jsonify({"error": "Form 4 table not fully loaded"})
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-        driver.quit()
-
-        tables = soup.find_all("table")
-        if len(tables) <= 6:
-            return jsonify({"error": "Form 4 table could not be parsed"})
-        table = tables[6]
-        rows = table.find_all("tr")[1:]  # skip header
-        for row in rows:
-            cols = row.find_all("td")
-            if len(cols) < 5:
-                continue
-            # second column, pick xml/html link depending on file_type
-            try:
-                link = cols[1].find_all("a")[doc_type[file_type]]
-            except Exception:
-                continue
-            index_url = urljoin("https://www.sec.gov", link.get("href"))
-            accession = link.get("href").strip()
-            if process_filing(index_url, accession):
-                inserted += 1
-            processed += 1
-    return jsonify({"processed": processed, "inserted": inserted})
-
-# ---------------------- Filing Processing ----------------------
-def process_filing(index_url, accession):
-    global prev_url
-    url = find_primary_document(index_url, file_type)
-    if url == prev_url:
-        return False
-    print("URL:", str(url))
-    if not url:
-        print("[WARN] No primary document found for", accession)
-        return False
-    print("[INFO] Parsing:", url)
-    prev_url = url
-    return parse_form4(accession, index_url, url, file_type)
+            link = cols[1].find_all("a")[doc_type[file_type]]
+        except Exception:
+            continue
+        href = link.get("href").strip()
+        index_url = urljoin(SEC_BASE_URL, href)
+        match = ACCESSION_RE.search(href)
+        accession = match.group(0) if match else href
+        try:
+            accepted = datetime.datetime.strptime(cols[3].get_text(" ", strip=True), "%Y-%m-%d %H:%M:%S")
+        except ValueError:
+            accepted = None
+        filings.append((index_url, accession, accepted))
+    return filings
 
-# ---------------------- XML/HTML Parsing ----------------------
-def parse_form4(accession, index_url, url, parser_type):
-    driver = get_headless_driver()
-    driver.get(url)
-    time.sleep(1)
-    content = None
-    if parser_type == "xml":
-        content = driver.page_source
-    def xml_extract(parent, path, cast=str):
+def known_accessions(conn, accessions):
+    """Subset of accessions already stored in filings (one query per batch)."""
+    if not accessions:
+        return set()
+    c = conn.cursor()
+    c.execute("SELECT accession FROM filings WHERE accession = ANY(%s)", (list(accessions),))
+    return {row[0] for row in c.fetchall()}
+
+def load_cursor(conn, source):
+    c = conn.cursor()
+    c.execute("SELECT last_accession, last_accepted FROM ingest_cursor WHERE source=%s", (source,))
+    row = c.fetchone()
+    return row if row else (None, None)
+
+def save_cursor(conn, source, accession, accepted):
+    """Advance the high-water mark; it never moves backwards."""
+    c = conn.cursor()
+    c.execute("""
+        INSERT INTO ingest_cursor (source, last_accession, last_accepted, updated_at)
+        VALUES (%s, %s, %s, now())
+        ON CONFLICT (source) DO UPDATE SET
+            last_accession = EXCLUDED.last_accession,
+            last_accepted = EXCLUDED.last_accepted,
+            updated_at = now()
+        WHERE ingest_cursor.last_accepted IS NULL OR EXCLUDED.last_accepted >= ingest_cursor.last_accepted
+    """, (source, accession, accepted))
+    conn.commit()
+
+def new_feed_filings(conn, stats, max_pages=PULL_MAX_PAGES):
+    """
+    Walk the getcurrent feed newest-first and yield filings that are not stored yet.
+    Paging stops on the first page that reaches the persisted cursor or an already-ingested accession.
+    """
+    _, last_accepted = load_cursor(conn, FORM4_CURSOR)
+    seen = set()
+    for page in range(max_pages):
         try:
-            node = parent.find(path)
-            return cast(node.text.strip()) if node is not None and node.text else None
-        except:
-            return None
-    root = None
-    if parser_type == "xml" and content:
-        content = html.unescape(content)
-        match = re.search(
-            r'(<\?xml[^>]*\?>.*?</ownershipDocument>)',
-            content,
-            flags=re.DOTALL
-        )
-        if not match:
-            print("Not a Form 4")
+            filings = feed_page_filings(page)
+        except requests.RequestException as e:
+            if page == 0:
+                raise
+            # keep what the earlier pages found; the cursor makes the next poll pick up the rest
+            print(f"[WARN] Feed page {page + 1} failed after retries, stopping here: {e}")
+            stats["failed_pages"] += 1
             return
-        xml_block = match.group(1)
-        root = ET.fromstring(xml_block)
-        insider = xml_extract(root, ".//reportingOwner/reportingOwnerId/rptOwnerName")
-        issuer = xml_extract(root, ".//issuer/issuerName")
-        filing_date = xml_extract(root, ".//periodOfReport")
-        filing_date = filing_date[:10]  # only capture date, not time
-        filing_date = datetime.datetime.strptime(filing_date.strip(), "%Y-%m-%d").strftime("%Y-%m-%d")
-        accession = re.search(r"SEC FILE NUMBER:\s*([0-9\-]+)", content).group(1)
-    else:
-        insider = driver.find_element(By.XPATH, "/html/body/table[2]/tbody/tr[1]/td[1]/table[1]/tbody/tr/td/a").text
-        issuer = driver.find_element(By.XPATH, "/html/body/table[2]/tbody/tr[1]/td[2]/a").text
-        filing_date = driver.find_element(By.XPATH, "/html/body/table[2]/tbody/tr[2]/td/span[2]").text
-        filing_date = datetime.datetime.strptime(filing_date.strip(), "%Y-%m-%d").strftime("%Y-%m-%d")
-    filing_id = insert_filing(accession, insider, issuer, filing_date, index_url)
-    count = 0
-    if parser_type == "xml":
-        transactions = root.findall(".//nonDerivativeTable/nonDerivativeTransaction")
-        for trans in transactions:
-            date = xml_extract(trans, "./transactionDate/value")
-            date = date[:10]  #  only capture date, not time
-            date = datetime.datetime.strptime(date.strip(), "%Y-%m-%d").strftime("%Y-%m-%d")
-            title = xml_extract(trans, "./securityTitle/value")
-            code = xml_extract(trans, "./transactionCoding/transactionCode")
-            if code not in TRANSACTION_CODES:
+        stats["pages"] += 1
+        stats["listed"] += len(filings)
+        # the feed lists one row per filer, so the same accession shows up more than once
+        filings = [f for f in filings if f[1] not in seen and not seen.add(f[1])]
+        known = known_accessions(conn, [f[1] for f in filings])
+        reached_cursor = False
+        for filing in filings:
+            accepted = filing[2]
+            if last_accepted is not None and accepted is not None and accepted < last_accepted:
+                reached_cursor = True
                 continue
-            ttype = TRANSACTION_CODES[code]
-            amount = xml_extract(trans, "./transactionAmounts/transactionShares/value", int)
-            price = xml_extract(trans, "./transactionAmounts/transactionPricePerShare/value", float)
-            if price == '0' or amount == '0':
+            if filing[1] in known:
+                stats["known"] += 1
                 continue
-            if not date or not title or not ttype:
+            stats["new"] += 1
+            yield filing
+        # without usable timestamps fall back to stopping at the first already-ingested filing
+        cursor_usable = last_accepted is not None and any(f[2] for f in filings)
+        if reached_cursor or not filings or (known and not cursor_usable):
+            return
+
+def parse_filing(fetched):
+    accession, accepted, index_url, content = fetched
+    # documents that are not Form 4s pass through as None so the pull still counts them as handled
+    return [(accession, accepted, index_url, parse_form4_document(content))]
+
+def write_filing(conn, parsed):
+    """Store one filing inside a savepoint so a bad filing doesn't abort the open batch."""
+    accession, accepted, index_url, doc = parsed
+    if doc is None:
+        return [((0, 0), accession, accepted)]
+    c = conn.cursor()
+    c.execute("SAVEPOINT filing")
+    try:
+        counts = store_form4(conn, accession, index_url, doc, commit=False)
+    except Exception:
+        c.execute("ROLLBACK TO SAVEPOINT filing")
+        raise
+    c.execute("RELEASE SAVEPOINT filing")
+    return [(counts, accession, accepted)]
+
+def commit_batch(conn):
+    """
+    Commit a writer's open batch, then drop cached dashboard pages; invalidating before the
+    commit would let a request re-cache the pages without the batch.
+    """
+    conn.commit()
+    dashboard_cache.invalidate()
+
+def batched_writer(on_write=None):
+    """
+    Write-stage function for a filing Pipeline: each worker connection commits every
+    PULL_COMMIT_EVERY filings (the rest is committed when the worker's connection is released).
+    on_write, if given, is called with each (counts, accession, accepted) result.
+    """
+    written = collections.Counter()
+
+    def write(parsed, conn):
+        result = write_filing(conn, parsed)
+        written[id(conn)] += 1
+        if written[id(conn)] % PULL_COMMIT_EVERY == 0:
+            commit_batch(conn)
+        if on_write:
+            on_write(result[0])
+        return result
+
+    return write
+
+@bp.route("/pull_once")
+def pull_once():
+    """Queue a SEC Form 4 pull; poll /jobs/<job_id> for progress and the result."""
+    job, created = job_manager.submit("form4_pull", run_form4_pull)
+    return jsonify({"job_id": job.id, "status": job.status, "created": created}), 202
+
+def pull_started():
+    """Starting point for pull_timing(): (perf_counter, wait snapshot, metrics snapshot)."""
+    return time.perf_counter(), waits.timer.snapshot(), metrics.registry.snapshot()
+
+def pull_timing(started):
+    """
+    Wall time since pull_started() returned `started`, the thread-seconds spent waiting since
+    then by kind, and a per-stage breakdown: count and seconds of every timed series
+    (HTTP requests, parses, statements and commits, ...) recorded
+    since. Work of a pull running at the same time is included. Per-host request counters
+    (retries, 429s, circuit state) are process totals.
+    """
+    started_at, waited_before, measured_before = started
+    return {
+        "wall_seconds": round(time.perf_counter() - started_at, 3),
+        "wait_seconds": waits.timer.since(waited_before),
+        "breakdown": metrics.registry.since(measured_before),
+        "host_timeouts": waits.timeouts.stats(),
+        "hosts": request_scheduler.stats(),
+    }
+
+def run_form4_pull(job):
+    """
+    Incremental SEC Form 4 pull. The feed is read newest-first only until it reaches
+    filings we already have (see new_feed_filings); the new filings are queued as
+    ingest_tasks and the cursor advances past them in the same transaction, so the queue
+    owns them from then on. The queue is then drained by a staged pipeline (see
+    PULL_CONCURRENCY and drain_queue), which also retries filings that failed in earlier
+    pulls. Per-stage counters and overall timing are returned with the totals. Only the
+    xml document type is supported here.
+    """
+    started = pull_started()
+    feed = collections.Counter(pages=0, listed=0, known=0, new=0)
+    with db_pool.connection() as conn:
+        filings = list(new_feed_filings(conn, feed))
+        feed["queued"] = work_queue.enqueue(conn, FORM4_TASK, [
+            (accession, {"index_url": index_url, "accepted": accepted.isoformat() if accepted else None})
+            for index_url, accession, accepted in filings
+        ], commit=False)
+        newest = max(((accepted, accession) for _, accession, accepted in filings if accepted), default=None)
+        if newest:
+            save_cursor(conn, FORM4_CURSOR, newest[1], newest[0])
+        conn.commit()
+    totals, stages = drain_queue(FORM4_TASK, lambda worker, errors: form4_pipeline(worker, errors, job), job)
+    return {
+        "processed": totals["tasks"],
+        "inserted": totals["inserted"],
+        "skipped": totals["skipped"],
+        "failed": totals["failed"],
+        "lost": totals["lost"],
+        "feed": dict(feed),
+        "stages": stages,
+        "timing": pull_timing(started),
+    }
+
+def form4_pipeline(worker, errors, job=None):
+    """
+    Pipeline for claimed form4 tasks: fetch -> parse -> write. Each task is marked done in the
+    transaction that stores its filing; writers commit every PULL_COMMIT_EVERY filings.
+    """
+    def fetch(task):
+        started = time.perf_counter()
+        url = find_primary_document(task.payload["index_url"], file_type)
+        if not url:
+            print("[WARN] No primary document found for", task.key)
+            return [(task, started, None)]
+        print("[INFO] Fetching:", url)
+        return [(task, started, sec_fetcher.get(url))]
+
+    def parse(fetched):
+        task, started, content = fetched
+        return [(task, started, parse_form4_document(content) if content is not None else None)]
+
+    written = collections.Counter()
+
+    def write(parsed, conn):
+        task, started, doc = parsed
+        [((inserted, skipped), _, _)] = write_filing(conn, (task.key, None, task.payload["index_url"], doc))
+        counts = {"inserted": inserted, "skipped": skipped}
+        if not work_queue.complete(conn, task, worker, counts):
+            return [(task, None)]  # lease lost; whoever holds it now stores the same rows
+        written[id(conn)] += 1
+        if written[id(conn)] % PULL_COMMIT_EVERY == 0:
+            commit_batch(conn)
+        TASK_SECONDS.observe(time.perf_counter() - started, kind=FORM4_TASK)
+        if job:
+            job.update(processed=1, **counts)
+        return [(task, counts)]
+
+    return Pipeline([
+        Stage("fetch", task_step(fetch, errors), PULL_CONCURRENCY["fetch"]),
+        Stage("parse", task_step(parse, errors), PULL_CONCURRENCY["parse"]),
+        Stage("write", task_step(write, errors), PULL_CONCURRENCY["write"], context=db_pool.connection),
+    ], queue_size=PULL_QUEUE_SIZE)
+
+# ---------------------- Ingest work queue ----------------------
+# Discovery enqueues one ingest_task per document (see work_queue.py); any number of app
+# processes or queue_worker.py instances then drain the queue, each claiming its own batches.
+FORM4_TASK = "form4"
+SENATE_TASK = "senate_ptr"
+QUEUE_CLAIM_BATCH = 200
+# fine buckets so bench_ingest.py can estimate p50/p99 from them
+TASK_SECONDS = metrics.registry.histogram(
+    "ingest_task_seconds", "Time from starting work on a queued task to storing it, by kind",
+    buckets=metrics.exponential_buckets(0.005, 1.5, 24))
+
+def task_step(func, errors):
+    """
+    Wrap a pipeline stage function whose items are Tasks or (Task, ...) tuples so the error that
+    stopped a task is kept (by task id) for its ingest_tasks row.
+    """
+    def step(item, *context):
+        task = item if isinstance(item, work_queue.Task) else item[0]
+        try:
+            return func(item, *context)
+        except Exception as e:
+            errors[task.id] = f"{type(e).__name__}: {e}"
+            raise
+    return step
+
+def drain_queue(kind, build_pipeline, job=None, batch=QUEUE_CLAIM_BATCH):
+    """
+    Claim and process ready tasks of one kind until none are left. build_pipeline(worker, errors)
+    returns a Pipeline taking Tasks whose results are (task, counts dict), or (task, None) for a
+    task whose lease was lost to another worker; claimed tasks without a result are given back
+    to the queue with their error, to be retried later.
+    :return: (summed counts plus "tasks", "failed" and "lost", stats of the last batch's pipeline)
+    """
+    worker = work_queue.worker_id()
+    totals = collections.Counter(tasks=0, failed=0, lost=0)
+    stages = None
+    while True:
+        with db_pool.connection() as conn:
+            tasks = work_queue.claim(conn, kind, batch, worker)
+        if not tasks:
+            break
+        errors = {}
+        pipeline = build_pipeline(worker, errors)
+        if job:
+            job.attach_stats(pipeline.stats)
+        with work_queue.LeaseRenewer(db_pool.connection, [task.id for task in tasks], worker):
+            results = pipeline.run(tasks)
+        # the writers' last partial batches were committed as their connections were released
+        dashboard_cache.invalidate()
+        done, lost = set(), set()
+        for task, counts in results:
+            if counts is None:
+                lost.add(task.id)  # neither done nor ours to fail
                 continue
-            insert_trade(filing_id, date, title, ttype, amount, price)
-            count += 1
-    print(f"[INFO] Inserted {count} trades for {accession}")
-    return count > 0
+            done.add(task.id)
+            totals.update(counts)
+        totals["tasks"] += len(done)
+        totals["lost"] += len(lost)
+        leftover = [task for task in tasks if task.id not in done and task.id not in lost]
+        if leftover:
+            with db_pool.connection() as conn:
+                for task in leftover:
+                    work_queue.fail(conn, [task.id], worker, errors.get(task.id, "not completed"))
+            totals["failed"] += len(leftover)
+            if job:
+                job.update(failed=len(leftover))
+        stages = pipeline.stats()
+    return totals, stages
+
+@bp.route("/queue")
+def queue_status():
+    """Ingest task counts by kind and status."""
+    return jsonify(work_queue.stats(get_db()))
+
+@bp.route("/queue/retry_failed", methods=["POST"])
+def queue_retry_failed():
+    """Give tasks that used up their attempts another round (?kind= limits it to one kind)."""
+    return jsonify({"requeued": work_queue.retry_failed(get_db(), request.args.get("kind"))})
+
+# ---------------------- XML/HTML Parsing ----------------------
+PARSE_SECONDS = metrics.registry.histogram("parse_seconds", "Document parse time, by document type")
+
+def parse_form4_document(content):
+    """Parse a Form 4 submission (raw bytes or text) into a form4_parser.Form4Document; None if it is not a Form 4."""
+    with PARSE_SECONDS.time(document="form4"):
+        doc = form4_parser.parse_form4(content)
+    if doc is None:
+        print("Not a Form 4")
+    return doc
+
+def _storable(trans):
+    return trans.code in TRANSACTION_CODES and trans.transaction_date and trans.security_title
+
+def form4_trades(doc):
+    """Non-derivative transactions of a Form4Document as (date, title, ttype, amount, price) rows."""
+    return [(trans.transaction_date.isoformat(), trans.security_title,
+             TRANSACTION_CODES[trans.code], trans.shares, trans.price)
+            for trans in doc.transactions if not trans.derivative and _storable(trans)]
+
+def form4_derivative_trades(doc):
+    """
+    Derivative transactions (options, RSUs, warrants, ...) of a Form4Document as
+    (date, title, ttype, amount, price, exercise_price, exercise_date, expiration_date,
+    underlying_title, underlying_shares) rows.
+    """
+    def iso(d):
+        return d.isoformat() if d else None
+    return [(trans.transaction_date.isoformat(), trans.security_title, TRANSACTION_CODES[trans.code],
+             trans.shares, trans.price, trans.exercise_price, iso(trans.exercise_date),
+             iso(trans.expiration_date), trans.underlying_title, trans.underlying_shares)
+            for trans in doc.transactions if trans.derivative and _storable(trans)]
+
+def store_form4(conn, accession, index_url, doc, commit=True):
+    """
+    Insert a parsed Form 4 (see parse_form4_document) with all of its reporting owners,
+    non-derivative and derivative trades, one bulk statement per table in one transaction.
+    Returns (inserted, skipped) trade counts across both trade tables. With commit=False
+    the caller owns the transaction.
+    """
+    accession = doc.accession or accession
+    # filings.insider keeps the first reporting owner; joint filers are all in filing_owners
+    insider = doc.owners[0].name if doc.owners else None
+    person_id = resolve_person(conn, insider, doc.owners[0].cik, person_creator) if doc.owners else None
+    filing_date = doc.period_of_report.isoformat() if doc.period_of_report else None
+    filing_id = insert_filing(conn, accession, insider, doc.issuer_name, filing_date, index_url,
+                              person_id=person_id, commit=False)
+    insert_filing_owners(conn, filing_id, doc.owners, commit=False)
+    inserted, skipped = insert_trades(conn, filing_id, form4_trades(doc), commit=False)
+    d_inserted, d_skipped = insert_derivative_trades(conn, filing_id, form4_derivative_trades(doc), commit=False)
+    if commit:
+        conn.commit()
+    print(f"[INFO] Inserted {inserted} trades and {d_inserted} derivative trades "
+          f"({skipped + d_skipped} already stored) for {accession}")
+    return inserted + d_inserted, skipped + d_skipped
 
 # ---------------------- Helper DB insert functions ----------------------
-def insert_filing(accession, insider, issuer, filing_date, url):
-    c = pg_flyway.conn.cursor()
+def insert_filing(conn, accession, insider, issuer, filing_date, url, person_id=None, commit=True):
+    c = conn.cursor()
+    # The update makes RETURNING yield the id for existing filings as well
     c.execute("""
-        INSERT INTO filings (accession, insider, issuer, filing_date, url)
-        VALUES (%s, %s, %s, %s, %s)
-        ON CONFLICT (accession) DO NOTHING
-    """, (accession, insider, issuer, filing_date, url))
-    pg_flyway.conn.commit()
-    c.execute("SELECT id FROM filings WHERE accession=%s", (accession,))
+        INSERT INTO filings (accession, insider, issuer, filing_date, url, person_id)
+        VALUES (%s, %s, %s, %s, %s, %s)
+        ON CONFLICT (accession) DO UPDATE SET person_id = COALESCE(filings.person_id, EXCLUDED.person_id)
+        RETURNING id
+    """, (accession, insider, issuer, filing_date, url, person_id))
     row = c.fetchone()
+    if commit:
+        conn.commit()
     if not row:
         raise RuntimeError(f"Could not get filing id for accession {accession}")
     return row[0]
 
-def insert_trade(filing_id, date, title, ttype, amount, price):
-    c = pg_flyway.conn.cursor()
-    amount_val = normalize_number(amount, integer=True)
-    price_val = normalize_number(price, integer=False)
-    try:
-        c.execute("""
-            INSERT INTO trades
-            (filing_id, transaction_date, security_title, transaction_type, amount, price)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            ON CONFLICT (filing_id, transaction_date, security_title, transaction_type, amount, price) DO NOTHING
-        """, (filing_id, date, title, ttype, amount_val, price_val))
-        pg_flyway.conn.commit()
-        inserted = c.rowcount > 0
-        return inserted
-    except Exception as e:
-        print("[ERROR] Trade insert failed:", e)
-        return False
+def insert_trades(conn, filing_id, trades, commit=True):
+    """
+    Bulk insert (date, title, ttype, amount, price) tuples for one filing.
+    Returns (inserted, skipped) where skipped rows already existed.
+    """
+    if not trades:
+        return 0, 0
+    rows = [(filing_id, date, title, ttype, normalize_number(amount, integer=True), normalize_number(price))
+            for date, title, ttype, amount, price in trades]
+    c = conn.cursor()
+    returned = execute_values(c, """
+        INSERT INTO trades
+        (filing_id, transaction_date, security_title, transaction_type, amount, price)
+        VALUES %s
+        ON CONFLICT (filing_id, transaction_date, security_title, transaction_type, amount, price) DO NOTHING
+        RETURNING id
+    """, rows, fetch=True)
+    add_all_trades(conn, "SEC", [r[0] for r in returned])
+    if commit:
+        conn.commit()
+        if returned:
+            dashboard_cache.invalidate()
+    return len(returned), len(rows) - len(returned)
+
+def insert_derivative_trades(conn, filing_id, trades, commit=True):
+    """
+    Bulk insert derivative trade rows (see form4_derivative_trades) for one filing.
+    Returns (inserted, skipped) where skipped rows already existed.
+    """
+    if not trades:
+        return 0, 0
+    rows = [(filing_id, date, title, ttype, normalize_number(amount, integer=True), normalize_number(price),
+             normalize_number(exercise_price), exercise_date, expiration_date, underlying_title,
+             normalize_number(underlying_shares, integer=True))
+            for (date, title, ttype, amount, price, exercise_price, exercise_date, expiration_date,
+                 underlying_title, underlying_shares) in trades]
+    c = conn.cursor()
+    returned = execute_values(c, """
+        INSERT INTO derivative_trades
+        (filing_id, transaction_date, security_title, transaction_type, amount, price,
+         exercise_price, exercise_date, expiration_date, underlying_title, underlying_shares)
+        VALUES %s
+        ON CONFLICT (filing_id, transaction_date, security_title, transaction_type, amount, exercise_price)
+        DO NOTHING
+        RETURNING id
+    """, rows, fetch=True)
+    if commit:
+        conn.commit()
+        if returned:
+            dashboard_cache.invalidate()
+    return len(returned), len(rows) - len(returned)
+
+def insert_filing_owners(conn, filing_id, owners, commit=True):
+    """Bulk insert the reporting owners (form4_parser.ReportingOwner) of one filing."""
+    rows = [(filing_id, o.cik, o.name, o.is_director, o.is_officer, o.is_ten_percent_owner, o.officer_title,
+             resolve_person(conn, o.name, o.cik, person_creator))
+            for o in owners if o.name]
+    if not rows:
+        return 0
+    c = conn.cursor()
+    returned = execute_values(c, """
+        INSERT INTO filing_owners
+        (filing_id, cik, name, is_director, is_officer, is_ten_percent_owner, officer_title, person_id)
+        VALUES %s
+        ON CONFLICT (filing_id, name) DO NOTHING
+        RETURNING id
+    """, rows, fetch=True)
+    if commit:
+        conn.commit()
+    return len(returned)
+
+# Rows copied into all_trades for newly inserted trade ids, per source
+ALL_TRADES_INSERTS = {
+    "SEC": """
+        INSERT INTO all_trades (source, trade_id, name, detail, transaction_date, security_title,
+                                transaction_type, amount, price, url, person_id)
+        SELECT 'SEC', t.id, f.insider, f.issuer, t.transaction_date, t.security_title,
+               t.transaction_type, t.amount, t.price, f.url, f.person_id
+        FROM trades t
+        JOIN filings f ON t.filing_id = f.id
+        WHERE t.id = ANY(%s)
+        ON CONFLICT DO NOTHING
+    """,
+    "GOV": """
+        INSERT INTO all_trades (source, trade_id, name, detail, transaction_date, security_title,
+                                transaction_type, amount, price, url, person_id)
+        SELECT 'GOV', gt.id, go.name, go.role, gt.transaction_date, gt.security_title,
+               gt.transaction_type, gt.amount, gt.price, gt.source_url, go.person_id
+        FROM gov_trades gt
+        JOIN gov_officials go ON gt.official_id = go.id
+        WHERE gt.id = ANY(%s)
+        ON CONFLICT DO NOTHING
+    """,
+}
+
+def add_all_trades(conn, source, trade_ids):
+    """
+    Incrementally refresh all_trades with trades just inserted by the current batch and queue the
+    live feed event for them; runs in the caller's transaction so both commit (or roll back)
+    together with the batch.
+    """
+    if trade_ids:
+        conn.cursor().execute(ALL_TRADES_INSERTS[source], (list(trade_ids),))
+        notify_feed(conn, {"type": "trades", "source": source, "ids": list(trade_ids)})
 
 # ---------------------- Minimal Form4 parsing (kept concise) ----------------------
 def find_primary_document(index_url, file_type):
     # When file_type == 'xml' we treat index_url as the xml URL; otherwise extract primary doc.
     if file_type == "xml":
         return index_url
-    driver = get_headless_driver()
-    driver.get(index_url)
     try:
-        WebDriverWait(driver, 5).until(EC.presence_of_element_located((By.XPATH, "//table[@class='tableFile']")))
-    except:
-        driver.quit()
+        soup = BeautifulSoup(sec_fetcher.get_text(index_url), "html.parser")
+    except (requests.RequestException, CacheMiss):
         return None
-    soup = BeautifulSoup(driver.page_source, "html.parser")
-    driver.quit()
     table = soup.find("table", class_="tableFile")
     if not table:
         return None
@@ -283,246 +705,254 @@ def find_primary_document(index_url, file_type):
             continue
         href = link.get("href", "").lower()
         if any(m in href for m in markers):
-            return urljoin("https://www.sec.gov", link.get("href"))
+            return urljoin(SEC_BASE_URL, link.get("href"))
     return None
 
 # ---------------------- Government scraping helpers ----------------------
-def insert_gov_official(name, role, source_url):
-    c = pg_flyway.conn.cursor()
-    pg_flyway.conn.commit()
-    c.execute("INSERT INTO gov_officials (name, role, source_url) VALUES (%s, %s, %s) ON CONFLICT (name, role) DO NOTHING",
-              (name, role, source_url))
-    pg_flyway.conn.commit()
-    c.execute("SELECT id FROM gov_officials WHERE name=%s AND role=%s AND source_url=%s", (name, role, source_url))
+def insert_gov_official(conn, name, role, source_url, commit=True):
+    person_id = resolve_person(conn, name, creator=person_creator)
+    c = conn.cursor()
+    # The update makes RETURNING yield the id for existing officials as well
+    c.execute("""
+        INSERT INTO gov_officials (name, role, source_url, person_id) VALUES (%s, %s, %s, %s)
+        ON CONFLICT (name, role) DO UPDATE SET person_id = COALESCE(gov_officials.person_id, EXCLUDED.person_id)
+        RETURNING id
+    """, (name, role, source_url, person_id))
     row = c.fetchone()
+    if commit:
+        conn.commit()
     return row[0] if row else None
 
-def delete_gov_officials():
-    c = pg_flyway.conn.cursor()
+def delete_gov_officials(conn):
+    c = conn.cursor()
     c.execute("DELETE FROM gov_officials")
-    pg_flyway.conn.commit()
+    conn.commit()
 
-def insert_gov_trade(official_id, date, title, ttype, amount, price, source_url):
-    c = pg_flyway.conn.cursor()
-    amount_val = normalize_number(amount, integer=True)
-    price_val = normalize_number(price, integer=False)
-    try:
-        c.execute("""
-            INSERT INTO gov_trades
-            (official_id, transaction_date, security_title, transaction_type, amount, price, source_url)
-            VALUES (%s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT (official_id, transaction_date, security_title, transaction_type, amount) DO NOTHING
-        """, (official_id, date, title, ttype, amount_val, price_val, source_url))
-        pg_flyway.conn.commit()
-        inserted = c.rowcount > 0
-        return inserted
-    except Exception as e:
-        print("[ERROR] Gov trade insert failed:", e)
-        return False
-
-def delete_gov_trades():
-    c = pg_flyway.conn.cursor()
+def insert_gov_trades(conn, official_id, trades, source_url, commit=True):
+    """
+    Bulk insert (date, title, ttype, amount, price) tuples for one report.
+    Returns (inserted, skipped) where skipped rows already existed.
+    """
+    if not trades:
+        return 0, 0
+    rows = [(official_id, date, title, ttype, normalize_number(amount, integer=True), normalize_number(price), source_url)
+            for date, title, ttype, amount, price in trades]
+    c = conn.cursor()
+    returned = execute_values(c, """
+        INSERT INTO gov_trades
+        (official_id, transaction_date, security_title, transaction_type, amount, price, source_url)
+        VALUES %s
+        ON CONFLICT (official_id, transaction_date, security_title, transaction_type, amount) DO NOTHING
+        RETURNING id
+    """, rows, fetch=True)
+    add_all_trades(conn, "GOV", [r[0] for r in returned])
+    if commit:
+        conn.commit()
+        if returned:
+            dashboard_cache.invalidate()
+    return len(returned), len(rows) - len(returned)
+
+def delete_gov_trades(conn):
+    c = conn.cursor()
+    c.execute("DELETE FROM all_trades WHERE source = 'GOV'")
     c.execute("DELETE FROM gov_trades")
-    pg_flyway.conn.commit()
-
-# --- Example: scrape House PTR listings ---
-def scrape_house_ptrs(limit=10):
-    """
-    Example scraper for House Financial Disclosure PTRs. This function is intentionally generic:
-    - It navigates to a list page (CHANGE URL as needed)
-    - Finds links to individual disclosure pages
-    - For each disclosure with an HTML table, extracts rows with headers like "Transaction Date"
-    NOTE: site structures vary — adjust selectors below for the actual listing page you target.
-    """
-    LIST_URL = "https://clerk.house.gov/public_disc/financial-ptrs"  # example; adjust if needed
-    driver = get_headless_driver()
-    driver.get(LIST_URL)
-    time.sleep(1)
-    soup = BeautifulSoup(driver.page_source, "html.parser")
-    driver.quit()
-
-    # find candidate links - this might need to be adjusted
-    links = []
-    for a in soup.find_all("a", href=True):
-        href = a['href']
-        if "financial-ptr" in href or "financial" in href:
-            links.append(urljoin("https://clerk.house.gov", href))
-        if len(links) >= limit:
-            break
+    c.execute("DELETE FROM house_reports_seen")
+    conn.commit()
 
-    results = []
-    driver = get_headless_driver()
-    for link in links:
-        driver.get(link)
-        time.sleep(0.8)
-        doc_soup = BeautifulSoup(driver.page_source, "html.parser")
-
-        # Try to find official name
-        name_tag = doc_soup.find(lambda tag: tag.name in ("h1", "h2", "h3") and "Statement" in tag.text or "Financial" in tag.text)
-        name = None
-        if name_tag:
-            name = name_tag.get_text(strip=True)
-        else:
-            # fallback: try find strong name
-            possible = doc_soup.find(text=re.compile(r"Reporting Person|Reporting-Owner|Reporting Person", re.I))
-            name = possible.strip() if possible else "Unknown"
-
-        # PUBLIC: find tables with headers that include "Transaction Date" (common)
-        for table in doc_soup.find_all("table"):
-            headers = [th.get_text(strip=True).lower() for th in table.find_all("th")]
-            if any("transaction" in h for h in headers) and any("title" in h or "security" in h for h in headers):
-                # parse rows
-                body_rows = table.find_all("tr")[1:]
-                trades = []
-                for r in body_rows:
-                    cols = [td.get_text(strip=True) for td in r.find_all(["td", "th"])]
-                    if len(cols) < 4:
-                        continue
-                    # heuristics: try to map columns
-                    # common patterns: [Title, Date, Code, Amount, Price, ...]
-                    tx_date = None; sec_title = None; tx_code = None; amount = None; price = None
-                    # naive mapping:
-                    # find first column that looks like a date (YYYY or MM/DD/YYYY)
-                    for c in cols:
-                        if re.search(r'\d{4}-\d{2}-\d{2}', c) or re.search(r'\d{1,2}/\d{1,2}/\d{4}', c):
-                            tx_date = c
-                            break
-                    # title: first column containing letters and 'Stock' or 'Common' or 'ETF' or 'Inc' etc
-                    for c in cols:
-                        if re.search(r'(stock|common|inc|corp|etf|shares)', c, re.I):
-                            sec_title = c
-                            break
-                    # amount: first numeric-looking column
-                    for c in cols[::-1]:
-                        if re.search(r'[\d,\$]+', c):
-                            # could be price or amount — prefer big numbers for amount
-                            num = c.replace('$', '').replace(',', '').strip()
-                            try:
-                                val = float(num)
-                                if val > 1000:
-                                    amount = c
-                                    break
-                                elif amount is None:
-                                    price = c
-                            except:
-                                continue
-                    # fallback simple guess
-                    if not sec_title:
-                        sec_title = cols[0]
-                    if not tx_date:
-                        tx_date = cols[1] if len(cols) > 1 else None
-                    trades.append((tx_date, sec_title, tx_code or "Trade", amount, price))
-                results.append((name, "House PTR", link, trades))
-                break
-    return results
-
-# --- Example: scrape Senate PTRs (placeholder; structure varies) ---
-def scrape_senate_ptrs(pages=10, limit=None):
-    # Placeholder similar to scrape_house_ptrs; adjust selectors when targeting actual senate site
-    # For now we return empty list (or you can replicate above approach for a known senate listing URL)
-    LIST_URL = "https://efdsearch.senate.gov"
-    driver = get_headless_driver()
-    processed, inserted = 0, 0
-    row_count = 0
-    page_count = 0
-    while page_count < pages:
-        driver.get(LIST_URL)
-        time.sleep(1)
-        if driver.current_url == f"{LIST_URL}/search/home/":  # agree
-            checkbox = driver.find_element(By.XPATH, "//input[@id=\"agree_statement\"]")
-            checkbox.click()
-            time.sleep(1)
-        # Click periodic reports checkbox
-        if EC.presence_of_element_located((By.XPATH, "//input[@id=\"reportTypes\" and @value=\"11\"]")):
-            checkbox = driver.find_element(By.XPATH, "//input[@id=\"reportTypes\" and @value=\"11\"]")
-            checkbox.click()
-            # Click search button
-            search_button = driver.find_element(By.XPATH, "//*[@id=\"searchForm\"]/div/button")
-            search_button.click()
-        try:
-            WebDriverWait(driver, 5).until(
-                EC.presence_of_element_located((By.XPATH, "//table[@id=\"filedReports\"]"))
-            )
-        except:
-            driver.quit()
-            raise Exception("error: Senate PTR table not fully loaded")
-        # Sort by date descending
-        time.sleep(1)
-        driver.execute_script("window.scrollTo(0, 0);")
+# --- House PTRs (disclosures-clerk.house.gov) ---
+# PDF parsing is CPU bound, so it runs in a bounded pool of worker processes fed by the
+# pipeline's parse stage; fetching stays on threads.
+HOUSE_FETCH_WORKERS = 4
+HOUSE_PARSE_WORKERS = 2
+HOUSE_COMMIT_EVERY = 25
+# Most recent filing years whose index is scanned on each pull
+HOUSE_YEARS = 1
+
+def known_house_reports(conn, urls):
+    """Subset of PTR document urls a previous pull has already handled, with or without trades."""
+    if not urls:
+        return set()
+    c = conn.cursor()
+    c.execute("SELECT source_url FROM house_reports_seen WHERE source_url = ANY(%s)", (list(urls),))
+    return {row[0] for row in c.fetchall()}
+
+def mark_house_report_seen(conn, source_url, trades):
+    c = conn.cursor()
+    c.execute("""
+        INSERT INTO house_reports_seen (source_url, trades) VALUES (%s, %s)
+        ON CONFLICT (source_url) DO UPDATE SET trades = EXCLUDED.trades, seen_at = now()
+    """, (source_url, trades))
+
+def ingest_house_ptrs(years=None, job=None):
+    """
+    Load the House Clerk's yearly disclosure index, then fetch, parse and store every PTR no
+    earlier pull has handled (see house_reports_seen). Returns (processed, inserted) trade counts.
+    """
+    this_year = datetime.date.today().year
+    years = years or range(this_year - HOUSE_YEARS + 1, this_year + 1)
+    filings = []
+    for year in years:
         try:
-            WebDriverWait(driver, 5).until(
-                EC.presence_of_element_located((By.XPATH, "//th[contains(@aria-label, 'Date')]"))
-            )
-        except:
-            driver.quit()
-            raise Exception("error: Date sorting did not appear")
-        date_sort = driver.find_element(By.XPATH, "//th[contains(@aria-label, 'Date')]")
-        date_sort.click()
-        time.sleep(0.5)
-        date_sort.click()
-        time.sleep(2)
+            filings.extend(house_source.filings(year))
+        except (requests.RequestException, CacheMiss, OSError) as e:
+            print(f"[WARN] House disclosure index for {year} unavailable: {e}")
+    with db_pool.connection() as conn:
+        known = known_house_reports(conn, [house_source.url(f.pdf_path) for f in filings])
+    todo = [f for f in filings if house_source.url(f.pdf_path) not in known]
+    print(f"[INFO] House: {len(filings)} PTRs listed, {len(todo)} to ingest")
+    written = collections.Counter()
+
+    def fetch(filing):
+        return [(filing, house_source.read(filing.pdf_path))]
+
+    def parse(fetched):
+        filing, content = fetched
+        # measured from this side, so it includes waiting for a free parser process
+        with PARSE_SECONDS.time(document="house_ptr"):
+            trades = parsers.submit(parse_ptr_pdf, content).result()
+        return [(filing, trades)]
+
+    def write(parsed, conn):
+        filing, trades = parsed
+        source_url = house_source.url(filing.pdf_path)
+        # savepoint per report, as in write_filing: a bad report must not discard the open batch
+        c = conn.cursor()
+        c.execute("SAVEPOINT house_report")
         try:
-            WebDriverWait(driver, 5).until(
-                EC.presence_of_element_located((By.XPATH, "//table[@id=\"filedReports\"]"))
-            )
-        except:
-            driver.quit()
-            raise Exception("error: Senate PTR table not fully loaded")
-        for _ in range(page_count):
+            official_id = insert_gov_official(conn, filing.name, "Representative", HOUSE_URL, commit=False)
+            inserted, _ = insert_gov_trades(conn, official_id, trades, source_url, commit=False)
+            mark_house_report_seen(conn, source_url, len(trades))
+        except Exception:
+            c.execute("ROLLBACK TO SAVEPOINT house_report")
+            raise
+        c.execute("RELEASE SAVEPOINT house_report")
+        written[id(conn)] += 1
+        if written[id(conn)] % HOUSE_COMMIT_EVERY == 0:
+            commit_batch(conn)
+        if job:
+            job.update(reports=1, processed=len(trades), inserted=inserted)
+        return [(len(trades), inserted)]
+
+    # spawn, not fork: the app process has live threads and pooled connections
+    with ProcessPoolExecutor(HOUSE_PARSE_WORKERS, mp_context=multiprocessing.get_context("spawn")) as parsers:
+        pipeline = Pipeline([
+            Stage("fetch", fetch, HOUSE_FETCH_WORKERS),
+            Stage("parse", parse, HOUSE_PARSE_WORKERS),
+            Stage("write", write, 1, context=db_pool.connection),
+        ], queue_size=HOUSE_FETCH_WORKERS * 4)
+        results = pipeline.run(todo)
+    dashboard_cache.invalidate()  # after the last batches were committed on release
+    return sum(r[0] for r in results), sum(r[1] for r in results)
+
+# --- Senate PTRs (efdsearch.senate.gov) ---
+# Workers storing Senate reports in parallel; each holds its own pooled DB connection and
+# shares senate_client's session and rate limit.
+SENATE_WORKERS = 4
+SENATE_PAGE_SIZE = 25
+
+SENATE_CURSOR = "senate_ptr_search"
+
+def scrape_senate_ptrs(pages=10, limit=None, job=None):
+    """
+    Queue the newest Senate PTRs (discover_senate_ptrs) and store every ready senate_ptr task
+    on a pool of SENATE_WORKERS workers. Returns (processed, inserted) trade counts.
+    """
+    found, queued = discover_senate_ptrs(pages, limit)
+    if job:
+        job.update(reports_found=found, reports_queued=queued)
+    totals, _ = drain_queue(SENATE_TASK, lambda worker, errors: senate_pipeline(worker, errors, job), job)
+    return totals["processed"], totals["inserted"]
+
+def discover_senate_ptrs(pages=10, limit=None):
+    """
+    Page through the newest Senate search results and queue each electronic PTR as a
+    senate_ptr task. Paging stops at reports filed before the newest one seen by the last
+    completed discovery, so an interrupted run is picked up by the next one.
+    :return: (reports found, newly queued)
+    """
+    found = queued = 0
+    newest = None
+    with db_pool.connection() as conn:
+        _, last_filed = load_cursor(conn, SENATE_CURSOR)
+        for row in senate_client.ptr_rows(pages, SENATE_PAGE_SIZE, limit):
             try:
-                WebDriverWait(driver, 5).until(
-                    EC.presence_of_element_located((By.XPATH, "//a[@class=\'paginate_button next\']"))
-                )
-            except:
-                driver.quit()
-                raise Exception("error: Next page button did not load in time")
-            next_page = driver.find_element(By.XPATH, "//a[@class=\'paginate_button next\']")
-            next_page.click()
-            time.sleep(1.5)
-        # Iterate through rows
-        soup = BeautifulSoup(driver.page_source, "html.parser")
-        # driver.quit()
-        table = soup.find("tbody")
-        for row in table.find_all("tr"):
-            cols = row.find_all("td")
-            first_name = cols[0].text
-            last_name = cols[1].text
-            office = cols[2].text
-            if '(' in office:
-                office = office[office.index('(')+1:office.index(')')]
-            report_link = cols[3].find('a').get("href")
-            date_filed = cols[4].text
-            official_id = insert_gov_official(f"{first_name} {last_name}", office, LIST_URL)
-            processed, inserted = process_senate_ptr(LIST_URL, report_link, official_id, driver)
-            row_count += 1
-            if limit and row_count == limit:
+                filed = datetime.datetime.strptime(row["date_filed"], "%m/%d/%Y")
+            except ValueError:
+                filed = None
+            if newest is None and filed is not None:
+                newest = (filed, row["report_link"])
+            if last_filed is not None and filed is not None and filed < last_filed:
                 break
-        if limit and row_count == limit:
-            break
-        page_count += 1
-    driver.quit()
-    return processed, inserted
+            if "/ptr/" not in row["report_link"]:
+                continue  # paper filings are scanned images without a transactions table
+            found += 1
+            queued += work_queue.enqueue(conn, SENATE_TASK, [(row["report_link"], row)])
+        if newest:
+            save_cursor(conn, SENATE_CURSOR, newest[1], newest[0])
+    return found, queued
 
-def process_senate_ptr(LIST_URL, report_link, official_id, driver):
-    driver.get(f"{LIST_URL}/{report_link}")
-    time.sleep(1)
-    if driver.current_url == f"{LIST_URL}/search/home/":  # agree
-        checkbox = driver.find_element(By.XPATH, "//input[@id=\"agree_statement\"]")
-        checkbox.click()
-        time.sleep(1)
-        driver.get(f"{LIST_URL}/{report_link}")
-    try:
-        WebDriverWait(driver, 3).until(
-            EC.presence_of_element_located((By.XPATH, "//tbody"))
-        )
-    except:
-        print("Transactions table did not load. Skipping this filing.")
+def senate_pipeline(worker, errors, job=None):
+    """Pipeline storing claimed senate_ptr tasks, each report and its task in one transaction."""
+    def store_report(task, conn):
+        started = time.perf_counter()
+        row = task.payload
+        office = row["office"]
+        if '(' in office:
+            office = office[office.index('(')+1:office.index(')')]
+        try:
+            official_id = insert_gov_official(conn, f"{row['first_name']} {row['last_name']}", office,
+                                              SENATE_URL, commit=False)
+            counts = process_senate_ptr(conn, senate_client.base_url, row["report_link"], official_id,
+                                        senate_client, commit=False)
+            result = {"processed": counts[0], "inserted": counts[1]}
+            if not work_queue.complete(conn, task, worker, result):
+                conn.rollback()
+                return [(task, None)]  # lease lost; the task is another worker's now
+            commit_batch(conn)
+        except Exception:
+            conn.rollback()  # keep the worker's connection usable for the next report
+            raise
+        TASK_SECONDS.observe(time.perf_counter() - started, kind=SENATE_TASK)
+        if job:
+            job.update(reports=1, **result)
+        return [(task, result)]
+
+    return Pipeline([
+        Stage("report", task_step(store_report, errors), SENATE_WORKERS, context=db_pool.connection),
+    ], queue_size=SENATE_WORKERS * 2)
+
+def process_senate_ptr(conn, LIST_URL, report_link, official_id, client, commit=True):
+    """
+    Store the trades of one Senate PTR. Filed reports do not change, so a report page already
+    in doc_cache is parsed from there; in replay mode the client is never used (and may be None).
+    :param client: SenateEFDClient used for reports that are not cached
+    :param commit: False when the caller owns the transaction
+    """
+    url = f"{LIST_URL}/{report_link}"
+    cached = doc_cache.get(url)
+    if cached is not None:
+        html = cached.content.decode("utf-8", errors="replace")
+    elif doc_cache.replay or client is None:
+        print("[WARN] Not in document cache, skipping:", url)
         return 0, 0
-    soup = BeautifulSoup(driver.page_source, "html.parser")
-    # driver.quit()
+    else:
+        html = client.report_html(report_link)
+        doc_cache.put(url, html.encode("utf-8"))
+    trades = senate_ptr_trades(html)
+    inserted, _ = insert_gov_trades(conn, official_id, trades, url, commit=commit)
+    return len(trades), inserted
+
+def senate_ptr_trades(html):
+    """(date, title, ttype, amount, price) rows from the transactions table of a Senate PTR page."""
+    with PARSE_SECONDS.time(document="senate_ptr"):
+        return _senate_ptr_trades(html)
+
+def _senate_ptr_trades(html):
+    soup = BeautifulSoup(html, "html.parser")
     table = soup.find("tbody")
-    processed = 0
-    inserted = 0
+    trades = []
+    if table is None:
+        return trades
     for row in table.find_all("tr"):
         cols = row.find_all("td")
         transaction_date = cols[1].text
@@ -547,72 +977,503 @@ def process_senate_ptr(LIST_URL, report_link, official_id, driver):
             amount = round((int(high) + int(low)) / 2, 2)
         amount = float(str(amount).replace('$', ''))
 
-        ok = insert_gov_trade(official_id, transaction_date, f"{asset_name} ({ticker})", ttype, amount, "N/A", f"{LIST_URL}/{report_link}")
-        processed += 1
-        inserted += ok
-    return processed, inserted
+        trades.append((transaction_date, f"{asset_name} ({ticker})", ttype, amount, "N/A"))
+    return trades
 
 # ---------------------- Pull government disclosures ----------------------
-@app.route("/pull_gov_once")
+@bp.route("/pull_gov_once")
 def pull_gov_once():
+    """Queue a government disclosure pull; poll /jobs/<job_id> for progress and the result."""
+    job, created = job_manager.submit("gov_pull", run_gov_pull)
+    return jsonify({"job_id": job.id, "status": job.status, "created": created}), 202
+
+def run_gov_pull(job):
+    """
+    Pull recent government disclosures (House and Senate PTRs) and ingest into gov_officials/gov_trades.
+    """
+    started = pull_started()
+    if not doc_cache.replay:
+        house = ingest_house_ptrs(job=job)
+        senate = scrape_senate_ptrs(job=job)
+    else:
+        with db_pool.connection() as conn:
+            house = replay_house_ptrs(conn, job=job)
+            senate = replay_senate_ptrs(conn, job=job)
+    dashboard_cache.invalidate()
+    return {
+        "processed": house[0] + senate[0],
+        "inserted": house[1] + senate[1],
+        "house": {"processed": house[0], "inserted": house[1]},
+        "senate": {"processed": senate[0], "inserted": senate[1]},
+        "timing": pull_timing(started),
+    }
+
+# ---------------------- Replay from document cache ----------------------
+# gov_trades.source_url of a Senate report page (.../search/view/ptr/<id>/) and of a House PTR PDF
+SENATE_REPORT_URL_PATTERN = "%/search/view/%"
+HOUSE_PTR_URL_PATTERN = "%/ptr-pdfs/%"
+
+def replay_senate_ptrs(conn, job=None):
+    """Re-parse every Senate PTR we have stored trades for from doc_cache, without a browser."""
+    c = conn.cursor()
+    c.execute("SELECT DISTINCT official_id, source_url FROM gov_trades WHERE source_url LIKE %s",
+              (SENATE_REPORT_URL_PATTERN,))
+    processed, inserted = 0, 0
+    for official_id, source_url in c.fetchall():
+        list_url, _, report_link = source_url.partition("/search/")
+        report_processed, report_inserted = process_senate_ptr(
+            conn, list_url, "search/" + report_link, official_id, None)
+        processed += report_processed
+        inserted += report_inserted
+        if job:
+            job.update(reports=1, processed=report_processed, inserted=report_inserted)
+    return processed, inserted
+
+def replay_house_ptrs(conn, job=None):
     """
-    Pull recent government disclosures (house PTRs, senate, etc.) and ingest into gov_officials/gov_trades.
-    This endpoint orchestrates the example scrapers above. Tweak as needed for your reliable sources.
-    """
-    inserted = 0
-    processed = 0
-    # House PTRs
-    # house_results = scrape_house_ptrs(limit=20)
-    # for name, role, source_url, trades in house_results:
-    #     processed += 1
-    #     off_id = insert_gov_official(name, role, source_url)
-    #     for (tx_date, sec_title, tx_code, amount, price) in trades:
-    #         # tx_code may be None; we keep as-is
-    #         if tx_date is None or sec_title is None:
-    #             continue
-    #         ok = insert_gov_trade(off_id, tx_date, sec_title, tx_code or "N/A", amount, price, source_url)
-    #         if ok:
-    #             inserted += 1
-    # Senate & others (placeholders)
-    processed, inserted = scrape_senate_ptrs()
-    return jsonify({"processed": processed, "inserted": inserted})
+    Re-parse every House PTR we have stored trades for from doc_cache (or the local mirror when
+    HOUSE_CLERK_BASE is a directory), without the network. Uncached PDFs are skipped.
+    """
+    c = conn.cursor()
+    c.execute("SELECT DISTINCT official_id, source_url FROM gov_trades WHERE source_url LIKE %s",
+              (HOUSE_PTR_URL_PATTERN,))
+    processed, inserted = 0, 0
+    for official_id, source_url in c.fetchall():
+        if house_source.local:
+            content = None
+            if os.path.exists(source_url):
+                with open(source_url, "rb") as f:
+                    content = f.read()
+        else:
+            cached = doc_cache.get(source_url)
+            content = cached.content if cached is not None else None
+        if content is None:
+            print("[WARN] Not in document cache, skipping:", source_url)
+            continue
+        with PARSE_SECONDS.time(document="house_ptr"):
+            trades = parse_ptr_pdf(content)
+        report_inserted, _ = insert_gov_trades(conn, official_id, trades, source_url)
+        processed += len(trades)
+        inserted += report_inserted
+        if job:
+            job.update(reports=1, processed=len(trades), inserted=report_inserted)
+    return processed, inserted
+
+def replay_form4_filings(conn, job=None):
+    """
+    Re-parse every stored Form 4 from doc_cache and write whatever the current parser extracts
+    (rows already stored are skipped by the ON CONFLICT clauses). Uncached filings are counted
+    as missing; the network is never used.
+    """
+    c = conn.cursor()
+    c.execute("SELECT accession, url FROM filings WHERE url IS NOT NULL ORDER BY id")
+    totals = collections.Counter(filings=0, missing=0, inserted=0, skipped=0)
+    for accession, url in c.fetchall():
+        cached = doc_cache.get(url)
+        doc = parse_form4_document(cached.content) if cached is not None else None
+        if doc is None:
+            totals["missing"] += 1
+            continue
+        inserted, skipped = store_form4(conn, accession, url, doc)
+        totals.update(filings=1, inserted=inserted, skipped=skipped)
+        if job:
+            job.update(filings=1, inserted=inserted, skipped=skipped)
+    return dict(totals)
+
+@bp.route("/replay_cache")
+def replay_cache():
+    """Queue a re-parse of all cached Form 4, House and Senate PTR documents (e.g. after a parser fix)."""
+    job, created = job_manager.submit("cache_replay", run_cache_replay)
+    return jsonify({"job_id": job.id, "status": job.status, "created": created}), 202
+
+def run_cache_replay(job):
+    with db_pool.connection() as conn:
+        form4 = replay_form4_filings(conn, job)
+        house = replay_house_ptrs(conn, job)
+        senate = replay_senate_ptrs(conn, job)
+    dashboard_cache.invalidate()
+    return {"form4": form4, "house": {"processed": house[0], "inserted": house[1]},
+            "senate": {"processed": senate[0], "inserted": senate[1]}, "cache": doc_cache.stats()}
+
+# ---------------------- Background jobs ----------------------
+@bp.route("/jobs")
+def list_jobs():
+    return jsonify(job_manager.list())
+
+@bp.route("/jobs/<job_id>")
+def job_status(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": "unknown job"}), 404
+    return jsonify(job.snapshot())
+
+@bp.route("/jobs/<job_id>/stream")
+def job_stream(job_id):
+    """Server-sent events with a job snapshot each time its progress changes."""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({"error": "unknown job"}), 404
+
+    def events():
+        version = -1
+        deadline = time.monotonic() + STREAM_MAX_SECONDS
+        while time.monotonic() < deadline:
+            current = job.wait_for_change(version, timeout=JOB_STREAM_INTERVAL)
+            if current != version or job.stats_source is not None:
+                version = current
+                yield f"data: {json.dumps(job.snapshot(), default=str)}\n\n"
+            if job.done:
+                return
+
+    return Response(stream_with_context(events()), mimetype="text/event-stream")
+
+def start_scheduler():
+    """Run the pulls periodically; a tick is skipped if the previous pull is still running."""
+    for name, func in (("form4_pull", run_form4_pull), ("gov_pull", run_gov_pull)):
+        if PULL_SCHEDULE.get(name):
+            job_manager.schedule(name, func, PULL_SCHEDULE[name])
 
 # ---------------------- Tracked endpoints (shared) ----------------------
-@app.route("/track/<insider>", methods=["POST"])
+# Tracking is per person (see entities.py), so tracking "DOE JOHN A" also covers "John Doe".
+def set_tracked(conn, person_id, tracked):
+    c = conn.cursor()
+    if tracked:
+        c.execute("INSERT INTO tracked_persons (person_id) VALUES (%s) ON CONFLICT (person_id) DO NOTHING",
+                  (person_id,))
+    else:
+        c.execute("DELETE FROM tracked_persons WHERE person_id = %s", (person_id,))
+    c.execute("SELECT canonical_name FROM persons WHERE id = %s", (person_id,))
+    row = c.fetchone()
+    notify_feed(conn, {"type": "tracking", "person_id": person_id, "name": row[0] if row else None,
+                       "tracked": tracked})
+    conn.commit()
+    dashboard_cache.invalidate()
+
+@bp.route("/track/<insider>", methods=["POST"])
 def track_insider(insider):
-    c = pg_flyway.conn.cursor()
-    c.execute("INSERT INTO tracked_insiders (insider) VALUES (%s) ON CONFLICT (insider) DO NOTHING", (insider,))
-    pg_flyway.conn.commit()
-    return jsonify({"status": "tracked", "insider": insider})
+    conn = get_db()
+    person_id = resolve_person(conn, insider)
+    if person_id is None:
+        return jsonify({"error": "not a name", "insider": insider}), 400
+    set_tracked(conn, person_id, True)
+    return jsonify({"status": "tracked", "insider": insider, "person_id": person_id})
 
-@app.route("/untrack/<insider>", methods=["POST"])
+@bp.route("/untrack/<insider>", methods=["POST"])
 def untrack_insider(insider):
-    c = pg_flyway.conn.cursor()
-    c.execute("DELETE FROM tracked_insiders WHERE insider=%s", (insider,))
-    pg_flyway.conn.commit()
-    return jsonify({"status": "untracked", "insider": insider})
+    conn = get_db()
+    person_id = find_person(conn, insider)
+    if person_id is not None:
+        set_tracked(conn, person_id, False)
+    return jsonify({"status": "untracked", "insider": insider, "person_id": person_id})
 
-# ---------------------- Dashboards ----------------------
+@bp.route("/persons/<int:person_id>/track", methods=["POST"])
+def track_person(person_id):
+    set_tracked(get_db(), person_id, True)
+    return jsonify({"status": "tracked", "person_id": person_id})
 
-@app.route('/')
-@app.route("/sec_dashboard")
-def dashboard():
-    """Original Form 4 dashboard (shows trades from 'trades' table)."""
-    c = pg_flyway.conn.cursor()
+@bp.route("/persons/<int:person_id>/untrack", methods=["POST"])
+def untrack_person(person_id):
+    set_tracked(get_db(), person_id, False)
+    return jsonify({"status": "untracked", "person_id": person_id})
+
+@bp.route("/persons")
+def search_persons():
+    """Candidate people for ?q=<name>: similar or same-sounding names, best match first."""
+    return jsonify(person_candidates(get_db(), request.args.get("q", ""),
+                                     limit=min(request.args.get("limit", 10, type=int), 100)))
+
+@bp.route("/persons/<int:keep_id>/merge/<int:drop_id>", methods=["POST"])
+def merge_person(keep_id, drop_id):
+    """Confirm that two people are the same: drop_id's names, trades and tracking move to keep_id."""
+    merge_persons(get_db(), keep_id, drop_id)
+    dashboard_cache.invalidate()
+    return jsonify({"status": "merged", "person_id": keep_id, "merged": drop_id})
+
+# ---------------------- Live feed ----------------------
+# New trades and tracking changes are pushed to open dashboards over server-sent events.
+# One listener per process turns each committed batch into one query; clients only filter.
+FEED_KEEPALIVE = 15.0
+feed_broadcaster = Broadcaster(history=1000)
+
+def load_feed_trades(conn, source, ids):
+    """all_trades rows of one inserted batch, newest first, in the shape of the dashboard rows."""
+    c = conn.cursor()
     c.execute("""
-        SELECT filings.insider, filings.issuer, trades.transaction_date,
-               trades.security_title, trades.transaction_type,
-               trades.amount, trades.price, filings.url,
-               CASE WHEN tracked_insiders.insider IS NOT NULL THEN 1 ELSE 0 END AS is_tracked
-        FROM trades
-        JOIN filings ON trades.filing_id = filings.id
-        LEFT JOIN tracked_insiders ON filings.insider = tracked_insiders.insider
-        ORDER BY is_tracked DESC, trades.transaction_date DESC
-        LIMIT 1000
-    """)
-    rows = c.fetchall()
-
-    html = """
+        SELECT name, detail, transaction_date, security_title, transaction_type, amount, price, url, trade_id,
+               person_id
+        FROM all_trades
+        WHERE source = %s AND trade_id = ANY(%s)
+        ORDER BY transaction_date DESC NULLS LAST, trade_id DESC
+    """, (source, list(ids)))
+    return [{
+        "id": r[8], "name": r[0], "detail": r[1], "transaction_date": r[2].isoformat() if r[2] else None,
+        "security_title": r[3], "transaction_type": r[4], "amount": r[5], "price": r[6], "url": r[7],
+        "source": source, "person_id": r[9],
+    } for r in c.fetchall()]
+
+def load_tracked_persons(conn):
+    c = conn.cursor()
+    c.execute("SELECT person_id FROM tracked_persons")
+    return [r[0] for r in c.fetchall()]
+
+def invalidate_caches():
+    """
+    Drop cached dashboard pages and analytics. Run for every feed notification, so trades and
+    tracking changes committed by any process (other app workers, queue_worker.py, backfill.py)
+    reach this one; the local invalidate() calls after writes stay as the fast path.
+    """
+    dashboard_cache.invalidate()
+    analytics_cache.invalidate()
+
+feed_listener = FeedListener(db_connect_kwargs, feed_broadcaster, load_feed_trades, load_tracked_persons,
+                             on_notify=invalidate_caches)
+
+@bp.route("/feed")
+def live_feed():
+    """
+    Server-sent events: `trades` (rows of newly stored trades) and `tracking` (a person was tracked
+    or untracked). Filters: ?source=SEC|GOV (repeatable), ?name=<name> (repeatable), ?tracked=1
+    for tracked people only. Streams end after STREAM_MAX_SECONDS; reconnecting clients resume
+    from Last-Event-ID while it is in history.
+    """
+    feed_listener.ensure_started()
+    feed_filter = FeedFilter(sources=[s.upper() for s in request.args.getlist("source")],
+                             names=request.args.getlist("name"),
+                             tracked_only=request.args.get("tracked") == "1")
+    last_seen = request.headers.get("Last-Event-ID", type=int)
+    if last_seen is None:
+        last_seen = feed_broadcaster.stats()["seq"]
+
+    def events():
+        seq = last_seen
+        deadline = time.monotonic() + STREAM_MAX_SECONDS
+        yield "retry: 3000\n\n"
+        while time.monotonic() < deadline:
+            batch = feed_broadcaster.events_after(seq, timeout=FEED_KEEPALIVE)
+            if not batch:
+                yield ": keepalive\n\n"
+                continue
+            for seq, kind, data in batch:
+                if kind == "trades":
+                    rows = feed_filter.rows(feed_broadcaster, data)
+                    if not rows:
+                        continue
+                    data = {"source": data["source"],
+                            "rows": [dict(r, tracked=feed_broadcaster.is_tracked(r["person_id"])) for r in rows]}
+                yield f"id: {seq}\nevent: {kind}\ndata: {json.dumps(data, default=str)}\n\n"
+        # the reconnecting client resumes after everything checked here, including filtered events
+        yield f"id: {seq}\n\n"
+
+    return Response(stream_with_context(events()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+# ---------------------- Dashboards ----------------------
+# Dashboard pages are served from a short-lived cache that is dropped whenever ingestion
+# stores new trades or the tracked list changes, in this process or (through the feed
+# listener, started by the first cached read) in any other.
+DASHBOARD_PAGE_SIZE = 100
+DASHBOARD_MAX_PAGE_SIZE = 500
+dashboard_cache = TTLCache(ttl=30)
+# query: building a page on a cache miss; render: turning a page into HTML or JSON
+DASHBOARD_SECONDS = metrics.registry.histogram("dashboard_seconds", "Dashboard time by view and phase")
+
+# Per dashboard: the joined trade rows (name, detail, date, title, type, amount, price, url, id,
+# person id) and the person column matched against tracked_persons. Pages are read newest first with a
+# (transaction_date, id) keyset, tracked names before everyone else; within each, trades without a
+# transaction date follow the dated ones, newest id first.
+DASHBOARD_QUERIES = {
+    "sec": {
+        "select": """
+            SELECT f.insider, f.issuer, t.transaction_date, t.security_title, t.transaction_type,
+                   t.amount, t.price, f.url, t.id, f.person_id
+            FROM trades t
+            JOIN filings f ON t.filing_id = f.id
+        """,
+        "person": "f.person_id",
+        "key": "t",
+    },
+    "gov": {
+        "select": """
+            SELECT go.name, go.role, gt.transaction_date, gt.security_title, gt.transaction_type,
+                   gt.amount, gt.price, gt.source_url, gt.id, go.person_id
+            FROM gov_trades gt
+            JOIN gov_officials go ON gt.official_id = go.id
+        """,
+        "person": "go.person_id",
+        "key": "gt",
+    },
+}
+
+# Segments of a dashboard in page order: (tracked, dated)
+DASHBOARD_SEGMENTS = [(True, True), (True, False), (False, True), (False, False)]
+
+def encode_page_cursor(tracked, transaction_date, row_id):
+    return f"{int(tracked)}.{transaction_date.isoformat() if transaction_date else ''}.{row_id}"
+
+def decode_page_cursor(cursor):
+    """(tracked, transaction_date or None, id) from encode_page_cursor(); ValueError if malformed."""
+    tracked, date, row_id = cursor.split(".")
+    return tracked == "1", datetime.date.fromisoformat(date) if date else None, int(row_id)
+
+def dashboard_segment(conn, source, tracked, after, limit, dated=True):
+    """
+    Rows of one segment (tracked or untracked people, with or without a transaction date) of a
+    dashboard, after an optional (date, id) key; undated segments are keyed on the id alone.
+    Each segment is its own query so both read the (transaction_date, id) index in order.
+    """
+    query = DASHBOARD_QUERIES[source]
+    key = query["key"]
+    sql = query["select"] + f"""
+        WHERE {'' if tracked else 'NOT '}EXISTS (SELECT 1 FROM tracked_persons tp WHERE tp.person_id = {query['person']})
+          AND {key}.transaction_date IS {'NOT ' if dated else ''}NULL
+    """
+    params = []
+    if after is not None and dated:
+        sql += f" AND ({key}.transaction_date, {key}.id) < (%s, %s)"
+        params.extend(after)
+    elif after is not None:
+        sql += f" AND {key}.id < %s"
+        params.append(after[1])
+    sql += f" ORDER BY {key}.transaction_date DESC, {key}.id DESC LIMIT %s"
+    params.append(limit)
+    c = conn.cursor()
+    c.execute(sql, params)
+    return [{
+        "id": r[8], "name": r[0], "detail": r[1], "transaction_date": r[2].isoformat() if r[2] else None,
+        "security_title": r[3], "transaction_type": r[4], "amount": r[5], "price": r[6],
+        "url": r[7], "person_id": r[9], "tracked": tracked,
+    } for r in c.fetchall()]
+
+def dashboard_page(conn, source, cursor=None, limit=DASHBOARD_PAGE_SIZE):
+    """
+    One page of a dashboard as {"rows": [...], "next_cursor": ...}. Tracked names come first;
+    once they run out the page continues with everyone else (see DASHBOARD_SEGMENTS).
+    """
+    def compute():
+        with DASHBOARD_SECONDS.time(view=source, phase="query"):
+            return build()
+
+    def build():
+        segments, after = DASHBOARD_SEGMENTS, None
+        if cursor:
+            tracked, date, row_id = decode_page_cursor(cursor)
+            segments = segments[segments.index((tracked, date is not None)):]
+            after = (date, row_id)
+        rows = []
+        for tracked, dated in segments:
+            if len(rows) == limit:
+                break
+            rows += dashboard_segment(conn, source, tracked, after, limit - len(rows), dated)
+            after = None
+        next_cursor = None
+        if len(rows) == limit:
+            last = rows[-1]
+            date = last["transaction_date"]
+            next_cursor = encode_page_cursor(last["tracked"], datetime.date.fromisoformat(date) if date else None,
+                                             last["id"])
+        return {"rows": rows, "next_cursor": next_cursor}
+    feed_listener.ensure_started()
+    return dashboard_cache.get_or_compute((source, cursor, limit), compute)
+
+def page_request_args():
+    """(cursor, limit) from the query string, raising ValueError for a malformed cursor."""
+    cursor = request.args.get("cursor") or None
+    if cursor:
+        decode_page_cursor(cursor)
+    limit = min(max(request.args.get("limit", DASHBOARD_PAGE_SIZE, type=int), 1), DASHBOARD_MAX_PAGE_SIZE)
+    return cursor, limit
+
+@bp.route("/api/sec_trades")
+def api_sec_trades():
+    """Form 4 trades, tracked insiders first then newest first; follow next_cursor for more."""
+    try:
+        cursor, limit = page_request_args()
+    except ValueError:
+        return jsonify({"error": "invalid cursor"}), 400
+    page = dashboard_page(get_db(), "sec", cursor, limit)
+    with DASHBOARD_SECONDS.time(view="sec", phase="render"):
+        return jsonify(page)
+
+@bp.route("/api/gov_trades")
+def api_gov_trades():
+    """Government official trades, tracked names first then newest first; follow next_cursor for more."""
+    try:
+        cursor, limit = page_request_args()
+    except ValueError:
+        return jsonify({"error": "invalid cursor"}), 400
+    page = dashboard_page(get_db(), "gov", cursor, limit)
+    with DASHBOARD_SECONDS.time(view="gov", phase="render"):
+        return jsonify(page)
+
+# Rows beyond the first page are fetched from the JSON endpoints and appended client side
+DASHBOARD_ROWS_SCRIPT = """
+    <script>
+    let nextCursor = {{ next_cursor|tojson }};
+    function addRows(rows, prepend) {
+        const table = document.getElementById("trades");
+        for (const r of (prepend ? rows.slice().reverse() : rows)) {
+            const tr = table.insertRow(prepend ? 1 : -1);
+            tr.dataset.person = r.person_id;
+            if (r.tracked) tr.className = "tracked";
+            tr.onclick = () => toggleTrack(r.person_id, r.name, tr);
+            const cells = [r.name, r.detail, null, r.security_title, r.transaction_type, r.amount, r.price];
+            cells.forEach((value, i) => {
+                const td = tr.insertCell();
+                if (i === 2) {
+                    const a = document.createElement("a");
+                    a.href = r.url; a.target = "_blank"; a.textContent = r.transaction_date;
+                    td.appendChild(a);
+                } else {
+                    td.textContent = value === null ? "None" : value;
+                }
+            });
+        }
+    }
+    function loadMore() {
+        if (!nextCursor) return;
+        fetch('{{ api_url }}?cursor=' + encodeURIComponent(nextCursor))
+            .then(r => r.json())
+            .then(page => {
+                addRows(page.rows);
+                nextCursor = page.next_cursor;
+                if (!nextCursor) document.getElementById("more").style.display = "none";
+            });
+    }
+    // new trades and tracking changes arrive over the live feed instead of reloading the page
+    const feed = new EventSource('/feed?source={{ feed_source }}');
+    feed.addEventListener("trades", e => addRows(JSON.parse(e.data).rows, true));
+    feed.addEventListener("tracking", e => {
+        const change = JSON.parse(e.data);
+        for (const tr of document.querySelectorAll("#trades tr[data-person]")) {
+            if (tr.dataset.person === String(change.person_id)) tr.classList.toggle("tracked", change.tracked);
+        }
+    });
+    </script>
+    <button id="more" onclick="loadMore()" style="margin-top:10px; padding:10px 20px;{% if not next_cursor %} display:none;{% endif %}">Load more</button>
+"""
+
+DASHBOARD_TABLE = """
+    <table id="trades" border='1' cellpadding='5' width='100%'>
+        <tr>
+            <th>{{ name_header }}</th><th>{{ detail_header }}</th><th>Date</th><th>Security</th><th>Type</th><th>Amount</th><th>Price</th>
+        </tr>
+        {% for r in rows %}
+        <tr class="{% if r.tracked %}tracked{% endif %}" data-person="{{ r.person_id }}" onclick="toggleTrack({{ r.person_id|tojson }}, `{{ r.name }}`, this)">
+            <td>{{ r.name }}</td>
+            <td>{{ r.detail }}</td>
+            <td><a href="{{ r.url }}" target="_blank">{{ r.transaction_date or '' }}</a></td>
+            <td>{{ r.security_title }}</td>
+            <td>{{ r.transaction_type }}</td>
+            <td>{{ r.amount }}</td>
+            <td>{{ r.price }}</td>
+        </tr>
+        {% endfor %}
+    </table>
+"""
+
+# Compiled once at import instead of on every request; autoescaped like Flask's own templates
+TEMPLATES = jinja2.Environment(autoescape=True)
+SEC_DASHBOARD_TEMPLATE = TEMPLATES.from_string("""
     <h1>SEC Form 4 — Government Insider Trades</h1>
 
     <style>
@@ -629,62 +1490,38 @@ def dashboard():
         document.getElementById("status").innerText = "Pulling latest filings...";
         fetch('/pull_once')
             .then(r => r.json())
-            .then(data => {
-                document.getElementById("status").innerText = "Processed " + data.processed + ", Inserted " + data.inserted;
-                setTimeout(() => location.reload(), 1000);
+            .then(data => pollJob(data.job_id))
+            .catch(e=> { document.getElementById("status").innerText = "Error"; })
+    }
+    function pollJob(jobId) {
+        fetch('/jobs/' + jobId)
+            .then(r => r.json())
+            .then(job => {
+                const p = job.progress || {};
+                if (job.status === "finished") {
+                    document.getElementById("status").innerText = "Processed " + job.result.processed + ", Inserted " + job.result.inserted;
+                } else if (job.status === "failed") {
+                    document.getElementById("status").innerText = "Error: " + job.error;
+                } else {
+                    document.getElementById("status").innerText = "Pull " + job.status + ": processed " + (p.processed || 0) + ", inserted " + (p.inserted || 0);
+                    setTimeout(() => pollJob(jobId), 1000);
+                }
             }).catch(e=> { document.getElementById("status").innerText = "Error"; })
     }
-    function toggleTrack(insider, row) {
+    function toggleTrack(personId, insider, row) {
         const isTracked = row.classList.contains("tracked");
-        const url = isTracked ? `/untrack/${insider}` : `/track/${insider}`;
+        const action = isTracked ? "untrack" : "track";
+        const url = personId === null ? `/${action}/${insider}` : `/persons/${personId}/${action}`;
         fetch(url, { method: "POST" })
           .then(r => r.json())
           .then(data => {
-              row.classList.toggle("tracked");
-              setTimeout(() => location.reload(), 500);
+              row.classList.toggle("tracked", data.status === "tracked");
           });
     }
     </script>
+""" + DASHBOARD_TABLE + DASHBOARD_ROWS_SCRIPT)
 
-    <table border='1' cellpadding='5' width='100%'>
-        <tr>
-            <th>Insider</th><th>Issuer</th><th>Date</th><th>Security</th><th>Type</th><th>Amount</th><th>Price</th>
-        </tr>
-        {% for r in rows %}
-        <tr class="{% if r[8] == 1 %}tracked{% endif %}" onclick="toggleTrack(`{{ r[0] }}`, this)">
-            <td>{{ r[0] }}</td>
-            <td>{{ r[1] }}</td>
-            <td><a href="{{ r[7] }}" target="_blank">{{ r[2] }}</a></td>
-            <td>{{ r[3] }}</td>
-            <td>{{ r[4] }}</td>
-            <td>{{ r[5] }}</td>
-            <td>{{ r[6] }}</td>
-        </tr>
-        {% endfor %}
-    </table>
-    """
-    return render_template_string(html, rows=rows)
-
-@app.route("/gov_dashboard")
-def gov_dashboard():
-    """
-    Government officials dashboard (shows gov_trades joined with gov_officials).
-    Tracked insiders from tracked_insiders table will float to the top and be highlighted.
-    """
-    c = pg_flyway.conn.cursor()
-    c.execute("""
-        SELECT go.name, go.role, gt.transaction_date, gt.security_title,
-               gt.transaction_type, gt.amount, gt.price, gt.source_url,
-               CASE WHEN ti.insider IS NOT NULL THEN 1 ELSE 0 END AS is_tracked
-        FROM gov_trades gt
-        JOIN gov_officials go ON gt.official_id = go.id
-        LEFT JOIN tracked_insiders ti ON go.name = ti.insider
-        ORDER BY is_tracked DESC, gt.transaction_date DESC
-        LIMIT 1000
-    """)
-    rows = c.fetchall()
-
-    html = """
+GOV_DASHBOARD_TEMPLATE = TEMPLATES.from_string("""
     <h1>Periodic Trade Reports — Government Disclosures</h1>
 
     <style>
@@ -703,77 +1540,40 @@ def gov_dashboard():
         document.getElementById("status").innerText = "Pulling government disclosures...";
         fetch('/pull_gov_once')
             .then(r => r.json())
-            .then(data => {
-                document.getElementById("status").innerText = "Processed " + data.processed + ", Inserted " + data.inserted;
-                setTimeout(() => location.reload(), 1000);
+            .then(data => pollJob(data.job_id))
+            .catch(e=> { document.getElementById("status").innerText = "Error"; })
+    }
+    function pollJob(jobId) {
+        fetch('/jobs/' + jobId)
+            .then(r => r.json())
+            .then(job => {
+                const p = job.progress || {};
+                if (job.status === "finished") {
+                    document.getElementById("status").innerText = "Processed " + job.result.processed + ", Inserted " + job.result.inserted;
+                } else if (job.status === "failed") {
+                    document.getElementById("status").innerText = "Error: " + job.error;
+                } else {
+                    document.getElementById("status").innerText = "Pull " + job.status + ": processed " + (p.processed || 0) + ", inserted " + (p.inserted || 0);
+                    setTimeout(() => pollJob(jobId), 1000);
+                }
             }).catch(e=> { document.getElementById("status").innerText = "Error"; })
     }
-    function toggleTrack(name, row) {
+    function toggleTrack(personId, name, row) {
         const isTracked = row.classList.contains("tracked");
-        const url = isTracked ? `/untrack/${name}` : `/track/${name}`;
+        const action = isTracked ? "untrack" : "track";
+        const url = personId === null ? `/${action}/${name}` : `/persons/${personId}/${action}`;
         fetch(url, { method: "POST" })
           .then(r => r.json())
           .then(data => {
-              row.classList.toggle("tracked");
-              setTimeout(() => location.reload(), 500);
+              row.classList.toggle("tracked", data.status === "tracked");
           });
     }
     </script>
+""" + DASHBOARD_TABLE + DASHBOARD_ROWS_SCRIPT)
 
-    <table border='1' cellpadding='5' width='100%'>
-        <tr>
-            <th>Official</th><th>Role</th><th>Date</th><th>Security</th><th>Type</th><th>Amount</th><th>Price</th>
-        </tr>
-        {% for r in rows %}
-        <tr class="{% if r[8] == 1 %}tracked{% endif %}" onclick="toggleTrack(`{{ r[0] }}`, this)">
-            <td>{{ r[0] }}</td>
-            <td>{{ r[1] }}</td>
-            <td><a href="{{ r[7] }}" target="_blank">{{ r[2] }}</a></td>
-            <td>{{ r[3] }}</td>
-            <td>{{ r[4] }}</td>
-            <td>{{ r[5] }}</td>
-            <td>{{ r[6] }}</td>
-        </tr>
-        {% endfor %}
-    </table>
-    """
-    return render_template_string(html, rows=rows)
-
-@app.route("/dashboard_tracked")
-def dashboard_tracked():
-    c = pg_flyway.conn.cursor()
-
-    # --- SEC tracked insiders ---
-    c.execute("""
-        SELECT filings.insider, filings.issuer, trades.transaction_date,
-               trades.security_title, trades.transaction_type,
-               trades.amount, trades.price, filings.url, 'SEC' AS source
-        FROM trades
-        JOIN filings ON trades.filing_id = filings.id
-        JOIN tracked_insiders ON filings.insider = tracked_insiders.insider
-    """)
-
-    sec_rows = c.fetchall()
-
-    # --- GOV tracked officials ---
-    c.execute("""
-        SELECT go.name, go.role, gt.transaction_date,
-               gt.security_title, gt.transaction_type,
-               gt.amount, gt.price, gt.source_url, 'GOV' AS source
-        FROM gov_trades gt
-        JOIN gov_officials go ON gt.official_id = go.id
-        JOIN tracked_insiders ti ON go.name = ti.insider
-    """)
-
-    gov_rows = c.fetchall()
-
-    # merge and sort by date desc
-    rows = sec_rows + gov_rows
-    rows.sort(key=lambda r: r[2], reverse=True)  # sort by transaction_date
-
-    html = """
+TRACKED_DASHBOARD_TEMPLATE = TEMPLATES.from_string("""
     <h1>Tracked Trades (SEC + Government)</h1>
-    <p>This view shows <b>ALL</b> tracked insiders + government officials.</p>
+    <p>This view shows <b>ALL</b> tracked insiders + government officials, across every spelling of their names.</p>
 
     <a href="/sec_dashboard"
        style="padding:10px 20px; background:#0074D9; color:white; text-decoration:none;">
@@ -787,7 +1587,7 @@ def dashboard_tracked():
         th { background: #f0f0f0; }
     </style>
 
-    <table border='1' cellpadding='5' width='100%'>
+    <table id="trades" border='1' cellpadding='5' width='100%'>
         <tr>
             <th>Name</th>
             <th>Issuer/Role</th>
@@ -800,24 +1600,269 @@ def dashboard_tracked():
         </tr>
 
         {% for r in rows %}
-        <tr>
-            <td>{{ r[0] }}</td>
-            <td>{{ r[1] }}</td>
-            <td><a href="{{ r[7] }}" target="_blank">{{ r[2] }}</a></td>
-            <td>{{ r[3] }}</td>
-            <td>{{ r[4] }}</td>
-            <td>{{ r[5] }}</td>
-            <td>{{ r[6] }}</td>
-            <td>{{ r[8] }}</td>
+        <tr data-person="{{ r.person_id }}">
+            <td>{{ r.name }}</td>
+            <td>{{ r.detail }}</td>
+            <td><a href="{{ r.url }}" target="_blank">{{ r.transaction_date or '' }}</a></td>
+            <td>{{ r.security_title }}</td>
+            <td>{{ r.transaction_type }}</td>
+            <td>{{ r.amount }}</td>
+            <td>{{ r.price }}</td>
+            <td>{{ r.source }}</td>
         </tr>
         {% endfor %}
     </table>
+
+    <script>
+    let nextCursor = {{ next_cursor|tojson }};
+    function addRows(rows, prepend) {
+        const table = document.getElementById("trades");
+        for (const r of (prepend ? rows.slice().reverse() : rows)) {
+            const tr = table.insertRow(prepend ? 1 : -1);
+            tr.dataset.person = r.person_id;
+            [r.name, r.detail, null, r.security_title, r.transaction_type, r.amount, r.price, r.source].forEach((value, i) => {
+                const td = tr.insertCell();
+                if (i === 2) {
+                    const a = document.createElement("a");
+                    a.href = r.url; a.target = "_blank"; a.textContent = r.transaction_date;
+                    td.appendChild(a);
+                } else {
+                    td.textContent = value === null ? "None" : value;
+                }
+            });
+        }
+    }
+    function showPage(page) {
+        addRows(page.rows);
+        nextCursor = page.next_cursor;
+        document.getElementById("more").style.display = nextCursor ? "" : "none";
+    }
+    function loadMore() {
+        if (!nextCursor) return;
+        fetch('/api/tracked_trades?cursor=' + encodeURIComponent(nextCursor)).then(r => r.json()).then(showPage);
+    }
+    const feed = new EventSource('/feed?tracked=1');
+    feed.addEventListener("trades", e => addRows(JSON.parse(e.data).rows, true));
+    feed.addEventListener("tracking", e => {
+        const change = JSON.parse(e.data);
+        if (!change.tracked) {
+            for (const tr of document.querySelectorAll("#trades tr[data-person]")) {
+                if (tr.dataset.person === String(change.person_id)) tr.remove();
+            }
+            return;
+        }
+        // a newly tracked person brings their history: start over from the first page
+        fetch('/api/tracked_trades').then(r => r.json()).then(page => {
+            for (const tr of document.querySelectorAll("#trades tr[data-person]")) tr.remove();
+            showPage(page);
+        });
+    });
+    </script>
+    <button id="more" onclick="loadMore()" style="margin-top:10px; padding:10px 20px;{% if not next_cursor %} display:none;{% endif %}">Load more</button>
+""")
+
+@bp.route('/')
+@bp.route("/sec_dashboard")
+def dashboard():
+    """Original Form 4 dashboard (first page of /api/sec_trades; more rows load on demand)."""
+    page = dashboard_page(get_db(), "sec")
+    with DASHBOARD_SECONDS.time(view="sec", phase="render"):
+        return SEC_DASHBOARD_TEMPLATE.render(rows=page["rows"], next_cursor=page["next_cursor"],
+                                             api_url="/api/sec_trades", feed_source="SEC",
+                                             name_header="Insider", detail_header="Issuer")
+
+@bp.route("/gov_dashboard")
+def gov_dashboard():
+    """
+    Government officials dashboard (gov_trades joined with gov_officials, first page of /api/gov_trades).
+    Tracked people from the tracked_persons table will float to the top and be highlighted.
+    """
+    page = dashboard_page(get_db(), "gov")
+    with DASHBOARD_SECONDS.time(view="gov", phase="render"):
+        return GOV_DASHBOARD_TEMPLATE.render(rows=page["rows"], next_cursor=page["next_cursor"],
+                                             api_url="/api/gov_trades", feed_source="GOV",
+                                             name_header="Official", detail_header="Role")
+
+def encode_tracked_cursor(transaction_date, source, trade_id):
+    return f"{transaction_date.isoformat() if transaction_date else ''}.{source}.{trade_id}"
+
+def decode_tracked_cursor(cursor):
+    """(transaction_date or None, source, trade_id) from encode_tracked_cursor(); ValueError if malformed."""
+    date, source, trade_id = cursor.split(".")
+    return datetime.date.fromisoformat(date) if date else None, source, int(trade_id)
+
+def tracked_trades(conn, after=None, limit=DASHBOARD_PAGE_SIZE, dated=True):
+    """
+    SEC and government trades of every tracked person from all_trades, newest first, after an
+    optional (transaction_date, source, trade_id) key; with dated=False the trades without a
+    transaction date, keyed on (source, trade_id) alone.
+    """
+    sql = f"""
+        SELECT a.name, a.detail, a.transaction_date, a.security_title, a.transaction_type,
+               a.amount, a.price, a.url, a.source, a.trade_id, a.person_id
+        FROM all_trades a
+        JOIN tracked_persons tp ON a.person_id = tp.person_id
+        WHERE a.transaction_date IS {'NOT ' if dated else ''}NULL
+    """
+    params = []
+    if after is not None and dated:
+        sql += " AND (a.transaction_date, a.source, a.trade_id) < (%s, %s, %s)"
+        params.extend(after)
+    elif after is not None:
+        sql += " AND (a.source, a.trade_id) < (%s, %s)"
+        params.extend(after[1:])
+    sql += " ORDER BY a.transaction_date DESC, a.source DESC, a.trade_id DESC LIMIT %s"
+    params.append(limit)
+    c = conn.cursor()
+    c.execute(sql, params)
+    return c.fetchall()
+
+def tracked_page(conn, cursor=None, limit=DASHBOARD_PAGE_SIZE):
+    """
+    One page of the tracked dashboard as {"rows": [...], "next_cursor": ...}; undated trades
+    follow the dated ones.
+    """
+    def compute():
+        with DASHBOARD_SECONDS.time(view="tracked", phase="query"):
+            return build()
+
+    def build():
+        after = decode_tracked_cursor(cursor) if cursor else None
+        found = []
+        for dated in (True, False):
+            if after is not None and dated and after[0] is None:
+                continue
+            if len(found) == limit:
+                break
+            found += tracked_trades(conn, after, limit - len(found), dated)
+            after = None
+        rows = [{
+            "name": r[0], "detail": r[1], "transaction_date": r[2].isoformat() if r[2] else None,
+            "security_title": r[3], "transaction_type": r[4], "amount": r[5], "price": r[6], "url": r[7],
+            "source": r[8], "id": r[9], "person_id": r[10],
+        } for r in found]
+        next_cursor = None
+        if len(rows) == limit:
+            last = rows[-1]
+            date = last["transaction_date"]
+            next_cursor = encode_tracked_cursor(datetime.date.fromisoformat(date) if date else None,
+                                                last["source"], last["id"])
+        return {"rows": rows, "next_cursor": next_cursor}
+    feed_listener.ensure_started()
+    return dashboard_cache.get_or_compute(("tracked", cursor, limit), compute)
+
+@bp.route("/api/tracked_trades")
+def api_tracked_trades():
+    """Trades of tracked names across SEC and government sources, newest first; follow next_cursor for more."""
+    cursor = request.args.get("cursor") or None
+    limit = min(max(request.args.get("limit", DASHBOARD_PAGE_SIZE, type=int), 1), DASHBOARD_MAX_PAGE_SIZE)
+    try:
+        page = tracked_page(get_db(), cursor, limit)
+    except ValueError:
+        return jsonify({"error": "invalid cursor"}), 400
+    with DASHBOARD_SECONDS.time(view="tracked", phase="render"):
+        return jsonify(page)
+
+@bp.route("/dashboard_tracked")
+def dashboard_tracked():
+    page = tracked_page(get_db())
+    with DASHBOARD_SECONDS.time(view="tracked", phase="render"):
+        return TRACKED_DASHBOARD_TEMPLATE.render(rows=page["rows"], next_cursor=page["next_cursor"])
+
+# ---------------------- Analytics ----------------------
+# The trade columns are loaded once and kept, with the reports computed from them, until ingestion
+# or tracking invalidates the dashboard cache; every report after the load is array arithmetic
+# (see analytics.py).
+ANALYTICS_TTL = 600
+ANALYTICS_MAX_WINDOWS = 104
+analytics_cache = TTLCache(ttl=ANALYTICS_TTL, max_entries=32)
+analytics_generation = [dashboard_cache.generation]
+
+def analytics_columns(conn):
+    feed_listener.ensure_started()
+    if analytics_generation[0] != dashboard_cache.generation:
+        analytics_generation[0] = dashboard_cache.generation
+        analytics_cache.invalidate()
+
+    def load():
+        started = time.perf_counter()
+        cols = analytics.load_trades(conn)
+        print(f"[INFO] Analytics: loaded {len(cols)} trades in {time.perf_counter() - started:.2f}s")
+        return cols
+    with DASHBOARD_SECONDS.time(view="analytics", phase="query"):
+        return analytics_cache.get_or_compute(("columns",), load)
+
+@bp.route("/analytics")
+def analytics_endpoint():
+    """
+    Cluster buys, net flows per issuer and person, and unusual activity per person, as of a date.
+    Query parameters: as_of (YYYY-MM-DD), window (days), windows, min_insiders, z, source (SEC|GOV), limit.
     """
+    try:
+        as_of = request.args.get("as_of")
+        as_of = datetime.date.fromisoformat(as_of) if as_of else None
+        window = request.args.get("window", 30, type=int)
+        windows = request.args.get("windows", 12, type=int)
+        min_insiders = request.args.get("min_insiders", 3, type=int)
+        threshold = request.args.get("z", 2.5, type=float)
+        limit = min(max(request.args.get("limit", 25, type=int), 1), DASHBOARD_MAX_PAGE_SIZE)
+        source = (request.args.get("source") or "").upper() or None
+        if window < 1 or not 1 <= windows <= ANALYTICS_MAX_WINDOWS or min_insiders < 1 or source not in (None, "SEC", "GOV"):
+            raise ValueError
+    except ValueError:
+        return jsonify({"error": "invalid analytics parameters"}), 400
+    conn = get_db()
+    cols = analytics_columns(conn)
+    key = ("analytics", as_of, window, windows, min_insiders, threshold, source, limit)
+    result = analytics_cache.get_or_compute(key, lambda: analytics.report(
+        conn, cols, as_of, window, windows, min_insiders, threshold, source, limit))
+    with DASHBOARD_SECONDS.time(view="analytics", phase="render"):
+        return jsonify(result)
+
+# ---------------------- Metrics ----------------------
+# Histograms and counters are recorded where the work happens (request_scheduler, waits,
+# pg_flyway's TimedConnection, parsing and dashboards above); these gauges are read at scrape time.
+metrics.registry.gauge("process_resident_memory_bytes", "Resident memory of the app process",
+                       callback=lambda: psutil.Process().memory_info().rss)
+metrics.registry.gauge("dashboard_cache_lookups", "Dashboard cache lookups since start, by result",
+                       callback=lambda: {(("result", "hit"),): dashboard_cache.hits,
+                                         (("result", "miss"),): dashboard_cache.misses})
+metrics.registry.gauge("jobs", "Background jobs by status",
+                       callback=lambda: dict(collections.Counter(
+                           (("status", job["status"]),) for job in job_manager.list())))
+
+@bp.route("/metrics")
+def metrics_endpoint():
+    """Prometheus scrape endpoint (text exposition format)."""
+    return Response(metrics.registry.render(), mimetype="text/plain; version=0.0.4")
+
+# ---------------------- App factory ----------------------
+def create_app(schedule: bool = False):
+    """
+    Build the Flask app. Neither importing this module nor creating the app touches Postgres:
+    the connection pool opens (and sets up the schema, see SCHEMA_SETUP) when a request first
+    needs it.
+        gunicorn 'main:create_app()'
+        flask --app main migrate
+    :param schedule: also run the periodic pulls (PULL_SCHEDULE) in this process
+    """
+    app = Flask(__name__)
+    app.register_blueprint(bp)
+    app.teardown_appcontext(release_db)
+
+    @app.cli.command("migrate")
+    def migrate_command():
+        """Create the database, apply pending migrations and resolve persons (once per deploy)."""
+        print("[INFO] Migrations applied:", setup_schema() or "none")
 
-    return render_template_string(html, rows=rows)
+    if schedule:
+        start_scheduler()
+    return app
 
 # ---------------------- Run App ----------------------
 if __name__ == "__main__":
+    # the scheduler only runs in the reloader's serving process
+    app = create_app(schedule=os.environ.get("WERKZEUG_RUN_MAIN") == "true")
     app.run(port=5050, debug=True)
     # delete_gov_officials()
     # delete_gov_trades()
\ No newline at end of file
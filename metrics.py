@@ -0,0 +1,258 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+
+Counters, gauges and histograms live in one registry; render() produces what a Prometheus
+server scrapes from /metrics, and snapshot()/since() give the per-series totals accumulated
+between two points in time, so a pull can report where its time went (throttling, network,
+parsing, database) next to its results.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# Seconds; spans a cached lookup (sub-millisecond) to a slow page load
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def exponential_buckets(start: float, factor: float, count: int) -> tuple:
+    """`count` bucket bounds starting at `start`, each `factor` times the previous."""
+    return tuple(round(start * factor ** i, 6) for i in range(count))
+
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: tuple) -> str:
+    if not key:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, v in key)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(key, escaped)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """
+    Monotonic counter per label set
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str):
+        """
+        Initialization
+        :param name: metric name (Prometheus conventions: *_total for counters)
+        :param help: one-line description
+        """
+        self.name = name
+        self.help = help
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self):
+        with self.lock:
+            return [(self.name, key, value) for key, value in self.values.items()]
+
+    def totals(self) -> dict:
+        with self.lock:
+            return {key: (value, value) for key, value in self.values.items()}
+
+
+class Gauge:
+    """
+    Current value per label set, either set directly or read from a callback at scrape time
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, callback=None):
+        """
+        Initialization
+        :param callback: optional zero-argument callable returning a number, or a dict of
+            {((label, value), ...): number} for several label sets
+        """
+        self.name = name
+        self.help = help
+        self.callback = callback
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def set(self, value: float, **labels):
+        with self.lock:
+            self.values[_label_key(labels)] = value
+
+    def samples(self):
+        if self.callback is not None:
+            try:
+                value = self.callback()
+            except Exception:
+                return []
+            if not isinstance(value, dict):
+                return [(self.name, (), value)]
+            return [(self.name, _label_key(dict(key)), v) for key, v in value.items()]
+        with self.lock:
+            return [(self.name, key, value) for key, value in self.values.items()]
+
+    def totals(self) -> dict:
+        return {}
+
+
+class Histogram:
+    """
+    Distribution of observed values (normally seconds) per label set
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, buckets=DEFAULT_BUCKETS):
+        """
+        Initialization
+        :param buckets: upper bounds of the cumulative buckets, ascending
+        """
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """
+        Observe the seconds spent in the with-block
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def quantile(self, q: float, **labels):
+        """
+        Estimate of the q-quantile (0..1) of one series, interpolated linearly inside its bucket
+        as Prometheus' histogram_quantile() does; None without observations. Values beyond the
+        last bucket are reported as its upper bound.
+        """
+        with self.lock:
+            series = self.series.get(_label_key(labels))
+            counts = list(series[0]) if series else None
+        if not counts or not sum(counts):
+            return None
+        rank = q * sum(counts)
+        cumulative = 0
+        for i, n in enumerate(counts):
+            if n and cumulative + n >= rank:
+                if i == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[i - 1] if i else 0.0
+                return lower + (self.buckets[i] - lower) * (rank - cumulative) / n
+            cumulative += n
+        return self.buckets[-1]
+
+    def samples(self):
+        with self.lock:
+            series = {key: (list(counts), total, count) for key, (counts, total, count) in self.series.items()}
+        result = []
+        for key, (counts, total, count) in series.items():
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), counts):
+                cumulative += n
+                result.append((self.name + "_bucket", key + (("le", _format_value(float(bound))),), cumulative))
+            result.append((self.name + "_sum", key, total))
+            result.append((self.name + "_count", key, count))
+        return result
+
+    def totals(self) -> dict:
+        with self.lock:
+            return {key: (count, total) for key, (_, total, count) in self.series.items()}
+
+
+class Registry:
+    """
+    Named collection of metrics
+    """
+
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    def _get(self, cls, name: str, help: str, **kwargs):
+        with self.lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = cls(name, help, **kwargs)
+            return metric
+
+    def counter(self, name: str, help: str) -> Counter:
+        return self._get(Counter, name, help)
+
+    def gauge(self, name: str, help: str, callback=None) -> Gauge:
+        return self._get(Gauge, name, help, callback=callback)
+
+    def histogram(self, name: str, help: str, buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help, buckets=buckets)
+
+    def render(self) -> str:
+        """
+        Every metric in the Prometheus text exposition format (version 0.0.4)
+        """
+        with self.lock:
+            metrics = sorted(self.metrics.values(), key=lambda m: m.name)
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, key, value in metric.samples():
+                lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self) -> dict:
+        """
+        Current (count, sum) of every counter and histogram series, for since()
+        """
+        with self.lock:
+            metrics = list(self.metrics.values())
+        return {(metric.name, key): value for metric in metrics for key, value in metric.totals().items()}
+
+    def since(self, snapshot: dict) -> dict:
+        """
+        Series that changed after snapshot() returned `snapshot`, as
+        {"name{labels}": {"count": n, "seconds": s}} for histograms and {"name{labels}": n} for counters
+        """
+        result = {}
+        with self.lock:
+            kinds = {name: metric.kind for name, metric in self.metrics.items()}
+        for (name, key), (count, total) in self.snapshot().items():
+            before_count, before_total = snapshot.get((name, key), (0, 0))
+            if count == before_count:
+                continue
+            label = name + _format_labels(key)
+            if kinds.get(name) == "histogram":
+                result[label] = {"count": count - before_count, "seconds": round(total - before_total, 3)}
+            else:
+                result[label] = round(total - before_total, 3)
+        return result
+
+
+registry = Registry()
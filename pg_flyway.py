@@ -1,5 +1,26 @@
 import psycopg2
+import psycopg2.extensions
+import psycopg2.pool
+import psycopg2.sql
+import hashlib
 import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+
+import metrics
+
+# Versioned migration scripts in the flyway directory, e.g. V4__dashboard_and_dedup_indexes.sql
+MIGRATION_RE = re.compile(r"^V(\d+)__(\w+)\.sql$")
+# pg_advisory_lock key so concurrently starting app processes migrate one at a time
+MIGRATION_LOCK_ID = 7316001
+# "<verb> <table>" label of a statement, from the first table (not function) after INTO/UPDATE/FROM
+STATEMENT_TABLE_RE = re.compile(r"\b(?:into|update|from)\s+([a-z_][a-z0-9_.]*)\b(?!\()", re.IGNORECASE)
+
+QUERY_SECONDS = metrics.registry.histogram("db_query_seconds", "Statement execution time, by verb and table")
+COMMIT_SECONDS = metrics.registry.histogram("db_commit_seconds", "Transaction commit time")
+POOL_WAIT_SECONDS = metrics.registry.histogram("db_pool_wait_seconds", "Time waiting for a pooled connection")
 
 
 class PGFlyway:
@@ -7,9 +28,11 @@ class PGFlyway:
     Postgres Flyway utilities
     """
 
-    def __init__(self, dbname="postgres"):
+    def __init__(self, dbname="postgres", connect: bool = True):
         """
         Initialization
+        :param dbname: database to work on
+        :param connect: open self.conn now; False when only connect_kwargs() or a pool is needed
         """
         self.flyway_path = os.path.join(os.path.dirname(__file__), "flyway")
         self.secrets_path = os.path.join(os.path.dirname(__file__), "secrets")
@@ -21,17 +44,42 @@ class PGFlyway:
             open(os.path.join(self.secrets_path, "db_password.txt"), 'w')
             raise Exception("Please write password to file \'secrets/db_password.txt\'")
         self.db_port = open(os.path.join(self.secrets_path, "db_port.txt"), 'r').read().strip()
-        try:
-            # Connect to the default 'postgres' database to create a new one
-            self.conn = psycopg2.connect(
-                host=self.db_host,
-                user=self.db_user,
-                password=self.db_password,
-                dbname=dbname,
-                port=self.db_port  # Connect to a default database to create others
-            )
-        except psycopg2.Error as e:
-            raise Exception(f"Error creating database: {e}")
+        self.dbname = dbname
+        self.conn = None
+        if connect:
+            try:
+                # Connect to the default 'postgres' database to create a new one
+                self.conn = psycopg2.connect(**self.connect_kwargs())
+            except psycopg2.Error as e:
+                raise Exception(f"Error creating database: {e}")
+
+    def close(self):
+        """
+        Close self.conn, if open
+        """
+        if self.conn is not None and not self.conn.closed:
+            self.conn.close()
+
+    def connect_kwargs(self) -> dict:
+        """
+        psycopg2 connection arguments built from the secrets files
+        """
+        return {
+            "host": self.db_host,
+            "user": self.db_user,
+            "password": self.db_password,
+            "dbname": self.dbname,
+            "port": self.db_port,
+        }
+
+    def connection_pool(self, minconn: int = 1, maxconn: int = 10):
+        """
+        Create a thread-safe pool of connections to this database; their statements and commits
+        are timed (TimedConnection)
+        :param minconn: connections opened up front
+        :param maxconn: maximum connections open at once
+        """
+        return PGConnectionPool(minconn, maxconn, connection_factory=TimedConnection, **self.connect_kwargs())
 
     def create_database(self, db_name: str):
         """
@@ -39,23 +87,277 @@ class PGFlyway:
         :param db_name: name of new database
         """
         self.conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
-        self.conn.cursor().execute("SELECT 1 FROM pg_catalog.pg_database WHERE datname = '{}'".format(db_name))
+        c = self.conn.cursor()
+        c.execute("SELECT 1 FROM pg_catalog.pg_database WHERE datname = %s", (db_name,))
+        if c.fetchone() is not None:
+            return
         try:
-            exists = self.conn.cursor().fetchone()
-        except psycopg2.ProgrammingError:
-            try:
-                self.conn.cursor().execute("CREATE DATABASE {}".format(db_name))
-            except psycopg2.errors.DuplicateDatabase:
-                print(f"{db_name} already exists.")
+            c.execute(psycopg2.sql.SQL("CREATE DATABASE {}").format(psycopg2.sql.Identifier(db_name)))
+        except psycopg2.errors.DuplicateDatabase:
+            print(f"{db_name} already exists.")  # created by another process since the check
+
+    def migrations(self) -> list:
+        """
+        Versioned migration scripts in the flyway directory as (version, description, file name), in order
+        """
+        found = []
+        for name in os.listdir(self.flyway_path):
+            match = MIGRATION_RE.match(name)
+            if match:
+                found.append((int(match.group(1)), match.group(2).replace("_", " "), name))
+        found.sort()
+        versions = [version for version, _, _ in found]
+        if len(versions) != len(set(versions)):
+            raise Exception(f"Duplicate migration versions in {self.flyway_path}")
+        return found
+
+    def migrate(self, target: int = None) -> list:
+        """
+        Apply pending V<version>__<description>.sql scripts in version order, each in its own
+        transaction, and record them in schema_version. Scripts already applied are checked
+        against their recorded checksum so an edited migration is caught instead of skipped.
+        :param target: highest version to apply (default: all)
+        :return: versions applied by this call
+        """
+        conn = self.conn
+        with conn.cursor() as c:
+            c.execute("""
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INTEGER PRIMARY KEY,
+                    description TEXT,
+                    script TEXT,
+                    checksum TEXT,
+                    installed_on TIMESTAMP DEFAULT now(),
+                    execution_ms INTEGER
+                )
+            """)
+            conn.commit()
+            c.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_ID,))
+        applied_now = []
+        try:
+            with conn.cursor() as c:
+                c.execute("SELECT version, checksum FROM schema_version")
+                applied = dict(c.fetchall())
+            conn.commit()
+            for version, description, name in self.migrations():
+                if target is not None and version > target:
+                    break
+                script = open(os.path.join(self.flyway_path, name), 'r').read()
+                checksum = hashlib.sha256(script.encode("utf-8")).hexdigest()
+                if version in applied:
+                    if applied[version] != checksum:
+                        raise Exception(f"Migration {name} was changed after it was applied")
+                    continue
+                start = time.perf_counter()
+                try:
+                    with conn.cursor() as c:
+                        c.execute(script)
+                        c.execute("""
+                            INSERT INTO schema_version (version, description, script, checksum, execution_ms)
+                            VALUES (%s, %s, %s, %s, %s)
+                        """, (version, description, name, checksum, int((time.perf_counter() - start) * 1000)))
+                    conn.commit()
+                except psycopg2.Error as e:
+                    conn.rollback()
+                    raise Exception(f"Migration {name} failed: {e}")
+                print(f"[INFO] Applied migration {name}")
+                applied_now.append(version)
+        finally:
+            with conn.cursor() as c:
+                c.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_ID,))
+            conn.commit()
+        return applied_now
+
+    def pending_migrations(self, conn=None) -> list:
+        """
+        Versions of the migration scripts not applied yet; reads schema_version only, so it
+        needs no DDL rights
+        :param conn: connection to the database (default: self.conn)
+        """
+        conn = conn or self.conn
+        with conn.cursor() as c:
+            c.execute("SELECT to_regclass('schema_version')")
+            applied = set()
+            if c.fetchone()[0] is not None:
+                c.execute("SELECT version FROM schema_version")
+                applied = {row[0] for row in c.fetchall()}
+        conn.commit()
+        return [version for version, _, _ in self.migrations() if version not in applied]
 
-    def create_table(self, table_name: str):
+    def schema_version(self):
         """
-        Create a postgres table from create table script saved in a file
-        :param table_name: name of the table
+        Highest applied migration version, or None before the first migration
         """
-        flyway_script_name = f"create_table_{table_name}.sql"
-        create_table_statement = open(os.path.join(self.flyway_path, flyway_script_name), 'r').read()
+        with self.conn.cursor() as c:
+            c.execute("SELECT max(version) FROM schema_version")
+            version = c.fetchone()[0]
+        self.conn.commit()
+        return version
+
+
+def statement_label(query) -> str:
+    """Short metrics label of a query, e.g. "insert trades" or "select all_trades"."""
+    head = query[:300].decode("utf-8", "replace") if isinstance(query, bytes) else str(query)[:300]
+    words = head.split(None, 1)
+    if not words:
+        return ""
+    table = STATEMENT_TABLE_RE.search(head)
+    return f"{words[0].lower()} {table.group(1).lower()}" if table else words[0].lower()
+
+
+class TimedCursor(psycopg2.extensions.cursor):
+    """
+    Cursor that records each statement's execution time in db_query_seconds
+    """
+
+    def execute(self, query, vars=None):
+        start = time.perf_counter()
         try:
-            self.conn.cursor().execute(create_table_statement)
-        except psycopg2.errors.DuplicateTable:
-            print(f"Relation \"{table_name}\" was already created")
+            return super().execute(query, vars)
+        finally:
+            QUERY_SECONDS.observe(time.perf_counter() - start, statement=statement_label(query))
+
+
+class TimedConnection(psycopg2.extensions.connection):
+    """
+    Connection whose cursors are TimedCursors and whose commits are recorded in db_commit_seconds
+    """
+
+    def cursor(self, *args, **kwargs):
+        kwargs.setdefault("cursor_factory", TimedCursor)
+        return super().cursor(*args, **kwargs)
+
+    def commit(self):
+        with COMMIT_SECONDS.time():
+            super().commit()
+
+
+class LazyConnectionPool:
+    """
+    PGConnectionPool stand-in that opens the real pool on first use, so defining one at import
+    time connects to nothing
+    """
+
+    def __init__(self, open_pool):
+        """
+        Initialization
+        :param open_pool: zero-argument callable returning the PGConnectionPool; called once,
+            again on the next use if it raised
+        """
+        self.open_pool = open_pool
+        self.pool = None
+        self.lock = threading.Lock()
+
+    def get(self):
+        """
+        The underlying pool, opening it if this is the first use
+        """
+        with self.lock:
+            if self.pool is None:
+                self.pool = self.open_pool()
+            return self.pool
+
+    def getconn(self, timeout: float = None):
+        return self.get().getconn(timeout)
+
+    def putconn(self, conn):
+        self.get().putconn(conn)
+
+    def connection(self, timeout: float = None):
+        return self.get().connection(timeout)
+
+    def closeall(self):
+        with self.lock:
+            if self.pool is not None:
+                self.pool.closeall()
+                self.pool = None
+
+
+class PGConnectionPool:
+    """
+    Thread-safe Postgres connection pool that validates connections before handing them out
+    """
+
+    def __init__(self, minconn: int, maxconn: int, **connect_kwargs):
+        """
+        Initialization
+        :param minconn: connections opened up front
+        :param maxconn: maximum connections open at once; getconn() blocks beyond this
+        :param connect_kwargs: psycopg2.connect arguments
+        """
+        self.pool = psycopg2.pool.ThreadedConnectionPool(minconn, maxconn, **connect_kwargs)
+        self.slots = threading.BoundedSemaphore(maxconn)
+
+    @staticmethod
+    def _reset(conn):
+        if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            conn.rollback()
+
+    def _usable(self, conn) -> bool:
+        if conn.closed:
+            return False
+        try:
+            self._reset(conn)
+            with conn.cursor() as c:
+                c.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def getconn(self, timeout: float = None):
+        """
+        Check out a live connection, replacing dropped ones with fresh connections
+        :param timeout: seconds to wait for a free connection (None waits forever)
+        """
+        with POOL_WAIT_SECONDS.time():
+            acquired = self.slots.acquire(timeout=timeout)
+        if not acquired:
+            raise psycopg2.pool.PoolError("No database connection became available")
+        try:
+            for _ in range(3):
+                conn = self.pool.getconn()
+                if self._usable(conn):
+                    return conn
+                self.pool.putconn(conn, close=True)
+            raise psycopg2.OperationalError("Could not obtain a working database connection")
+        except Exception:
+            self.slots.release()
+            raise
+
+    def putconn(self, conn):
+        """
+        Return a connection, rolling back anything left uncommitted
+        :param conn: connection obtained from getconn()
+        """
+        try:
+            if not conn.closed:
+                self._reset(conn)
+            self.pool.putconn(conn, close=bool(conn.closed))
+        except psycopg2.Error:
+            self.pool.putconn(conn, close=True)
+        finally:
+            self.slots.release()
+
+    @contextmanager
+    def connection(self, timeout: float = None):
+        """
+        Context manager that commits on success and rolls back on error
+        :param timeout: seconds to wait for a free connection
+        """
+        conn = self.getconn(timeout)
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            if not conn.closed:
+                conn.rollback()
+            raise
+        finally:
+            self.putconn(conn)
+
+    def closeall(self):
+        """
+        Close every pooled connection
+        """
+        self.pool.closeall()
@@ -0,0 +1,132 @@
+import queue
+import threading
+import time
+
+import waits
+
+_DONE = object()
+
+
+class Stage:
+    """
+    One step of a Pipeline
+    """
+
+    def __init__(self, name: str, func, workers: int = 1, context=None):
+        """
+        Initialization
+        :param name: stage name used in the counters
+        :param func: callable taking one item and returning an iterable of items for the
+            next stage (or None to drop the item)
+        :param workers: number of threads running this stage
+        :param context: optional callable returning a context manager that each worker thread
+            enters once; its value is passed to func as a second argument (e.g. a DB connection)
+        """
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.context = context
+        # busy_seconds includes wait_seconds, the part spent in waits.timer (throttling, network, backoff)
+        self.counters = {"in": 0, "out": 0, "errors": 0, "busy_seconds": 0.0, "wait_seconds": 0.0}
+        self.lock = threading.Lock()
+
+    def count(self, **deltas):
+        with self.lock:
+            for key, value in deltas.items():
+                self.counters[key] += value
+
+
+class Pipeline:
+    """
+    Multi-stage threaded pipeline connected by bounded queues.
+    A full queue blocks the stage feeding it, so a slow stage throttles everything upstream.
+    """
+
+    def __init__(self, stages: list, queue_size: int = 100):
+        """
+        Initialization
+        :param stages: ordered list of Stage objects
+        :param queue_size: capacity of the queue in front of each stage
+        """
+        self.stages = stages
+        self.queues = [queue.Queue(maxsize=queue_size) for _ in stages]
+        self.results = []
+        self.results_lock = threading.Lock()
+
+    def _work(self, index: int):
+        stage = self.stages[index]
+        if stage.context is None:
+            self._drain(index, stage.func)
+            return
+        drained = False
+        try:
+            with stage.context() as ctx:
+                self._drain(index, lambda item: stage.func(item, ctx))
+                drained = True
+        except Exception as e:
+            print(f"[ERROR] Stage {stage.name} worker failed: {e}")
+            stage.count(errors=1)
+            if not drained:
+                self._drain(index, None)
+
+    def _drain(self, index: int, func):
+        stage = self.stages[index]
+        inbox = self.queues[index]
+        outbox = self.queues[index + 1] if index + 1 < len(self.stages) else None
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                return
+            if func is None:
+                continue  # worker lost its context; discard so upstream never blocks
+            stage.count(**{"in": 1})
+            start = time.perf_counter()
+            waited = waits.timer.thread_total()
+            try:
+                outputs = func(item)
+                outputs = list(outputs) if outputs is not None else []
+            except Exception as e:
+                print(f"[ERROR] Stage {stage.name} failed on {item!r}: {e}")
+                stage.count(errors=1, busy_seconds=time.perf_counter() - start,
+                            wait_seconds=waits.timer.thread_total() - waited)
+                continue
+            stage.count(out=len(outputs), busy_seconds=time.perf_counter() - start,
+                        wait_seconds=waits.timer.thread_total() - waited)
+            for output in outputs:
+                if outbox is not None:
+                    outbox.put(output)
+                else:
+                    with self.results_lock:
+                        self.results.append(output)
+
+    def run(self, items) -> list:
+        """
+        Push items through every stage and block until the pipeline drains
+        :param items: iterable of inputs for the first stage
+        :return: outputs of the last stage
+        """
+        threads = []
+        for index, stage in enumerate(self.stages):
+            stage_threads = [
+                threading.Thread(target=self._work, args=(index,), name=f"{stage.name}-{n}", daemon=True)
+                for n in range(stage.workers)
+            ]
+            for t in stage_threads:
+                t.start()
+            threads.append(stage_threads)
+        for item in items:
+            self.queues[0].put(item)
+        for index, stage in enumerate(self.stages):
+            for _ in range(stage.workers):
+                self.queues[index].put(_DONE)
+            for t in threads[index]:
+                t.join()
+        return self.results
+
+    def stats(self) -> dict:
+        """
+        Per-stage counters
+        """
+        return {stage.name: dict(stage.counters, busy_seconds=round(stage.counters["busy_seconds"], 3),
+                                 wait_seconds=round(stage.counters["wait_seconds"], 3))
+                for stage in self.stages}
@@ -0,0 +1,43 @@
+"""
+Standalone ingest queue worker.
+
+Drains ingest_tasks (see work_queue.py) next to, or instead of, the web app's own pulls: start
+as many as the sites' rate limits and the database allow, on this machine or others pointing at
+the same database. Tasks are claimed with SKIP LOCKED, so workers never process the same
+document twice, and a worker that dies leaves its tasks to be reclaimed when their lease expires.
+
+    python queue_worker.py --kind form4 --kind senate_ptr
+"""
+import argparse
+import json
+import time
+
+from main import FORM4_TASK, SENATE_TASK, drain_queue, form4_pipeline, senate_pipeline
+
+PIPELINES = {FORM4_TASK: form4_pipeline, SENATE_TASK: senate_pipeline}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Process queued ingest tasks")
+    parser.add_argument("--kind", action="append", choices=sorted(PIPELINES),
+                        help="task kind to process (repeatable; default: all)")
+    parser.add_argument("--idle", type=float, default=30, help="seconds to sleep when no task is ready")
+    parser.add_argument("--once", action="store_true", help="exit once the queue has no ready task")
+    args = parser.parse_args()
+    kinds = args.kind or sorted(PIPELINES)
+    while True:
+        processed = 0
+        for kind in kinds:
+            totals, _ = drain_queue(kind, PIPELINES[kind])
+            handled = totals["tasks"] + totals["failed"] + totals["lost"]
+            processed += handled
+            if handled:
+                print(json.dumps({"kind": kind, **totals}))
+        if not processed:
+            if args.once:
+                return
+            time.sleep(args.idle)
+
+
+if __name__ == "__main__":
+    main()
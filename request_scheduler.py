@@ -0,0 +1,291 @@
+"""
+Per-host request scheduling shared by every HTTP client (SEC, Senate eFD, House Clerk).
+
+Each host gets a token bucket sized to what the site allows, so all threads together run at
+that rate and no faster. Failed requests (connection errors, timeouts, 429 and 5xx answers) are
+retried with jittered exponential backoff; a Retry-After header pauses the whole host, not just
+the thread that saw it. A host that keeps failing trips its circuit breaker and requests to it
+fail fast until a trial request succeeds again. Counters per host are exposed by stats().
+"""
+import collections
+import email.utils
+import random
+import threading
+import time
+from dataclasses import dataclass
+
+import requests
+
+import metrics
+import waits
+
+REQUEST_SECONDS = metrics.registry.histogram(
+    "http_request_seconds", "HTTP request time to response headers, by host and status (or error)")
+SCHEDULER_EVENTS = metrics.registry.counter(
+    "http_scheduler_events_total", "Scheduler outcomes by host: retries, rate limiting, circuit breaker")
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class CircuitOpenError(requests.ConnectionError):
+    """
+    Raised instead of sending a request to a host whose circuit breaker is open
+    """
+
+
+@dataclass
+class HostPolicy:
+    rate: float = 5.0                # requests per second
+    burst: int = 1                   # requests that may go out back to back after an idle period
+    max_retries: int = 4
+    backoff_base: float = 0.5        # seconds before the first retry (before jitter)
+    backoff_cap: float = 30.0        # longest backoff between two attempts
+    max_retry_after: float = 120.0   # longest Retry-After honoured; longer ones give up
+    failure_threshold: int = 5       # consecutive failures that open the circuit
+    reset_timeout: float = 30.0      # seconds the circuit stays open before a trial request
+
+
+# SEC fair access allows 10 requests per second; the disclosure sites publish no limit
+HOST_POLICIES = {
+    "www.sec.gov": HostPolicy(rate=10, burst=2),
+    "efdsearch.senate.gov": HostPolicy(rate=4),
+    "disclosures-clerk.house.gov": HostPolicy(rate=5),
+}
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket; acquire() blocks until a token is available
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Initialization
+        :param rate: tokens added per second
+        :param burst: bucket capacity
+        """
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Take one token, sleeping (counted as throttle waiting) until one is available
+        """
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                delay = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+            with waits.timer.waiting("throttle"):
+                time.sleep(delay)
+
+    def pause(self, seconds: float):
+        """
+        Hand out no tokens for the next `seconds` (e.g. after a Retry-After answer)
+        """
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker: closed -> open after `threshold` failures, half-open
+    (one trial request) after `reset_timeout` seconds, closed again on success
+    """
+
+    def __init__(self, threshold: int, reset_timeout: float):
+        """
+        Initialization
+        :param threshold: consecutive failures that open the circuit
+        :param reset_timeout: seconds before a trial request is let through
+        """
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.state = "closed"
+        self.opened_at = 0.0
+        self.trial_running = False
+        self.lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self.lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = "half_open"
+            if self.state == "half_open" and not self.trial_running:
+                self.trial_running = True
+                return True
+            return False
+
+    def succeeded(self):
+        with self.lock:
+            self.failures = 0
+            self.state = "closed"
+            self.trial_running = False
+
+    def failed(self) -> bool:
+        """
+        Record a failure; returns True if this failure opened the circuit
+        """
+        with self.lock:
+            self.failures += 1
+            self.trial_running = False
+            if self.state == "half_open" or (self.state == "closed" and self.failures >= self.threshold):
+                self.state = "open"
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+
+def retry_after_seconds(response):
+    """Seconds requested by a Retry-After header (delta-seconds or HTTP date), or None."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def request_timed(session, method: str, url: str, max_timeout: float, **kwargs):
+    """
+    session.request() with the host's adaptive timeout, recording the time as network waiting
+    and feeding the observed latency back into waits.timeouts
+    """
+    host = waits.host_of(url)
+    timeout = waits.timeouts.timeout(host, maximum=max_timeout)
+    start = time.perf_counter()
+    try:
+        with waits.timer.waiting("network"):
+            response = session.request(method, url, timeout=timeout, **kwargs)
+    except requests.RequestException as e:
+        REQUEST_SECONDS.observe(time.perf_counter() - start, host=host, status=type(e).__name__)
+        if isinstance(e, requests.Timeout):
+            waits.timeouts.timed_out(host, timeout)
+        raise
+    REQUEST_SECONDS.observe(time.perf_counter() - start, host=host, status=response.status_code)
+    # time to response headers; a large body still being read doesn't count as latency
+    waits.timeouts.observe(host, response.elapsed.total_seconds())
+    return response
+
+
+class _Host:
+    def __init__(self, name: str, policy: HostPolicy):
+        self.name = name
+        self.policy = policy
+        self.bucket = TokenBucket(policy.rate, policy.burst)
+        self.breaker = CircuitBreaker(policy.failure_threshold, policy.reset_timeout)
+        self.counters = collections.Counter()
+        self.lock = threading.Lock()
+
+    def count(self, *names):
+        with self.lock:
+            self.counters.update(names)
+        for name in names:
+            if name != "requests" and not name.startswith("status_"):
+                SCHEDULER_EVENTS.inc(host=self.name, event=name)
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return dict(self.counters)
+
+
+class RequestScheduler:
+    """
+    Sends requests through per-host token buckets with retries, backoff and circuit breaking
+    """
+
+    def __init__(self, policies: dict = None, default: HostPolicy = None):
+        """
+        Initialization
+        :param policies: HostPolicy per host name (netloc)
+        :param default: policy for hosts not listed
+        """
+        self.policies = dict(HOST_POLICIES if policies is None else policies)
+        self.default = default or HostPolicy()
+        self.hosts = {}
+        self.lock = threading.Lock()
+
+    def _host(self, host: str) -> _Host:
+        with self.lock:
+            state = self.hosts.get(host)
+            if state is None:
+                state = self.hosts[host] = _Host(host, self.policies.get(host, self.default))
+            return state
+
+    def request(self, session, method: str, url: str, max_timeout: float, retry: bool = True, **kwargs):
+        """
+        session.request() paced by the host's token bucket and retried on transient failures
+        (see request_timed for timeouts). The final response is returned whatever its
+        status; callers still call raise_for_status().
+        :param retry: False for requests that must not be repeated
+        :raises CircuitOpenError: if the host's circuit is open
+        :raises requests.RequestException: if the last attempt failed without a response
+        """
+        host = waits.host_of(url)
+        state = self._host(host)
+        policy = state.policy
+        attempts = policy.max_retries + 1 if retry else 1
+        for attempt in range(attempts):
+            if not state.breaker.allow():
+                state.count("rejected")
+                raise CircuitOpenError(f"{host}: circuit open after repeated failures")
+            state.bucket.acquire()
+            state.count("requests")
+            delay = None
+            try:
+                response = request_timed(session, method, url, max_timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                state.count("errors")
+                if state.breaker.failed():
+                    state.count("circuit_opened")
+                if attempt + 1 >= attempts:
+                    raise
+                print(f"[WARN] {host}: {type(e).__name__}, retrying ({attempt + 1}/{policy.max_retries})")
+            else:
+                state.count(f"status_{response.status_code // 100}xx")
+                if response.status_code not in RETRY_STATUSES:
+                    state.breaker.succeeded()
+                    return response
+                if state.breaker.failed():
+                    state.count("circuit_opened")
+                delay = retry_after_seconds(response)
+                if response.status_code == 429:
+                    state.count("rate_limited")
+                if attempt + 1 >= attempts or (delay is not None and delay > policy.max_retry_after):
+                    return response
+                if delay is not None:
+                    # the host asked everyone to slow down, not just this thread
+                    state.bucket.pause(delay)
+                print(f"[WARN] {host}: HTTP {response.status_code}, retrying ({attempt + 1}/{policy.max_retries})")
+            if delay is None:
+                # full jitter keeps threads that failed together from retrying together
+                delay = random.uniform(0, min(policy.backoff_cap, policy.backoff_base * 2 ** attempt))
+            state.count("retries")
+            with waits.timer.waiting("backoff"):
+                time.sleep(delay)
+
+    def stats(self) -> dict:
+        with self.lock:
+            hosts = dict(self.hosts)
+        return {host: dict(state.snapshot(), circuit=state.breaker.state, rate=state.policy.rate)
+                for host, state in hosts.items()}
+
+
+scheduler = RequestScheduler()
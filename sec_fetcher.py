@@ -0,0 +1,68 @@
+import requests
+from requests.adapters import HTTPAdapter
+
+from doc_cache import CacheMiss
+from request_scheduler import scheduler as default_scheduler
+
+
+class SECFetcher:
+    """
+    Pooled keep-alive HTTP client for sec.gov documents
+    """
+
+    def __init__(self, headers: dict, pool_size: int = 10, timeout: float = 30, cache=None, scheduler=None):
+        """
+        Initialization
+        :param headers: default request headers (SEC requires a descriptive User-Agent)
+        :param pool_size: number of keep-alive connections kept per host
+        :param timeout: upper bound for the per-request timeout in seconds; below it the timeout
+            adapts to the latency observed for each host (see waits.AdaptiveTimeouts)
+        :param cache: optional doc_cache.DocumentCache consulted before the network
+        :param scheduler: request_scheduler.RequestScheduler pacing and retrying requests per host
+            (default: the process-wide one, so every client shares each host's rate limit)
+        """
+        self.timeout = timeout
+        self.cache = cache
+        self.scheduler = scheduler or default_scheduler
+        self.session = requests.Session()
+        self.session.headers.update(headers)
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def get(self, url: str, revalidate: bool = False) -> bytes:
+        """
+        Fetch a document and return its raw bytes. Cached documents are returned without a
+        request unless revalidate is set, in which case a conditional request
+        (If-None-Match / If-Modified-Since) is sent and a 304 answer is served from the cache.
+        :param url: document url
+        :param revalidate: True for pages that change (feeds, listings); filed documents never do
+        """
+        cached = self.cache.get(url) if self.cache is not None else None
+        if cached is not None and (not revalidate or self.cache.replay):
+            return cached.content
+        if self.cache is not None and self.cache.replay:
+            raise CacheMiss(url)
+        headers = {}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+        response = self.scheduler.request(self.session, "GET", url, self.timeout, headers=headers)
+        if response.status_code == 304 and cached is not None:
+            self.cache.revalidated(url)
+            return cached.content
+        response.raise_for_status()
+        if self.cache is not None:
+            self.cache.put(url, response.content, etag=response.headers.get("ETag"),
+                           last_modified=response.headers.get("Last-Modified"))
+        return response.content
+
+    def get_text(self, url: str, revalidate: bool = False) -> str:
+        """
+        Fetch a document and return it decoded as text
+        :param url: document url
+        :param revalidate: see get()
+        """
+        return self.get(url, revalidate).decode("utf-8", errors="replace")
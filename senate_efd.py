@@ -0,0 +1,150 @@
+import re
+import threading
+
+import requests
+from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+
+from request_scheduler import scheduler as default_scheduler
+
+EFD_URL = "https://efdsearch.senate.gov"
+PTR_REPORT_TYPE = 11
+CSRF_INPUT_RE = re.compile(r'name="csrfmiddlewaretoken"\s+value="([^"]+)"')
+
+
+class SenateEFDClient:
+    """
+    HTTP client for the Senate electronic financial disclosure search (efdsearch.senate.gov).
+    The terms of use are accepted once per session; search results are then requested
+    page by page from the JSON endpoint behind the results table, so page N costs one request.
+    """
+
+    def __init__(self, headers: dict, base_url: str = EFD_URL, pool_size: int = 8, timeout: float = 30,
+                 scheduler=None):
+        """
+        Initialization
+        :param headers: default request headers
+        :param base_url: eFD site root
+        :param pool_size: number of keep-alive connections kept to the site
+        :param timeout: upper bound for the adaptive per-request timeout in seconds
+        :param scheduler: request_scheduler.RequestScheduler pacing and retrying requests to the site
+            (default: the process-wide one; see HOST_POLICIES for its rate)
+        """
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.scheduler = scheduler or default_scheduler
+        self.session = requests.Session()
+        self.session.headers.update(headers)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.lock = threading.Lock()
+        self.agreed = False
+
+    def _request(self, method: str, path: str, **kwargs):
+        # the terms POST is safe to repeat; search POSTs only read
+        response = self.scheduler.request(self.session, method, self.base_url + path, self.timeout, **kwargs)
+        response.raise_for_status()
+        return response
+
+    def _csrf_token(self) -> str:
+        return self.session.cookies.get("csrftoken") or ""
+
+    def accept_terms(self, force: bool = False):
+        """
+        Accept the prohibition agreement; the session cookie is reused by every later request
+        :param force: accept again even if this session already did (e.g. after it expired)
+        """
+        with self.lock:
+            if self.agreed and not force:
+                return
+            home = self._request("GET", "/search/home/")
+            match = CSRF_INPUT_RE.search(home.text)
+            token = match.group(1) if match else self._csrf_token()
+            self._request("POST", "/search/home/",
+                          data={"prohibition_agreement": "1", "csrfmiddlewaretoken": token},
+                          headers={"Referer": self.base_url + "/search/home/"})
+            self.agreed = True
+
+    def _get_agreed(self, path: str):
+        self.accept_terms()
+        response = self._request("GET", path)
+        if response.url.rstrip("/").endswith("/search/home"):
+            # session expired and the site bounced us back to the agreement
+            self.accept_terms(force=True)
+            response = self._request("GET", path)
+        return response
+
+    def search_page(self, start: int, length: int = 100, report_types=(PTR_REPORT_TYPE,)):
+        """
+        One page of search results, newest first
+        :param start: offset of the first result
+        :param length: results per page
+        :param report_types: eFD report type ids (11 = periodic transaction report)
+        :return: (rows, total) with rows as dicts with first_name, last_name, office, report_link, date_filed
+        """
+        self.accept_terms()
+        data = {
+            "start": str(start),
+            "length": str(length),
+            "draw": "1",
+            "report_types": "[" + ",".join(str(t) for t in report_types) + "]",
+            "filer_types": "[]",
+            "submitted_start_date": "01/01/2012 00:00:00",
+            "submitted_end_date": "",
+            "candidate_state": "",
+            "senator_state": "",
+            "office_id": "",
+            "first_name": "",
+            "last_name": "",
+            "order[0][column]": "4",
+            "order[0][dir]": "desc",
+        }
+        for attempt in range(2):
+            response = self._request("POST", "/search/report/data/", data=data, headers={
+                "Referer": self.base_url + "/search/",
+                "X-CSRFToken": self._csrf_token(),
+            })
+            try:
+                payload = response.json()
+                break
+            except ValueError:
+                if attempt:
+                    raise
+                self.accept_terms(force=True)
+        rows = []
+        for first_name, last_name, office, link_html, date_filed in payload.get("data", []):
+            link = BeautifulSoup(link_html, "html.parser").find("a")
+            if link is None or not link.get("href"):
+                continue
+            rows.append({
+                "first_name": first_name.strip(),
+                "last_name": last_name.strip(),
+                "office": office.strip(),
+                "report_link": link.get("href").lstrip("/"),
+                "date_filed": date_filed.strip(),
+            })
+        return rows, payload.get("recordsTotal", 0)
+
+    def ptr_rows(self, pages: int = 10, page_size: int = 25, limit: int = None):
+        """
+        Yield search result rows page by page (see search_page), stopping after `pages`
+        pages, `limit` rows or the last result
+        """
+        count = 0
+        for page in range(pages):
+            rows, total = self.search_page(page * page_size, page_size)
+            for row in rows:
+                yield row
+                count += 1
+                if limit and count >= limit:
+                    return
+            if not rows or (page + 1) * page_size >= total:
+                return
+
+    def report_html(self, report_link: str) -> str:
+        """
+        HTML of one report page (e.g. search/view/ptr/<id>/)
+        :param report_link: link from a search result row, relative to the site root
+        """
+        return self._get_agreed("/" + report_link.lstrip("/")).text
@@ -0,0 +1,85 @@
+"""
+Offline backfill over fixtures/daily-index, whose index files list the fixtures/form4 submissions.
+The database is replaced by an in-memory store of accessions; fetching and parsing are real.
+"""
+import contextlib
+import datetime
+import json
+import os
+
+import pytest
+
+import backfill
+import main
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures")
+START = datetime.date(2024, 1, 1)
+
+
+@pytest.fixture
+def stored(monkeypatch):
+    """Accessions written by the backfill, standing in for the filings table."""
+    accessions = {}
+
+    def batched_writer():
+        def write(parsed, conn):
+            accession, accepted, _, doc = parsed
+            accessions[accession] = doc
+            return [((len(main.form4_trades(doc)), 0), accession, accepted)]
+        return write
+
+    monkeypatch.setattr(backfill, "db_pool", type("Pool", (), {"connection": contextlib.nullcontext})())
+    monkeypatch.setattr(backfill, "known_accessions", lambda conn, batch: {a for a in batch if a in accessions})
+    monkeypatch.setattr(backfill, "batched_writer", batched_writer)
+    return accessions
+
+
+def test_index_files_and_entries():
+    paths = backfill.index_files(FIXTURES, START, datetime.date(2024, 1, 31))
+    assert [os.path.basename(p) for p in paths] == ["master.20240105.idx", "master.20240108.idx", "form.20240110.idx"]
+    # each filing is listed under the owner's and the issuer's CIK; other forms are ignored
+    assert backfill.form4_entries(paths[0], START, datetime.date(2024, 1, 31)) == \
+        [("0001127602-24-000101", "form4/0001127602-24-000101.txt")]
+    assert backfill.form4_entries(paths[2], START, datetime.date(2024, 1, 31)) == \
+        [("0001209191-24-000303", "form4/0001209191-24-000303.txt")]
+    assert backfill.form4_entries(paths[2], START, datetime.date(2024, 1, 9)) == []
+
+
+def test_backfill_resumes_from_checkpoint(stored, tmp_path):
+    checkpoint = str(tmp_path / "checkpoint.json")
+    totals = backfill.backfill(FIXTURES, START, datetime.date(2024, 1, 8), checkpoint, offline=True)
+    assert totals["indexes"] == 2 and totals["processed"] == 2 and totals["failed"] == 0
+    assert totals["inserted"] > 0
+    assert set(stored) == {"0001127602-24-000101", "0000950170-24-000202"}
+    assert stored["0000950170-24-000202"].issuer_name == "Widget Holdings Corp"
+    with open(checkpoint) as f:
+        assert len(json.load(f)["done"]) == 2
+
+    # the rerun skips the finished index files and only reads the new day
+    totals = backfill.backfill(FIXTURES, START, datetime.date(2024, 1, 31), checkpoint, offline=True)
+    assert totals["indexes"] == 1 and totals["processed"] == 1 and totals["known"] == 0
+    assert "0001209191-24-000303" in stored
+    with open(checkpoint) as f:
+        assert len(json.load(f)["done"]) == 3
+
+    totals = backfill.backfill(FIXTURES, START, datetime.date(2024, 1, 31), checkpoint, offline=True)
+    assert totals["indexes"] == 0
+
+
+def test_backfill_skips_stored_accessions(stored, tmp_path):
+    stored["0001127602-24-000101"] = None
+    totals = backfill.backfill(FIXTURES, START, datetime.date(2024, 1, 5), str(tmp_path / "checkpoint.json"),
+                               offline=True)
+    assert totals["listed"] == 1 and totals["known"] == 1 and totals["processed"] == 0
+
+
+def test_offline_missing_document_leaves_index_unchecked(stored, tmp_path):
+    daily = tmp_path / "daily-index" / "2024" / "QTR1"
+    daily.mkdir(parents=True)
+    with open(os.path.join(FIXTURES, "daily-index", "2024", "QTR1", "master.20240105.idx")) as f:
+        index = f.read()
+    (daily / "master.20240105.idx").write_text(index)
+    checkpoint = str(tmp_path / "checkpoint.json")
+    totals = backfill.backfill(str(tmp_path), START, datetime.date(2024, 1, 5), checkpoint, offline=True)
+    assert totals["failed"] == 1 and not stored
+    assert not os.path.exists(checkpoint)
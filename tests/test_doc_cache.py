@@ -0,0 +1,126 @@
+"""
+DocumentCache on a temporary directory, and SECFetcher's conditional re-fetch and replay
+against a local HTTP server that counts requests.
+"""
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from doc_cache import CacheMiss, DocumentCache
+from request_scheduler import HostPolicy, RequestScheduler
+from sec_fetcher import SECFetcher
+
+ETAG = '"v1"'
+BODY = b"<feed>first version</feed>"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return DocumentCache(str(tmp_path / "cache"))
+
+
+@pytest.fixture
+def origin():
+    """Local server for /feed: 200 with an ETag, 304 when If-None-Match matches. Records request headers."""
+    requests_seen = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests_seen.append(dict(self.headers))
+            if self.headers.get("If-None-Match") == ETAG:
+                self.send_response(304)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header("ETag", ETAG)
+            self.send_header("Last-Modified", "Mon, 08 Jan 2024 17:15:44 GMT")
+            self.send_header("Content-Length", str(len(BODY)))
+            self.end_headers()
+            self.wfile.write(BODY)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/feed", requests_seen
+    server.shutdown()
+    server.server_close()
+
+
+def fetcher(cache):
+    return SECFetcher({"User-Agent": "tests"}, cache=cache,
+                      scheduler=RequestScheduler(default=HostPolicy(rate=1000, burst=10, max_retries=0)))
+
+
+def test_put_and_get(cache):
+    assert cache.get("https://example.test/a") is None
+    cache.put("https://example.test/a", b"document", etag='"e"', last_modified="yesterday")
+    doc = cache.get("https://example.test/a")
+    assert doc.content == b"document" and doc.etag == '"e"' and doc.last_modified == "yesterday"
+    assert cache.keys("https://example.test/") == ["https://example.test/a"]
+
+
+def test_identical_content_shares_one_blob(cache):
+    cache.put("a", b"same content")
+    cache.put("b", b"same content")
+    stats = cache.stats()
+    assert stats["entries"] == 2 and stats["blobs"] == 1
+
+
+def test_damaged_blob_is_forgotten(cache):
+    sha256 = cache.put("a", b"document")
+    with open(cache._blob_path(sha256), "wb") as f:
+        f.write(b"not zlib")
+    assert cache.get("a") is None
+    assert cache.keys() == []
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    # random content barely compresses, so each blob takes a little over 1000 bytes
+    cache = DocumentCache(str(tmp_path / "cache"), max_bytes=2500)
+    cache.put("a", os.urandom(1000))
+    time.sleep(0.01)
+    cache.put("b", os.urandom(1000))
+    time.sleep(0.01)
+    assert cache.get("a") is not None  # b is now the least recently used
+    time.sleep(0.01)
+    cache.put("c", os.urandom(1000))
+    assert cache.keys() == ["a", "c"]
+    assert cache.stats()["stored_bytes"] <= 2500
+
+
+def test_cached_documents_are_not_fetched_again(cache, origin):
+    url, seen = origin
+    client = fetcher(cache)
+    assert client.get(url) == BODY
+    assert client.get(url) == BODY
+    assert len(seen) == 1
+
+
+def test_revalidate_serves_304_from_cache(cache, origin):
+    url, seen = origin
+    client = fetcher(cache)
+    assert client.get(url, revalidate=True) == BODY
+    first_fetch = cache.get(url).fetched_at
+    time.sleep(0.01)
+    assert client.get(url, revalidate=True) == BODY
+    assert len(seen) == 2
+    assert seen[1]["If-None-Match"] == ETAG
+    assert seen[1]["If-Modified-Since"] == "Mon, 08 Jan 2024 17:15:44 GMT"
+    assert cache.get(url).fetched_at > first_fetch
+
+
+def test_replay_serves_cache_and_never_fetches(tmp_path, origin):
+    url, seen = origin
+    root = str(tmp_path / "cache")
+    DocumentCache(root).put(url, BODY, etag=ETAG)
+    client = fetcher(DocumentCache(root, replay=True))
+    assert client.get(url, revalidate=True) == BODY
+    with pytest.raises(CacheMiss):
+        client.get(url + "?other")
+    assert seen == []
@@ -0,0 +1,67 @@
+"""
+House Clerk index and PTR parsing over the fixtures/house mirror.
+"""
+import datetime
+import os
+
+import pytest
+
+from house_clerk import HouseClerkSource, amount_midpoint, parse_ptr_pdf
+
+MIRROR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "fixtures", "house")
+
+
+@pytest.fixture
+def source():
+    return HouseClerkSource(MIRROR)
+
+
+def test_filings_keeps_ptrs_oldest_first(source):
+    filings = source.filings(2024)
+    assert [(f.doc_id, f.name, f.state_district, f.filing_date) for f in filings] == [
+        ("20024001", "Jane Q. Example", "CA99", datetime.date(2024, 1, 16)),
+        ("20024002", "John R. Sample", "TX98", datetime.date(2024, 2, 3)),
+    ]
+    assert filings[0].pdf_path == "public_disc/ptr-pdfs/2024/20024001.pdf"
+    # the annual report (FilingType O) in the same index is only listed on request
+    assert len(source.filings(2024, filing_types=("P", "O"))) == 3
+
+
+def test_parse_ptr_with_wrapped_cells(source):
+    trades = parse_ptr_pdf(source.read("public_disc/ptr-pdfs/2024/20024001.pdf"))
+    assert trades == [
+        ("2024-01-02", "Apple Inc. - Common Stock (AAPL)", "Purchase", 8000.5, "N/A"),
+        # the amount range wraps onto the next line
+        ("2024-01-05", "Microsoft Corporation - Common Stock (MSFT)", "Sale (Partial)", 32500.5, "N/A"),
+        # the asset name wraps before the ticker; "Over $X" has no upper bound
+        ("2024-01-08", "NVIDIA Corporation - Common Stock (NVDA)", "Exchange", 1000000.0, "N/A"),
+    ]
+
+
+def test_parse_ptr_owner_codes_and_asset_types(source):
+    trades = parse_ptr_pdf(source.read("public_disc/ptr-pdfs/2024/20024002.pdf"))
+    assert trades == [
+        ("2024-02-01", "US Treasury Bill 4.5% due 06/2024", "Purchase", 175000.5, "N/A"),
+        ("2024-02-02", "Vanguard Total Stock Market ETF (VTI)", "Sale", 8000.5, "N/A"),
+    ]
+
+
+def test_every_listed_ptr_parses(source):
+    for filing in source.filings(2024):
+        trades = parse_ptr_pdf(source.read(filing.pdf_path))
+        assert trades
+        for date, title, ttype, amount, _ in trades:
+            assert datetime.date.fromisoformat(date).year == 2024
+            assert title and ttype in ("Purchase", "Sale", "Sale (Partial)", "Exchange")
+            assert amount > 0
+
+
+@pytest.mark.parametrize("amount, midpoint", [
+    ("$1,001 - $15,000", 8000.5),
+    ("$15,001 -\n$50,000", 32500.5),
+    ("Over $50,000,000", 50000000.0),
+    ("$201", 201.0),
+    ("None disclosed", None),
+])
+def test_amount_midpoint(amount, midpoint):
+    assert amount_midpoint(amount) == midpoint
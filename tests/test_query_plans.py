@@ -0,0 +1,150 @@
+"""
+EXPLAIN checks for the dashboard and dedup query paths.
+
+Runs the app's own query functions against a connection that EXPLAINs each statement instead of
+executing it, with sequential scans disabled so the planner shows which index it would use on
+a full-size table. A check fails if its query would still scan one of the large tables
+sequentially or does not use the index it is expected to.
+
+The checks migrate and use their own database (PUBLICTRADES_TEST_DB, default publictrades_test)
+on the server in secrets/, and are skipped when there is no password file or the server cannot
+be reached:
+
+    python -m pytest tests/test_query_plans.py
+"""
+import datetime
+import os
+
+import psycopg2
+import pytest
+
+import work_queue
+from main import dashboard_segment, known_accessions, known_house_reports, person_candidates, tracked_trades
+from pg_flyway import PGFlyway
+
+TEST_DB = os.environ.get("PUBLICTRADES_TEST_DB", "publictrades_test")
+SECRETS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "secrets")
+# Tables that grow with ingestion; a sequential scan on any of them is a regression
+LARGE_TABLES = {"trades", "filings", "gov_trades", "gov_officials", "derivative_trades", "filing_owners",
+                "all_trades", "persons", "person_aliases", "ingest_tasks", "house_reports_seen"}
+
+
+class PlanCapture:
+    """
+    Connection stand-in whose cursors EXPLAIN each statement instead of running it
+    """
+
+    def __init__(self, conn):
+        """
+        Initialization
+        :param conn: real connection used to run the EXPLAINs
+        """
+        self.conn = conn
+        self.plans = []
+        self.rowcount = 0
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql, params=None):
+        c = self.conn.cursor()
+        c.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+        self.plans.append(c.fetchone()[0][0]["Plan"])
+
+    def fetchall(self):
+        return []
+
+    def fetchone(self):
+        return None
+
+    def commit(self):
+        pass
+
+
+def plan_nodes(plan):
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+# (label, function running the query against a connection, index groups: at least one index
+# of every group must appear in the plan)
+CHECKS = [
+    ("sec dashboard, first page", lambda conn: dashboard_segment(conn, "sec", False, None, 100),
+     [{"trades_transaction_date_id_idx"}]),
+    ("sec dashboard, keyset page", lambda conn: dashboard_segment(conn, "sec", False, (datetime.date(2024, 1, 1), 1000), 100),
+     [{"trades_transaction_date_id_idx"}]),
+    ("sec dashboard, tracked segment", lambda conn: dashboard_segment(conn, "sec", True, None, 100),
+     [{"filings_person_id_idx", "trades_transaction_date_id_idx"}]),
+    ("sec dashboard, undated segment", lambda conn: dashboard_segment(conn, "sec", False, (None, 1000), 100, dated=False),
+     [{"trades_transaction_date_id_idx"}]),
+    ("gov dashboard, first page", lambda conn: dashboard_segment(conn, "gov", False, None, 100),
+     [{"gov_trades_transaction_date_id_idx"}]),
+    ("gov dashboard, keyset page", lambda conn: dashboard_segment(conn, "gov", False, (datetime.date(2024, 1, 1), 1000), 100),
+     [{"gov_trades_transaction_date_id_idx"}]),
+    ("gov dashboard, tracked segment", lambda conn: dashboard_segment(conn, "gov", True, None, 100),
+     [{"gov_officials_person_id_idx", "gov_trades_transaction_date_id_idx"}]),
+    ("gov dashboard, undated segment", lambda conn: dashboard_segment(conn, "gov", False, (None, 1000), 100, dated=False),
+     [{"gov_trades_transaction_date_id_idx"}]),
+    ("tracked dashboard, first page", lambda conn: tracked_trades(conn, None, 100),
+     [{"all_trades_person_date_idx", "all_trades_date_idx"}]),
+    ("tracked dashboard, keyset page", lambda conn: tracked_trades(conn, (datetime.date(2024, 1, 1), "SEC", 1000), 100),
+     [{"all_trades_person_date_idx", "all_trades_date_idx"}]),
+    ("tracked dashboard, undated trades", lambda conn: tracked_trades(conn, (None, "SEC", 1000), 100, dated=False),
+     [{"all_trades_person_date_idx", "all_trades_date_idx"}]),
+    ("person candidates", lambda conn: person_candidates(conn, "John Doe"),
+     [{"person_aliases_trgm_idx"}, {"persons_phonetic_key_idx"}]),
+    ("queue claim", lambda conn: work_queue.claim(conn, "form4", 200, "test_query_plans"),
+     [{"ingest_tasks_lease_idx"}, {"ingest_tasks_ready_idx"}]),
+    ("form4 dedup", lambda conn: known_accessions(conn, ["0000000000-24-000001"]),
+     [{"filings_accession_key"}]),
+    ("house report dedup", lambda conn: known_house_reports(conn, ["https://example.invalid/ptr.pdf"]),
+     [{"house_reports_seen_pkey"}]),
+]
+
+
+def check(conn, run, index_groups) -> list:
+    """
+    Problems found in the plans of one check (empty if it passes)
+    """
+    capture = PlanCapture(conn)
+    run(capture)
+    nodes = [node for plan in capture.plans for node in plan_nodes(plan)]
+    problems = []
+    for node in nodes:
+        if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in LARGE_TABLES:
+            problems.append(f"sequential scan on {node['Relation Name']}")
+    used = {node["Index Name"] for node in nodes if "Index Name" in node}
+    for group in index_groups:
+        if not group & used:
+            problems.append(f"none of {sorted(group)} used (plan uses {sorted(used) or 'no index'})")
+    return problems
+
+
+@pytest.fixture(scope="module")
+def migrated():
+    """Connection to the migrated test database; skips the module without a reachable server."""
+    if not os.path.exists(os.path.join(SECRETS, "db_password.txt")):
+        pytest.skip("no secrets/db_password.txt")
+    try:
+        server = PGFlyway()
+    except Exception as e:
+        pytest.skip(f"Postgres unavailable: {e}")
+    try:
+        server.create_database(TEST_DB)
+    finally:
+        server.close()
+    flyway = PGFlyway(TEST_DB)
+    flyway.migrate()
+    yield flyway.conn
+    flyway.close()
+
+
+@pytest.mark.parametrize("label, run, index_groups", CHECKS, ids=[label for label, _, _ in CHECKS])
+def test_query_plan(migrated, label, run, index_groups):
+    c = migrated.cursor()
+    c.execute("SET LOCAL enable_seqscan = off")
+    try:
+        assert check(migrated, run, index_groups) == []
+    finally:
+        migrated.rollback()
@@ -0,0 +1,61 @@
+import collections
+import threading
+import time
+
+
+class TTLCache:
+    """
+    Small thread-safe in-memory cache whose entries expire after a fixed time and can be
+    dropped all at once when the underlying data changes
+    """
+
+    def __init__(self, ttl: float = 15, max_entries: int = 256):
+        """
+        Initialization
+        :param ttl: seconds an entry stays valid
+        :param max_entries: oldest entries are dropped beyond this many
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key, compute):
+        """
+        Cached value for key, or compute() stored under key. A value computed while the cache
+        was invalidated is returned but not stored, so it cannot outlive the change.
+        :param key: hashable cache key
+        :param compute: zero-argument callable producing the value
+        """
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return entry[1]
+            self.misses += 1
+            generation = self.generation
+        value = compute()
+        with self.lock:
+            if generation == self.generation:
+                self.entries[key] = (time.monotonic() + self.ttl, value)
+                self.entries.move_to_end(key)
+                while len(self.entries) > self.max_entries:
+                    self.entries.popitem(last=False)
+        return value
+
+    def invalidate(self):
+        """
+        Drop every entry
+        """
+        with self.lock:
+            self.generation += 1
+            self.entries.clear()
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {"entries": len(self.entries), "hits": self.hits, "misses": self.misses, "ttl": self.ttl}
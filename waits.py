@@ -0,0 +1,134 @@
+"""
+Adaptive timeouts and wait timing shared by the HTTP clients.
+
+Requests use a per-host timeout that follows the latency observed for that host instead of a
+fixed one. Every wait is recorded in `timer` so a pull can report how much of its time went to
+waiting rather than working.
+"""
+import collections
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+import metrics
+
+WAIT_SECONDS = metrics.registry.histogram("wait_seconds", "Time spent waiting, by kind (throttle, network, backoff)")
+
+
+class AdaptiveTimeouts:
+    """
+    Per-host timeouts learned from observed latency: smoothed latency plus four times its
+    smoothed deviation (the TCP retransmission timeout estimator), clamped to [minimum, maximum]
+    """
+
+    def __init__(self, initial: float = 10, minimum: float = 2, maximum: float = 60,
+                 alpha: float = 0.125, beta: float = 0.25):
+        """
+        Initialization
+        :param initial: timeout for a host with no observations yet
+        :param minimum: lower bound for any timeout
+        :param maximum: upper bound for any timeout
+        :param alpha: weight of a new sample in the smoothed latency
+        :param beta: weight of a new sample in the smoothed deviation
+        """
+        self.initial = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.alpha = alpha
+        self.beta = beta
+        self.hosts = {}
+        self.lock = threading.Lock()
+
+    def observe(self, host: str, seconds: float):
+        """
+        Record how long a request took
+        """
+        with self.lock:
+            if host not in self.hosts:
+                self.hosts[host] = [seconds, seconds / 2, 1]
+                return
+            latency, deviation, samples = self.hosts[host]
+            deviation = (1 - self.beta) * deviation + self.beta * abs(seconds - latency)
+            latency = (1 - self.alpha) * latency + self.alpha * seconds
+            self.hosts[host] = [latency, deviation, samples + 1]
+
+    def timed_out(self, host: str, timeout: float):
+        """
+        Record a timeout; the host's next timeout is at least twice as long
+        """
+        with self.lock:
+            latency, deviation, samples = self.hosts.get(host, [timeout, 0.0, 0])
+            self.hosts[host] = [max(latency, timeout), max(deviation, timeout / 4), samples]
+
+    def timeout(self, host: str, maximum: float = None) -> float:
+        """
+        Current timeout for host in seconds
+        :param maximum: caller's own upper bound, if lower than the global one
+        """
+        with self.lock:
+            state = self.hosts.get(host)
+        value = self.initial if state is None else state[0] + 4 * state[1]
+        upper = self.maximum if maximum is None else min(self.maximum, maximum)
+        return max(self.minimum, min(upper, value))
+
+    def stats(self) -> dict:
+        with self.lock:
+            hosts = {host: list(state) for host, state in self.hosts.items()}
+        return {host: {"latency": round(latency, 3), "deviation": round(deviation, 3), "samples": samples,
+                       "timeout": round(self.timeout(host), 3)}
+                for host, (latency, deviation, samples) in hosts.items()}
+
+
+class WaitTimer:
+    """
+    Thread-safe totals of seconds spent waiting, by kind (throttle, network, backoff).
+    Per-thread totals let a caller measure the waits inside one unit of work.
+    """
+
+    def __init__(self):
+        self.seconds = collections.Counter()
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    @contextmanager
+    def waiting(self, kind: str):
+        """
+        Count the time spent in the with-block as waiting of the given kind
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            WAIT_SECONDS.observe(elapsed, kind=kind)
+            with self.lock:
+                self.seconds[kind] += elapsed
+            self.local.total = getattr(self.local, "total", 0.0) + elapsed
+
+    def thread_total(self) -> float:
+        """
+        Seconds the calling thread has spent waiting so far
+        """
+        return getattr(self.local, "total", 0.0)
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return dict(self.seconds)
+
+    def since(self, snapshot: dict) -> dict:
+        """
+        Waiting seconds by kind accumulated after snapshot() returned `snapshot`
+        """
+        current = self.snapshot()
+        return {kind: round(seconds - snapshot.get(kind, 0.0), 3) for kind, seconds in current.items()
+                if seconds - snapshot.get(kind, 0.0) > 0}
+
+
+timeouts = AdaptiveTimeouts()
+timer = WaitTimer()
+
+
+def host_of(url: str) -> str:
+    return urlparse(url).netloc
+
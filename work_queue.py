@@ -0,0 +1,216 @@
+"""
+Postgres-backed ingestion work queue (table ingest_tasks, migration V8).
+
+Discovery (the Form 4 feed, the Senate search) only enqueues one task per document, keyed so the
+same document is never queued twice. Workers in any process or on any machine claim batches with
+SELECT ... FOR UPDATE SKIP LOCKED, which hands each task to exactly one of them, under a lease
+that LeaseRenewer keeps extending while the batch is worked on.
+A worker marks a task done in the same transaction as the rows it stored, so a crash either
+keeps both or neither; tasks whose lease runs out (the worker died) are claimed again, and
+failures are retried with backoff until max_attempts, then kept as failed with their last error.
+"""
+import json
+import os
+import socket
+import threading
+from dataclasses import dataclass
+
+from psycopg2.extras import execute_values
+
+LEASE_SECONDS = 300
+RETRY_BASE_SECONDS = 60
+RETRY_MAX_SECONDS = 6 * 60 * 60
+
+
+@dataclass
+class Task:
+    id: int
+    kind: str
+    key: str
+    payload: dict
+    attempts: int
+
+
+def worker_id() -> str:
+    """
+    Lease owner name for one drain run: host, process and thread that started it. The run
+    passes it to every call, since its tasks are completed on other (pipeline) threads.
+    """
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+def enqueue(conn, kind: str, items, commit: bool = True) -> int:
+    """
+    Add tasks that are not queued yet; a key already queued (in any status) is left alone
+    :param kind: task kind, e.g. "form4" or "senate_ptr"
+    :param items: iterable of (key, payload dict)
+    :return: number of new tasks
+    """
+    rows = [(kind, key, json.dumps(payload)) for key, payload in items]
+    if not rows:
+        return 0
+    c = conn.cursor()
+    returned = execute_values(c, """
+        INSERT INTO ingest_tasks (kind, task_key, payload) VALUES %s
+        ON CONFLICT (kind, task_key) DO NOTHING
+        RETURNING id
+    """, rows, fetch=True)
+    if commit:
+        conn.commit()
+    return len(returned)
+
+
+def reclaim_expired(conn, kind: str) -> int:
+    """
+    Return tasks whose lease expired to the queue (or fail them once out of attempts). Commits.
+    """
+    c = conn.cursor()
+    c.execute("""
+        UPDATE ingest_tasks
+        SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'pending' END,
+            last_error = COALESCE(last_error, '') || CASE WHEN last_error IS NULL THEN '' ELSE '; ' END
+                         || 'lease of ' || lease_owner || ' expired',
+            lease_owner = NULL, lease_expires = NULL, updated_at = now()
+        WHERE kind = %s AND status = 'running' AND lease_expires < now()
+    """, (kind,))
+    conn.commit()
+    return c.rowcount
+
+
+def claim(conn, kind: str, limit: int, worker: str, lease_seconds: float = LEASE_SECONDS) -> list:
+    """
+    Lease up to `limit` ready tasks of a kind, oldest first. Tasks locked by another claimer
+    are skipped rather than waited for. Commits.
+    :return: list of Task
+    """
+    reclaim_expired(conn, kind)
+    c = conn.cursor()
+    c.execute("""
+        UPDATE ingest_tasks t
+        SET status = 'running', attempts = t.attempts + 1, lease_owner = %s,
+            lease_expires = now() + %s * interval '1 second', updated_at = now()
+        FROM (
+            SELECT id FROM ingest_tasks
+            WHERE kind = %s AND status = 'pending' AND available_at <= now()
+            ORDER BY available_at, id
+            LIMIT %s
+            FOR UPDATE SKIP LOCKED
+        ) ready
+        WHERE t.id = ready.id
+        RETURNING t.id, t.kind, t.task_key, t.payload, t.attempts
+    """, (worker, lease_seconds, kind, limit))
+    tasks = [Task(*row) for row in c.fetchall()]
+    conn.commit()
+    tasks.sort(key=lambda t: t.id)
+    return tasks
+
+
+def extend(conn, task_ids, worker: str, lease_seconds: float = LEASE_SECONDS):
+    """
+    Renew the lease on tasks still being worked on. Commits.
+    """
+    conn.cursor().execute("""
+        UPDATE ingest_tasks SET lease_expires = now() + %s * interval '1 second'
+        WHERE id = ANY(%s) AND status = 'running' AND lease_owner = %s
+    """, (lease_seconds, list(task_ids), worker))
+    conn.commit()
+
+
+class LeaseRenewer:
+    """
+    Extends the leases of a claimed batch on a background thread while the batch is worked on,
+    so a batch that outlasts one lease (Retry-After pauses, an open circuit, slow pages) is not
+    reclaimed by another worker. Tasks already completed or failed are left alone by extend().
+    """
+
+    def __init__(self, connect, task_ids, worker: str, lease_seconds: float = LEASE_SECONDS):
+        """
+        Initialization
+        :param connect: zero-argument context manager yielding a connection, e.g. db_pool.connection
+        :param task_ids: ids of the claimed tasks
+        :param worker: lease owner the tasks were claimed by
+        :param lease_seconds: lease length; leases are renewed every third of it
+        """
+        self.connect = connect
+        self.task_ids = list(task_ids)
+        self.worker = worker
+        self.lease_seconds = lease_seconds
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def _run(self):
+        while not self.stopped.wait(self.lease_seconds / 3):
+            try:
+                with self.connect() as conn:
+                    extend(conn, self.task_ids, self.worker, self.lease_seconds)
+            except Exception as e:
+                print(f"[WARN] Could not renew task leases: {e}")
+
+    def __enter__(self):
+        self.thread = threading.Thread(target=self._run, name="lease-renewer", daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stopped.set()
+        self.thread.join()
+
+
+def complete(conn, task: Task, worker: str, result: dict = None) -> bool:
+    """
+    Mark a task done in the caller's transaction; commit it together with the rows the task stored
+    :return: False if the lease was lost (the task was reclaimed by another worker)
+    """
+    c = conn.cursor()
+    c.execute("""
+        UPDATE ingest_tasks
+        SET status = 'done', result = %s, last_error = NULL, lease_owner = NULL, lease_expires = NULL,
+            updated_at = now()
+        WHERE id = %s AND status = 'running' AND lease_owner = %s
+    """, (json.dumps(result) if result is not None else None, task.id, worker))
+    return c.rowcount == 1
+
+
+def fail(conn, task_ids, worker: str, error: str):
+    """
+    Give tasks back after a failed attempt: retried after an exponential backoff, or marked
+    failed once they have used max_attempts. Commits.
+    """
+    conn.cursor().execute("""
+        UPDATE ingest_tasks
+        SET status = CASE WHEN attempts >= max_attempts THEN 'failed' ELSE 'pending' END,
+            available_at = now() + LEAST(%s * power(2, attempts - 1), %s) * interval '1 second',
+            last_error = %s, lease_owner = NULL, lease_expires = NULL, updated_at = now()
+        WHERE id = ANY(%s) AND status = 'running' AND lease_owner = %s
+    """, (RETRY_BASE_SECONDS, RETRY_MAX_SECONDS, error[:2000], list(task_ids), worker))
+    conn.commit()
+
+
+def retry_failed(conn, kind: str = None) -> int:
+    """
+    Put failed tasks (of one kind, or all) back in the queue with fresh attempts. Commits.
+    """
+    c = conn.cursor()
+    c.execute("""
+        UPDATE ingest_tasks SET status = 'pending', attempts = 0, available_at = now(), updated_at = now()
+        WHERE status = 'failed' AND (%s::text IS NULL OR kind = %s)
+    """, (kind, kind))
+    conn.commit()
+    return c.rowcount
+
+
+def stats(conn) -> dict:
+    """Task counts by kind and status, plus the oldest ready task's age in seconds per kind."""
+    c = conn.cursor()
+    c.execute("""
+        SELECT kind, status, count(*),
+               EXTRACT(EPOCH FROM now() - min(available_at) FILTER (WHERE status = 'pending'))
+        FROM ingest_tasks
+        GROUP BY kind, status
+    """)
+    result = {}
+    for kind, status, count, oldest in c.fetchall():
+        result.setdefault(kind, {})[status] = count
+        if oldest is not None:
+            result[kind]["oldest_pending_seconds"] = round(max(float(oldest), 0.0), 1)
+    return result